@@ -0,0 +1,117 @@
+# distribucion/api/conditional.py
+"""
+GET condicional (ETag fuerte + Last-Modified) para las vistas del read API.
+
+Antes de serializar nada se lanza una sola query "sonda"; ETag = hash de path +
+params normalizados + formato + resultado de la sonda. Si coincide con If-None-Match
+(o no hay cambios desde If-Modified-Since) se responde 304 sin la query pesada.
+
+- Detalle: COUNT + MAX(updated_at) de cada campo de `last_modified_fields` (la
+  entidad y las relaciones que el serializer muestra), con sus joins: una sola fila.
+- Lista: COUNT + MAX(updated_at) del conjunto filtrado sobre la tabla base (solo
+  los joins que pida el filtro); cada relación de `last_modified_fields` aporta el MAX(updated_at) de su
+  tabla entera (subquery no correlacionada; updated_at indexado en las tablas grandes:
+  Orden, Bloque, Recepcion, Distribucion). Una fila que
+  entra, sale o cambia altera el ETag de todas las páginas; tocar cualquier chofer,
+  pyme, CD... invalida también las listas que los muestran (de más, nunca de menos).
+
+Las líneas (OrdenProducto/Producto) no tienen updated_at: se crean con la orden.
+Con ?cursor= (keyset) no hay sonda: ese modo existe para no recorrer el conjunto entero.
+"""
+from __future__ import annotations
+import hashlib
+from typing import Dict, Sequence
+from urllib.parse import urlencode
+
+from django.db.models import Count, Max, QuerySet, Subquery
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.filters import OrderingFilter
+
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+def normalized_query(params) -> str:
+    # orden de claves y de valores repetidos irrelevante, vacíos fuera
+    return urlencode(sorted((k, v) for k in params for v in params.getlist(k) if v != ""))
+
+def not_modified(request, validators: Dict[str, str]):
+    """304 (o 412) si la petición condicional se cumple con estos validadores; si no, None."""
+    probe = HttpResponse()  # solo aporta las cabeceras que copia el 304
+    for h, v in validators.items():
+        probe[h] = v
+    last_modified = validators.get("Last-Modified")
+    response = get_conditional_response(
+        request, etag=validators.get("ETag"),
+        last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+        response=probe,
+    )
+    return None if response is probe else response
+
+class ConditionalGetMixin:
+    last_modified_fields: Sequence[str] = ("updated_at",)
+    # base de la sonda de listas si el queryset de la vista lleva anotaciones (GROUP BY + joins)
+    probe_base: QuerySet | None = None
+
+    def probe_queryset(self):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup in self.kwargs:  # detalle: la misma fila que get_object()
+            qs = self.filter_queryset(self.get_queryset())
+            return qs.filter(**{self.lookup_field: self.kwargs[lookup]}).order_by()
+        qs = self.probe_base.all() if self.probe_base is not None else self.get_queryset()
+        for backend in self.filter_backends:
+            if not issubclass(backend, OrderingFilter):  # el orden no cambia la sonda (y puede usar anotaciones)
+                qs = backend().filter_queryset(self.request, qs, self)
+        return qs.order_by()
+
+    def probe_aggregates(self, model, detail: bool) -> Dict[str, object]:
+        if detail:
+            return {"n": Count("pk", distinct=True),
+                    **{f"m{i}": Max(f) for i, f in enumerate(self.last_modified_fields)}}
+        aggs, tables = {"n": Count("pk")}, set()
+        for i, f in enumerate(self.last_modified_fields):
+            *rels, col = f.split("__")
+            if not rels:
+                aggs[f"m{i}"] = Max(col)
+                continue
+            related = model
+            for name in rels:
+                related = related._meta.get_field(name).related_model
+            if (related, col) in tables:  # origen_cd/destino_cd: misma tabla
+                continue
+            tables.add((related, col))
+            latest = related._default_manager.order_by(f"-{col}").values(col)[:1]
+            aggs[f"m{i}"] = Max(Subquery(latest))
+        return aggs
+
+    def get_validators(self, request) -> Dict[str, str] | None:
+        """ETag/Last-Modified actuales, o None si no hay filas (detalle => 404 normal)."""
+        detail = (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+        qs = self.probe_queryset()
+        row = qs.aggregate(**self.probe_aggregates(qs.model, detail))
+        if not row["n"] and detail:
+            return None
+        stamps = [row.get(f"m{i}") for i in range(len(self.last_modified_fields))]
+        raw = "|".join([request.path, normalized_query(request.query_params), request.accepted_renderer.format,
+                        str(row["n"]), *(s.isoformat() if s else "" for s in stamps)])
+        validators = {"ETag": '"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()}
+        stamps = [s for s in stamps if s]
+        if stamps:
+            validators["Last-Modified"] = http_date(max(stamps).timestamp())
+        return validators
+
+    def get(self, request, *args, **kwargs):
+        cursor = getattr(self.paginator, "cursor_query_param", None)
+        if cursor and cursor in request.query_params and getattr(self, "keyset_ordering", None):
+            return super().get(request, *args, **kwargs)
+        validators = self.get_validators(request)
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        response = not_modified(request, validators)
+        if response is not None:
+            return response
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            for h, v in validators.items():
+                response[h] = v
+        return response
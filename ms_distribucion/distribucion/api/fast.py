@@ -0,0 +1,192 @@
+# distribucion/api/fast.py
+"""
+Camino rápido de serialización: filas de values() -> dicts, sin instancias de modelo
+ni de serializer por fila.
+
+El plan se deriva del árbol del serializer (igual que api/optimizer.py) y solo llama
+al to_representation del campo donde no es la identidad (fechas, decimales, uuid,
+choices), así la salida es la de DRF byte a byte (tests/api/test_fast_serialization.py).
+
+- serializer anidado sobre FK/OneToOne      -> columnas con prefijo; None si la FK es NULL
+- serializer anidado many=True (FK inversa) -> una query por página, agrupada por la FK
+- get_<campo>_display                       -> mapa de choices
+- SerializerMethodField                     -> `<método>_rows(row)` del serializer, si existe
+- anotación ausente del queryset            -> campo omitido (como hace DRF)
+
+Cualquier otra cosa (source="*", propiedades, many-to-many...) => sin plan: DRF de siempre.
+"""
+from __future__ import annotations
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple, Type
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from .optimizer import _DISPLAY, _resolve
+
+# to_representation == identidad sobre lo que devuelve la DB (clase exacta, no subclases)
+_IDENTITY = {serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ReadOnlyField}
+
+class Unsupported(Exception):
+    """El serializer tiene un campo que el camino rápido no reproduce."""
+
+@dataclass
+class FastPlan:
+    pk: str                                    # columna de la pk de este nivel
+    columns: List[str] = field(default_factory=list)
+    fields: List[Tuple[str, str, Any]] = field(default_factory=list)  # (nombre, tipo, dato)
+
+    def all_columns(self) -> List[str]:
+        cols = [self.pk, *self.columns]
+        for _, kind, data in self.fields:
+            if kind == "one":
+                cols += data.all_columns()
+        return cols
+
+@dataclass
+class _Many:
+    plan: FastPlan
+    queryset: QuerySet  # sin filtrar; se filtra por la FK con las pks de la página
+    fk: str             # nombre del campo FK en el hijo (orden)
+    fk_column: str      # attname (orden_id)
+
+def _compile(model, serializer: serializers.BaseSerializer, prefix: str,
+             annotations: FrozenSet[str] = frozenset()) -> FastPlan:
+    plan = FastPlan(pk=prefix + model._meta.pk.name)
+    for name, f in serializer.fields.items():
+        if f.write_only:
+            continue
+        if f.source in annotations:
+            plan.columns.append(f.source)
+            plan.fields.append((name, "col", (f.source, None if type(f) in _IDENTITY else f.to_representation)))
+            continue
+        if isinstance(f, serializers.SerializerMethodField):
+            rows_fn = getattr(serializer, f"{f.method_name}_rows", None)
+            if rows_fn is None:
+                raise Unsupported(f"{type(serializer).__name__}.{name}")
+            plan.fields.append((name, "method", rows_fn))
+            continue
+        if f.source == "*":
+            raise Unsupported(f"{type(serializer).__name__}.{name}")
+        res = _resolve(model, f.source_attrs)
+        if res is None:
+            if hasattr(model, f.source_attrs[0]):  # propiedad/método del modelo
+                raise Unsupported(f"{type(serializer).__name__}.{name}")
+            continue  # anotación ausente: DRF omite el campo
+        rels, mf = res
+        path = prefix + "__".join(rels + [mf.name])
+
+        nested = f.child if isinstance(f, serializers.ListSerializer) else f
+        if isinstance(f, serializers.ListSerializer) and isinstance(nested, serializers.BaseSerializer):
+            if rels or not mf.one_to_many:
+                raise Unsupported(f"{type(serializer).__name__}.{name}")
+            child = _compile(mf.related_model, nested, "")
+            many = _Many(child, mf.related_model._default_manager.all(), mf.field.name, mf.field.attname)
+            plan.fields.append((name, "many", many))
+        elif isinstance(nested, serializers.BaseSerializer):
+            if not (mf.is_relation and (mf.many_to_one or mf.one_to_one)):
+                raise Unsupported(f"{type(serializer).__name__}.{name}")
+            plan.fields.append((name, "one", _compile(mf.related_model, nested, path + "__")))
+        elif mf.many_to_many or mf.one_to_many:
+            raise Unsupported(f"{type(serializer).__name__}.{name}")
+        elif _DISPLAY.match(f.source_attrs[-1]):
+            choices = {k: str(v) for k, v in mf.flatchoices}
+            plan.columns.append(path)
+            plan.fields.append((name, "display", (path, choices, f.to_representation)))
+        else:
+            plan.columns.append(path)
+            plan.fields.append((name, "col", (path, None if type(f) in _IDENTITY else f.to_representation)))
+    return plan
+
+@lru_cache(maxsize=None)
+def plan_for(model, serializer_class: Type[serializers.BaseSerializer],
+             annotations: FrozenSet[str] = frozenset()) -> FastPlan | None:
+    """Plan del serializer para este modelo (y anotaciones del queryset); None si no se puede."""
+    try:
+        return _compile(model, serializer_class(), "", annotations)
+    except Unsupported:
+        return None
+
+def values_queryset(queryset: QuerySet, plan: FastPlan, also: Iterable[str] = ()) -> QuerySet:
+    """Mismas filas, filtros y orden que `queryset`, como dicts con las columnas del plan."""
+    return queryset.prefetch_related(None).values(*dict.fromkeys([*plan.all_columns(), *also]))
+
+def _many_rows(plan: FastPlan, rows: List[dict]) -> Dict[int, Dict[Any, List[dict]]]:
+    """Hijos de cada campo many=True (por id del _Many) agrupados por la pk del padre."""
+    out: Dict[int, Dict[Any, List[dict]]] = {}
+    for _, kind, data in plan.fields:
+        if kind == "one":
+            out.update(_many_rows(data, rows))
+        elif kind == "many":
+            pks = list(dict.fromkeys(r[plan.pk] for r in rows if r[plan.pk] is not None))
+            grouped: Dict[Any, List[dict]] = defaultdict(list)
+            if pks:
+                qs = data.queryset.filter(**{f"{data.fk}__in": pks})
+                children = list(values_queryset(qs, data.plan, also=[data.fk_column]))
+                for child, out_row in zip(children, build(data.plan, children)):
+                    grouped[child[data.fk_column]].append(out_row)
+            out[id(data)] = grouped
+    return out
+
+def _row(plan: FastPlan, row: dict, many: Dict[int, Dict[Any, List[dict]]]) -> dict:
+    out = {}
+    for name, kind, data in plan.fields:
+        if kind == "col":
+            col, fmt = data
+            v = row[col]
+            out[name] = v if fmt is None or v is None else fmt(v)
+        elif kind == "one":
+            out[name] = None if row[data.pk] is None else _row(data, row, many)
+        elif kind == "many":
+            out[name] = many[id(data)].get(row[plan.pk], [])
+        elif kind == "display":
+            col, choices, fmt = data
+            v = row[col]
+            out[name] = None if v is None else fmt(choices.get(v, v))
+        else:  # method
+            out[name] = data(row)
+    return out
+
+def build(plan: FastPlan, rows: List[dict]) -> List[dict]:
+    many = _many_rows(plan, rows)
+    return [_row(plan, r, many) for r in rows]
+
+def fast_rows(queryset: QuerySet, serializer_class: Type[serializers.BaseSerializer]) -> List[dict]:
+    """Equivalente a `serializer_class(queryset, many=True).data` (el serializer debe admitir plan)."""
+    plan = plan_for(queryset.model, serializer_class, frozenset(queryset.query.annotations))
+    return build(plan, list(values_queryset(queryset, plan)))
+
+class FastSerializationMixin:
+    """list()/retrieve() por el camino rápido si el serializer lo admite y API_FAST_SERIALIZATION."""
+    def get_fast_plan(self, queryset: QuerySet) -> FastPlan | None:
+        if not settings.API_FAST_SERIALIZATION:
+            return None
+        return plan_for(queryset.model, self.get_serializer_class(), frozenset(queryset.query.annotations))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_fast_plan(queryset)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        # el keyset de la paginación lee sus columnas de la última fila
+        also = [f.lstrip("-") for f in getattr(self, "keyset_ordering", None) or ()]
+        rows = values_queryset(queryset, plan, also)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(build(plan, page))
+        return Response(build(plan, list(rows)))
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_fast_plan(queryset)
+        if plan is None:
+            return super().retrieve(request, *args, **kwargs)
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(values_queryset(queryset, plan), **{self.lookup_field: self.kwargs[lookup]})
+        self.check_object_permissions(request, row)
+        return Response(build(plan, [row])[0])
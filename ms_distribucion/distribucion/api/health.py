@@ -1,7 +1,9 @@
 from django.http import JsonResponse
 from django.db import connection
 from django.conf import settings
-import redis, time
+import redis, threading, time
+
+from distribucion.infrastructure.messaging.redis_consumer import legacy_dlq_stream
 
 def health(request):
     t0=time.time()
@@ -27,3 +29,73 @@ def health(request):
     if not db_ok: body["db_error"]=db_err
     if not redis_ok: body["redis_error"]=redis_err
     return JsonResponse(body, status=status)
+
+
+# ---- stream / consumer group (autoescalado por lag) ----
+_STREAM_CACHE = {"at": 0.0, "body": None, "status": 200}
+_STREAM_LOCK = threading.Lock()
+_STREAM_REDIS = None
+
+def _stream_redis():
+    # un cliente (y pool) por proceso; con timeouts, un Redis colgado no retiene _STREAM_LOCK
+    global _STREAM_REDIS
+    if _STREAM_REDIS is None:
+        _STREAM_REDIS = redis.Redis.from_url(settings.REDIS_DSN, decode_responses=True,
+                                             socket_timeout=settings.STREAM_HEALTH_REDIS_TIMEOUT_S,
+                                             socket_connect_timeout=settings.STREAM_HEALTH_REDIS_TIMEOUT_S)
+    return _STREAM_REDIS
+
+def _ok(v):
+    return None if isinstance(v, Exception) else v
+
+def _id_ms(entry_id):
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    return int(str(entry_id).split("-", 1)[0])
+
+def _stream_stats():
+    r = _stream_redis()
+    stream, group = settings.REDIS_STREAM, settings.REDIS_GROUP
+    # un solo round trip; errores por comando (stream/grupo inexistente) no abortan el resto
+    p = r.pipeline(transaction=False)
+    p.xlen(stream)
+    p.xinfo_groups(stream)
+    p.xpending(stream, group)
+    p.xpending_range(stream, group, min="-", max="+", count=1)
+    p.xlen(settings.DLQ_STREAM)
+    # DLQ que usaba el consumer antes de leer DLQ_STREAM: hasta vaciarla con replay_dlq --stream
+    p.xlen(legacy_dlq_stream(stream))
+    length, groups, pending, oldest, dlq, legacy = map(_ok, p.execute(raise_on_error=False))
+
+    info = next((g for g in groups or [] if g.get("name") == group), {})
+    now_ms = int(time.time() * 1000)
+    body = {
+        "stream": stream, "group": group,
+        "length": length or 0,
+        "lag": info.get("lag"),  # Redis >= 7; None si no se puede calcular
+        "last_delivered_id": info.get("last-delivered-id"),
+        "consumers": info.get("consumers"),
+        "pending": (pending or {}).get("pending", 0),
+        "oldest_pending_id": None, "oldest_pending_age_ms": None, "oldest_pending_idle_ms": None,
+        "dlq_stream": settings.DLQ_STREAM,
+        "dlq_length": dlq or 0,
+        "legacy_dlq_length": legacy or 0,
+    }
+    if oldest:
+        first = oldest[0]
+        body["oldest_pending_id"] = first["message_id"]
+        body["oldest_pending_age_ms"] = max(now_ms - _id_ms(first["message_id"]), 0)
+        body["oldest_pending_idle_ms"] = first["time_since_delivered"]
+    return body
+
+def stream_health(request):
+    # cacheado STREAM_HEALTH_TTL_S: los probes frecuentes no golpean Redis
+    with _STREAM_LOCK:
+        if time.monotonic() - _STREAM_CACHE["at"] >= settings.STREAM_HEALTH_TTL_S:
+            try:
+                body, status = _stream_stats(), 200
+            except Exception as e:
+                body, status = {"status": "degraded", "redis_error": str(e)}, 503
+            _STREAM_CACHE.update(at=time.monotonic(), body=body, status=status)
+        body, status = _STREAM_CACHE["body"], _STREAM_CACHE["status"]
+    return JsonResponse({**body, "cache_age_ms": int((time.monotonic() - _STREAM_CACHE["at"]) * 1000)}, status=status)
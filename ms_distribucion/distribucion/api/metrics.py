@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.http import HttpResponse
+from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+
+from distribucion.infrastructure.metrics import CONTENT_TYPE, merge
+
+def _scrape(url):
+    try:
+        with urlopen(url, timeout=settings.METRICS_SCRAPE_TIMEOUT_S) as r:
+            return url, r.read().decode("utf-8"), True
+    except Exception:
+        return url, "", False
+
+def metrics(request):
+    # Agrega /metrics de cada worker (METRICS_TARGETS); la API no consume eventos
+    targets = settings.METRICS_TARGETS
+    with ThreadPoolExecutor(max_workers=max(len(targets), 1)) as ex:
+        scraped = list(ex.map(_scrape, targets))
+    texts = {url: text for url, text, ok in scraped if ok}
+    up = ["# HELP distribucion_metrics_target_up Scrape del worker correcto (1) o fallido (0).",
+          "# TYPE distribucion_metrics_target_up gauge"]
+    up += [f'distribucion_metrics_target_up{{target="{url}"}} {int(ok)}' for url, _, ok in scraped]
+    return HttpResponse(merge(texts) + "\n".join(up) + "\n", content_type=CONTENT_TYPE)
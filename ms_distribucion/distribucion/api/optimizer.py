@@ -0,0 +1,109 @@
+# distribucion/api/optimizer.py
+"""
+select_related / prefetch_related / only() derivados del árbol del serializer.
+
+- serializer anidado sobre FK/OneToOne      -> select_related + columnas con prefijo
+- serializer anidado many=True              -> Prefetch con su queryset optimizado igual
+                                               (líneas + producto en una sola query)
+- campo simple (incl. get_<campo>_display)  -> columna en only()
+
+Anotaciones del queryset (p. ej. bolsas_count) no se tocan. Si algún campo lee algo
+que no es una columna (SerializerMethodField, source="*", propiedades) no se acotan
+columnas en ese nivel: solo joins y prefetches.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Type
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+
+_DISPLAY = re.compile(r"^get_(\w+)_display$")
+
+@dataclass
+class QueryPlan:
+    select: List[str] = field(default_factory=list)
+    prefetch: List[Prefetch] = field(default_factory=list)
+    only: List[str] = field(default_factory=list)
+    exact: bool = True  # False => no se puede usar only()
+
+def _resolve(model, attrs: List[str]):
+    """(relaciones a un objeto recorridas, campo final) o None si la fuente no es un campo."""
+    rels, m = [], model
+    for i, attr in enumerate(attrs):
+        last = i == len(attrs) - 1
+        disp = _DISPLAY.match(attr) if last else None
+        try:
+            mf = m._meta.get_field(disp.group(1) if disp else attr)
+        except FieldDoesNotExist:
+            return None
+        if last:
+            return rels, mf
+        if not (mf.is_relation and (mf.many_to_one or mf.one_to_one)):
+            return None
+        rels.append(mf.name)
+        m = mf.related_model
+
+def _walk(model, serializer: serializers.BaseSerializer, prefix: str, plan: QueryPlan,
+          annotations: Iterable[str] = ()) -> None:
+    for name, f in serializer.fields.items():
+        if f.write_only or f.source in annotations:
+            continue
+        if f.source == "*" or isinstance(f, serializers.SerializerMethodField):
+            plan.exact = False
+            continue
+        res = _resolve(model, f.source_attrs)
+        if res is None:
+            # ni campo ni atributo de la clase => anotación ausente: DRF omite el campo
+            if hasattr(model, f.source_attrs[0]):
+                plan.exact = False
+            continue
+        rels, mf = res
+        for i in range(len(rels)):
+            plan.select.append(prefix + "__".join(rels[:i + 1]))
+            plan.only.append(prefix + "__".join(rels[:i + 1]))
+        path = prefix + "__".join(rels + [mf.name])
+
+        nested = f.child if isinstance(f, serializers.ListSerializer) else f
+        if isinstance(f, serializers.ListSerializer) and isinstance(nested, serializers.BaseSerializer):
+            back = [mf.field.name] if mf.one_to_many else []  # FK inversa: el hijo necesita su FK
+            qs = optimize_for(mf.related_model._default_manager.all(), type(nested), also=back)
+            plan.prefetch.append(Prefetch(path, queryset=qs))
+        elif isinstance(nested, serializers.BaseSerializer) and mf.is_relation and not mf.many_to_many:
+            plan.select.append(path)
+            if mf.concrete:
+                plan.only.append(path)
+            _walk(mf.related_model, nested, path + "__", plan)
+        elif mf.concrete and not mf.many_to_many:
+            plan.only.append(path)
+        else:
+            plan.exact = False  # relaciones a muchos sin serializer anidado
+
+def plan_for(queryset: QuerySet, serializer_class: Type[serializers.BaseSerializer]) -> QueryPlan:
+    plan = QueryPlan()
+    _walk(queryset.model, serializer_class(), "", plan, annotations=set(queryset.query.annotations))
+    return plan
+
+def optimize_for(queryset: QuerySet, serializer_class: Type[serializers.BaseSerializer],
+                 also: Iterable[str] = ()) -> QuerySet:
+    """Aplica el plan del serializer; `also` son columnas extra (p. ej. el keyset de la paginación)."""
+    plan = plan_for(queryset, serializer_class)
+    q = queryset.query
+    # joins o columnas ya fijados a mano => no se sabe qué columnas necesitan: sin only()
+    hand_tuned = bool(q.select_related) or q.deferred_loading != (frozenset(), True)
+    qs = queryset
+    if plan.select:
+        qs = qs.select_related(*dict.fromkeys(plan.select))
+    if plan.prefetch:
+        qs = qs.prefetch_related(*plan.prefetch)
+    if plan.exact and not hand_tuned:
+        qs = qs.only(*dict.fromkeys([*plan.only, *also]))
+    return qs
+
+class OptimizedQuerysetMixin:
+    """get_queryset de la vista + joins/prefetch/columnas que pide su serializer."""
+    def get_queryset(self):
+        also = [f.lstrip("-") for f in getattr(self, "keyset_ordering", None) or ()]
+        return optimize_for(super().get_queryset(), self.get_serializer_class(), also=also)
@@ -0,0 +1,105 @@
+# distribucion/api/pagination.py
+"""
+Paginación del read API: número de página por defecto y keyset (cursor) opt-in.
+
+Con `?cursor=` (vacío = primera página) las vistas que declaran `keyset_ordering`
+= (campo, desempate único) paginan por keyset: sin COUNT ni OFFSET, el coste de
+la página 2000 es el de la primera. El cursor es opaco (base64 de la última fila).
+"""
+from __future__ import annotations
+import base64, binascii, json
+from collections import OrderedDict
+from typing import Any, Sequence
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_after(field: str, tie: str, value: Any, tie_value: Any, desc: bool, nullable: bool = False) -> Q:
+    """
+    Filas posteriores a (value, tie_value) en el orden (field, tie). El `field <= v`
+    redundante deja el rango explícito para el índice. NULL es el menor valor (MySQL/sqlite).
+    """
+    op = "lt" if desc else "gt"
+    if value is None:
+        q = Q(**{f"{field}__isnull": True, f"{tie}__{op}": tie_value})
+        return q if desc else q | Q(**{f"{field}__isnull": False})
+    q = Q(**{f"{field}__{op}e": value}) & (
+        Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"{tie}__{op}": tie_value})
+    )
+    return q | Q(**{f"{field}__isnull": True}) if desc and nullable else q
+
+
+def _get(row, name: str):
+    # instancias de modelo o dicts de values() (camino rápido, api/fast.py)
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering: Sequence[str] | None = getattr(view, "keyset_ordering", None)
+        self.keyset = ordering if ordering and self.cursor_query_param in request.query_params else None
+        if self.keyset is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        field, tie = (f.lstrip("-") for f in self.keyset)
+        desc = self.keyset[0].startswith("-")
+        qs = queryset.order_by(*self.keyset)  # el orden del keyset manda sobre ?ordering=
+        position = self._decode(request.query_params[self.cursor_query_param], queryset.model, field, tie)
+        if position is not None:
+            nullable = queryset.model._meta.get_field(field).null
+            qs = qs.filter(keyset_after(field, tie, *position, desc=desc, nullable=nullable))
+
+        page_size = self.get_page_size(request)
+        rows = list(qs[:page_size + 1])  # una fila de más dice si hay siguiente, sin COUNT
+        page = rows[:page_size]
+        self.next_position = (_get(page[-1], field), _get(page[-1], tie)) if len(rows) > page_size else None
+        return page
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_next_link(self):
+        if self.keyset is None:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self._encode(self.next_position))
+
+    def get_schema_operation_parameters(self, view):
+        params = super().get_schema_operation_parameters(view)
+        if getattr(view, "keyset_ordering", None):
+            params.append({
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Paginación keyset: vacío para la primera página, luego el `next` recibido (sin count).",
+                "schema": {"type": "string"},
+            })
+        return params
+
+    # ---- cursor opaco ----
+    @staticmethod
+    def _encode(position) -> str:
+        raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in position])
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def _decode(self, cursor: str, model, field: str, tie: str):
+        if not cursor:
+            return None
+        try:
+            value, tie_value = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            f, t = model._meta.get_field(field), model._meta.get_field(tie)
+            return (None if value is None else f.to_python(value)), t.to_python(tie_value)
+        except (binascii.Error, ValueError, TypeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,48 @@
+# distribucion/api/query_budget.py
+"""
+Presupuesto de queries por vista: `query_budget` = máximo de queries SQL por request,
+constante respecto del tamaño de página (un N+1 lo rompe en cuanto hay más de una fila).
+
+QUERY_BUDGET_MODE: "off" (no cuenta), "log" (warning al excederlo) o "raise"
+(QueryBudgetExceeded; es el modo de los tests).
+"""
+from __future__ import annotations
+import logging
+from django.conf import settings
+from django.db import connection
+
+log = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError): ...
+
+class QueryCounter:
+    """execute_wrapper que cuenta (y guarda) las queries ejecutadas."""
+    def __init__(self):
+        self.queries: list[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+class QueryBudgetMixin:
+    query_budget: int | None = None
+
+    def dispatch(self, request, *args, **kwargs):
+        mode = settings.QUERY_BUDGET_MODE
+        if self.query_budget is None or mode == "off":
+            return super().dispatch(request, *args, **kwargs)
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)  # serializa dentro: cuenta todo
+        if counter.count > self.query_budget:
+            extra = {"view": type(self).__name__, "path": request.path,
+                     "queries": counter.count, "budget": self.query_budget}
+            if mode == "raise":
+                raise QueryBudgetExceeded(
+                    f"{extra['view']}: {counter.count} queries > {self.query_budget}\n" + "\n".join(counter.queries))
+            log.warning("Presupuesto de queries excedido", extra=extra)
+        return response
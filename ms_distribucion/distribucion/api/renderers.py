@@ -0,0 +1,39 @@
+# distribucion/api/renderers.py
+"""JSONRenderer con orjson si está instalado; misma salida que el de DRF (compacta, UTF-8)."""
+from __future__ import annotations
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:  # opcional: pip install orjson
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+# fechas al encoder de DRF (milisegundos, "Z"); claves no str como hace json
+_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+def _has_non_finite(obj) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # indentado, ASCII o no compacto: tal cual DRF
+        if (orjson is None or data is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):  # enteros > 64 bits, tipos sin encoder...
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"null" in ret and _has_non_finite(data):
+            # orjson escribe NaN/Infinity como null; DRF los rechaza (STRICT_JSON): que decida DRF
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF escapa los separadores de línea de JavaScript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,61 @@
+# distribucion/api/response_cache.py
+"""
+Caché de respuestas GET del read API (alias de caché "read_api").
+
+Clave = host + path + query params normalizados + formato negociado (el ETag guardado
+depende de él) + versión de cada entidad de la que depende la vista (`cache_entities`). Cualquier escritura sube la versión tras el
+commit (infrastructure/read_cache.py), así que la clave cambia y nunca se sirve una
+respuesta anterior a esa escritura; las entradas huérfanas caducan por TTL.
+"""
+from __future__ import annotations
+import hashlib, logging
+from typing import Sequence
+
+import redis
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from distribucion.infrastructure.read_cache import entity_versions
+from .conditional import VALIDATOR_HEADERS, not_modified, normalized_query
+
+log = logging.getLogger(__name__)
+
+def cache_key(host: str, path: str, params, fmt: str, versions: dict) -> str:
+    ver = ",".join(f"{e}={versions[e]}" for e in sorted(versions))
+    raw = f"{host}{path}?{normalized_query(params)}|{fmt}|{ver}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class CachedResponseMixin:
+    cache_entities: Sequence[str] = ()
+
+    def get(self, request, *args, **kwargs):
+        versions = entity_versions()
+        versions = versions.get_many(self.cache_entities) if versions and self.cache_entities else None
+        if versions is None:  # caché apagada o Redis sin respuesta: directo a la DB
+            return super().get(request, *args, **kwargs)
+
+        cache = caches["read_api"]
+        key = cache_key(request.get_host(), request.path, request.query_params,
+                        request.accepted_renderer.format, versions)
+        try:
+            data = cache.get(key)
+        except redis.RedisError:
+            log.warning("Caché de respuestas no disponible", exc_info=True)
+            return super().get(request, *args, **kwargs)
+        if data is not None:
+            # entrada vigente => sus validadores también: el 304 tampoco toca la DB
+            data, validators = data
+            response = not_modified(request, validators) or Response(data, headers=validators)
+            response["X-Cache"] = "HIT"
+            return response
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            validators = {h: response[h] for h in VALIDATOR_HEADERS if response.has_header(h)}
+            try:
+                # ReturnDict/List se guardan como dict/list
+                cache.set(key, (response.data, validators), settings.READ_CACHE_TTL_S)
+            except redis.RedisError:
+                log.warning("Caché de respuestas no disponible", exc_info=True)
+        response["X-Cache"] = "MISS"
+        return response
@@ -1,5 +1,7 @@
 # distribucion/api/serializers.py
 from rest_framework import serializers
+from distribucion.api.fast import fast_rows
+from distribucion.api.optimizer import optimize_for
 from distribucion.models import (
     Pyme, CentroDistribucion, Chofer, Producto,
     Orden, OrdenProducto, Bloque, Recepcion, Distribucion
@@ -92,16 +94,10 @@ class BloqueDetailSerializer(serializers.ModelSerializer):
         )
 
     def get_ordenes(self, obj):
-        qs = (
-            Orden.objects
-            .filter(en_bloques__bloque=obj)
-            .select_related("pyme", "origen_cd", "destino_cd", "chofer")
-            .prefetch_related("lineas__producto")
-            .only(
-                "id", "pyme_id", "origen_cd_id", "destino_cd_id",
-                "fecha_despacho", "estado_preparacion",
-                "peso_total", "volumen_total", "chofer_id"
-            )
-        )
-        # Devuelve detalle con líneas y producto (sku/nombre)
+        # joins/prefetch/columnas derivados de OrdenSerializer (líneas con producto en 1 query)
+        qs = optimize_for(Orden.objects.filter(en_bloques__bloque=obj), OrdenSerializer)
         return OrdenSerializer(qs, many=True).data
+
+    def get_ordenes_rows(self, row):
+        # camino rápido (api/fast.py): mismo queryset que get_ordenes, desde values()
+        return fast_rows(Orden.objects.filter(en_bloques__bloque=row["id"]), OrdenSerializer)
@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
-from .health import health
+from .health import health, stream_health
+from .metrics import metrics
 
 urlpatterns = [
     path("despacho/ordenes", views.DespachoOrdenList.as_view()),
@@ -11,4 +12,6 @@ urlpatterns = [
     path("consolidacion/bloques/<str:id>", views.BloqueDetail.as_view()),
     path("distribucion/ordenes", views.DistribucionOrdenList.as_view()),
     path("health", health),
+    path("health/stream", stream_health),
+    path("metrics", metrics),
 ]
\ No newline at end of file
@@ -9,66 +9,80 @@ from .filters import (
     DespachoOrdenFilter, PreparacionOrdenFilter, ExpedicionOrdenFilter,
     BloqueFilter, RecepcionFilter, DistribucionFilter
 )
+from .query_budget import QueryBudgetMixin
+from .optimizer import OptimizedQuerysetMixin
+from .fast import FastSerializationMixin
+from .response_cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
 from django.db.models import Count
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+# updated_at de todo lo que muestra OrdenSerializer (sonda de api/conditional.py)
+ORDEN_LAST_MODIFIED = ("updated_at", "pyme__updated_at", "origen_cd__updated_at",
+                       "destino_cd__updated_at", "chofer__updated_at")
+
 # Despacho
 
 @extend_schema(parameters=[
     OpenApiParameter(name='pyme',        location='query', required=False, type=str),
     OpenApiParameter(name='cd',   location='query', required=False, type=str),
 ])
-class DespachoOrdenList(generics.ListAPIView):
+class DespachoOrdenList(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.ListAPIView):
     queryset = Orden.objects.all().order_by("-fecha_despacho")
     serializer_class = OrdenSerializer
     filterset_class = DespachoOrdenFilter
     ordering_fields = ["fecha_despacho","pyme_id","origen_cd_id","destino_cd_id"]
+    keyset_ordering = ("fecha_despacho", "id")  # ?cursor= (ver api/pagination.py)
+    query_budget = 4  # sonda ETag + count + órdenes + líneas con producto (ver api/query_budget.py)
+    cache_entities = ("orden", "chofer")  # versiones que invalidan su caché (api/response_cache.py)
+    last_modified_fields = ORDEN_LAST_MODIFIED  # sonda de ETag/Last-Modified (api/conditional.py)
     def get_queryset(self):
         caps_ids = CentroDistribucion.objects.filter(tipo=TipoCentro.CAP).values('id')
         cds_ids  = CentroDistribucion.objects.filter(tipo=TipoCentro.CD).values('id')
 
-        qs = (Orden.objects
-        .select_related("pyme","origen_cd","destino_cd")
-        .filter(origen_cd_id__in=caps_ids, destino_cd_id__in=cds_ids))
+        # joins/prefetch/columnas: OptimizedQuerysetMixin, a partir de OrdenSerializer
+        qs = super().get_queryset().filter(origen_cd_id__in=caps_ids, destino_cd_id__in=cds_ids)
         return qs.order_by(*self.ordering_fields)
 # Preparación.
 @extend_schema(parameters=[
   OpenApiParameter(name='estado', location='query', required=False, type=str),
 ])
-class PreparacionOrdenList(generics.ListAPIView):
+class PreparacionOrdenList(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.ListAPIView):
     queryset = Orden.objects.all().order_by("-fecha_despacho")
     serializer_class = OrdenSerializer
     filterset_class = PreparacionOrdenFilter
     ordering_fields = ["fecha_despacho","estado_preparacion"]
+    keyset_ordering = ("-fecha_despacho", "-id")
+    query_budget = 4
+    cache_entities = ("orden", "chofer")
+    last_modified_fields = ORDEN_LAST_MODIFIED
 
 # Expedición
-class ExpedicionOrdenList(generics.ListAPIView):
-    queryset = Orden.objects.exclude(chofer_id__isnull=True).order_by("-fecha_despacho")
+class ExpedicionOrdenList(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.ListAPIView):
+    probe_base = Orden.objects.exclude(chofer_id__isnull=True)  # sonda sin el GROUP BY de bolsas_count
+    queryset = probe_base.annotate(bolsas_count=Count("bolsas", distinct=True)).order_by("-fecha_despacho")
     serializer_class = OrdenSerializer
     filterset_class = ExpedicionOrdenFilter
     ordering_fields = ["fecha_despacho","chofer_id","bolsas_count"]
-    def get_queryset(self):
-        return (
-            Orden.objects
-            .exclude(chofer_id__isnull=True)
-            .select_related("pyme", "origen_cd", "destino_cd", "chofer")
-            .prefetch_related("lineas__producto")
-            .annotate(
-                bolsas_count=Count("bolsas", distinct=True)
-            )
-            .order_by("-fecha_despacho")
-        )
-    
+    keyset_ordering = ("-fecha_despacho", "-id")
+    query_budget = 4
+    cache_entities = ("orden", "chofer")
+    last_modified_fields = (*ORDEN_LAST_MODIFIED, "bolsas__updated_at")  # bolsas_count
+
 # Recepción
 @extend_schema(parameters=[
     OpenApiParameter(name='incidencias', location='query', required=False, type=bool),
     OpenApiParameter(name='cd', location='query', required=False, type=str),
 ])
-class RecepcionOrdenList(generics.ListAPIView):
-    queryset = Recepcion.objects.select_related("orden").order_by("-fecha_recepcion")
+class RecepcionOrdenList(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.ListAPIView):
+    queryset = Recepcion.objects.all().order_by("-fecha_recepcion")
     serializer_class = RecepcionSerializer
     filterset_class = RecepcionFilter
     ordering_fields = ["fecha_recepcion","cd_id","incidencias"]
+    keyset_ordering = ("-fecha_recepcion", "-id")  # índice de fecha_recepcion (+ pk implícita en InnoDB)
+    query_budget = 3
+    cache_entities = ("recepcion",)
+    last_modified_fields = ("updated_at", "cd__updated_at")
 
 # Consolidación
 @extend_schema(parameters=[
@@ -76,23 +90,35 @@ class RecepcionOrdenList(generics.ListAPIView):
   OpenApiParameter(name='chofer', location='query', required=False, type=str),
   OpenApiParameter(name='fecha', location='query', required=False, type=str),
 ])
-class BloqueList(generics.ListAPIView):
+class BloqueList(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.ListAPIView):
     queryset = Bloque.objects.all().order_by("-fecha")
     serializer_class = BloqueListSerializer
     filterset_class = BloqueFilter
     ordering_fields = ["fecha","chofer_id","estado_completitud","total_ordenes"]
+    keyset_ordering = ("-fecha", "-id")
+    query_budget = 3
+    cache_entities = ("bloque", "chofer")
+    last_modified_fields = ("updated_at", "chofer__updated_at")
 
-class BloqueDetail(generics.RetrieveAPIView):
+class BloqueDetail(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.RetrieveAPIView):
     queryset = Bloque.objects.all()
     serializer_class = BloqueDetailSerializer
     lookup_field = "id"
+    query_budget = 4  # sonda + bloque + órdenes + líneas con producto
+    cache_entities = ("bloque", "chofer", "orden")
+    # el bloque se toca al enlazar órdenes (total_ordenes): cubre altas de enlaces
+    last_modified_fields = ("updated_at", "chofer__updated_at",
+                            *(f"bloque_ordenes__orden__{f}" for f in ORDEN_LAST_MODIFIED))
 
 # Distribución
 @extend_schema(parameters=[
   OpenApiParameter(name='estado', location='query', required=False, type=str)
 ])
-class DistribucionOrdenList(generics.ListAPIView):
-    queryset = Distribucion.objects.select_related("orden").order_by("-fecha_entrega", "-orden__fecha_despacho")
+class DistribucionOrdenList(CachedResponseMixin, ConditionalGetMixin, QueryBudgetMixin, OptimizedQuerysetMixin, FastSerializationMixin, generics.ListAPIView):
+    queryset = Distribucion.objects.all().order_by("-fecha_entrega", "-orden__fecha_despacho")
     serializer_class = DistribucionSerializer
     filterset_class = DistribucionFilter
     ordering_fields = ["fecha_entrega","estado","chofer_id"]
+    keyset_ordering = ("-fecha_entrega", "-id")  # sin entrega (NULL) al final
+    query_budget = 3
+    cache_entities = ("distribucion",)
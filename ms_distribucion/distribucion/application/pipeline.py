@@ -0,0 +1,139 @@
+# distribucion/application/pipeline.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+from django.db import transaction
+import logging
+
+from distribucion.application.use_cases.handle_bloque_consolidado import (
+    HandleBloqueConsolidadoListo, ProjectionError
+)
+from distribucion.contracts.policy import ValidationPolicy
+from distribucion.contracts.validator import ContractError
+from distribucion.infrastructure.messaging.codec import loads
+from distribucion.infrastructure.metrics import EVENTS, STAGE_SECONDS, outcome_of
+
+log = logging.getLogger(__name__)
+
+def split_poison(msgs: Sequence[Mapping], max_deliveries: int) -> Tuple[List[Mapping], List[Tuple[Mapping, str]]]:
+    """
+    Separa los reclamados del PEL que ya superan `max_deliveries` entregas (mensaje que
+    tumba al worker: sin esto se reclamaría para siempre). Devuelve (a procesar, [(msg, motivo DLQ)]).
+    """
+    if max_deliveries <= 0:
+        return list(msgs), []
+    ok, poison = [], []
+    for m in msgs:
+        n = m.get("deliveries", 0)
+        if n > max_deliveries:
+            log.error("Mensaje venenoso a DLQ", extra={"id": m["id"], "deliveries": n})
+            EVENTS.inc(outcome="poison")
+            poison.append((m, f"poison:entregado {n} veces"))
+        else:
+            ok.append(m)
+    return ok, poison
+
+@dataclass
+class EventPipeline:
+    """
+    Camino mensaje → evento → proyección compartido por los engines del consumer.
+    Cada paso devuelve el motivo para la DLQ ("json:", "contract:", "projection:",
+    "unexpected:") o None si el mensaje se puede ackear sin más. Si la política no
+    validó `data`, los fallos de proyección llevan además el prefijo "unvalidated:".
+    """
+    uc: HandleBloqueConsolidadoListo
+    policy: ValidationPolicy = field(default_factory=ValidationPolicy)
+
+    def prepare(self, msg: Mapping) -> tuple[Dict[str, Any] | None, str | None]:
+        """Decodifica y valida el mensaje. Devuelve (evt, error); evt=None y error=None => sin 'data'."""
+        mid = msg["id"]
+        raw = msg.get("data")
+        if not raw:
+            log.warning("Mensaje sin 'data'", extra={"id": mid})
+            return None, None
+
+        try:
+            with STAGE_SECONDS.time(stage="decode"):
+                evt = loads(raw)  # str o bytes (modo bytes del consumer)
+        except Exception as e:
+            log.exception("JSON inválido", extra={"id": mid})
+            EVENTS.inc(outcome="json")
+            return None, f"json:{e}"
+        if not isinstance(evt, dict):
+            # JSON válido pero no objeto ([], "x", 1): la validación asume un dict
+            log.error("CloudEvent no es un objeto JSON", extra={"id": mid})
+            EVENTS.inc(outcome="contract")
+            return None, f"contract:CloudEvent inválido: se esperaba un objeto JSON, llegó {type(evt).__name__}"
+
+        # ✅ Validación contrato (CE + data, según política del dataschema)
+        try:
+            self.policy.validate(evt, timer=lambda stage: STAGE_SECONDS.time(stage=stage))
+        except ContractError as e:
+            log.exception("Contrato inválido", extra={"id": mid, "cloudevent_id": evt.get("id")})
+            EVENTS.inc(outcome="contract")
+            return None, f"contract:{e}"
+        return evt, None
+
+    def project(self, mid: str, evt: Dict[str, Any]) -> str | None:
+        """Ejecuta el caso de uso en su propia transacción (o savepoint). Devuelve el error o None."""
+        try:
+            with STAGE_SECONDS.time(stage="projection"), transaction.atomic():
+                res = self.uc(evt)
+        except Exception as e:
+            res = e
+        return self._outcome(mid, evt, res)
+
+    def _outcome(self, mid: str, evt: Dict[str, Any], res: dict | Exception) -> str | None:
+        """Registra el resultado de la proyección y lo traduce a motivo de DLQ."""
+        reason = self._reason(mid, evt, res)
+        EVENTS.inc(outcome=outcome_of(reason, duplicate=isinstance(res, dict) and res.get("status") == "duplicate"))
+        return reason
+
+    def _reason(self, mid: str, evt: Dict[str, Any], res: dict | Exception) -> str | None:
+        if not isinstance(res, Exception):
+            log.info("OK", extra={"id": mid, "cloudevent_id": evt.get("id"), "res": res})
+            return None
+        if isinstance(res, ProjectionError):
+            log.error("Proyección inválida", exc_info=res, extra={"id": mid, "cloudevent_id": evt.get("id")})
+            reason = f"projection:{res}"
+        else:
+            log.error("Error inesperado", exc_info=res, extra={"id": mid})
+            reason = f"unexpected:{res}"
+        if not self.policy.validates_data(evt):
+            # validación omitida por política: motivo propio para distinguirlo en la DLQ
+            self.policy.record_unvalidated_failure(evt)
+            return f"unvalidated:{reason}"
+        return reason
+
+    def process(self, msg: Mapping) -> str | None:
+        """Procesa un mensaje con su propia transacción. Devuelve el error para DLQ o None."""
+        evt, err = self.prepare(msg)
+        if evt is not None:
+            # 🧩 Proyección
+            err = self.project(msg["id"], evt)
+        return err
+
+    def process_batch(self, msgs: Sequence[Mapping]) -> list[str | None] | None:
+        """
+        Proyecta el lote completo en una única transacción; cada mensaje corre en
+        su propio savepoint, así un evento inválido va solo a la DLQ.
+        Devuelve los errores por mensaje, o None si el lote se revirtió.
+        """
+        errors: list[str | None] = []
+        try:
+            with transaction.atomic():
+                prepared = []
+                for i, msg in enumerate(msgs):
+                    evt, err = self.prepare(msg)
+                    errors.append(err)
+                    if evt is not None:
+                        prepared.append((i, evt))
+                # dedup/marcado set-based; un savepoint por evento ("projection" mide el lote)
+                with STAGE_SECONDS.time(stage="projection"):
+                    results = self.uc.handle_many([evt for _, evt in prepared], isolate=transaction.atomic)
+                for (i, evt), res in zip(prepared, results):
+                    errors[i] = self._outcome(msgs[i]["id"], evt, res)
+        except Exception:
+            log.exception("Lote revertido", extra={"size": len(msgs)})
+            return None
+        return errors
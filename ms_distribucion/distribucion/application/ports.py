@@ -8,19 +8,24 @@ class ReadModelRepo(Protocol):
     # idempotencia
     def event_already_processed(self, event_id: str) -> bool: ...
     def mark_event_processed(self, event_id: str) -> None: ...
+    # idempotencia por lote (1 consulta / 1 INSERT IGNORE)
+    def processed_event_ids(self, event_ids: Iterable[str]) -> set[str]: ...
+    def mark_events_processed(self, event_ids: Iterable[str]) -> None: ...
 
     # catálogos mínimos
     def upsert_chofer(self, chofer_id: str, nombre: str) -> None: ...
 
     # bloque
+    upsert_sets_incompleto: bool  # True => upsert_bloque ya deja el bloque INCOMPLETO
     def upsert_bloque(self, bloque_id: str, fecha: datetime,
                       chofer_id: str, chofer_nombre: str) -> None: ...
     def set_bloque_incompleto(self, bloque_id: str) -> None: ...
-    def update_bloque_total_ordenes(self, bloque_id: str) -> None: ...
+    def add_bloque_total_ordenes(self, bloque_id: str, delta: int) -> None: ...
+    def update_bloque_total_ordenes(self, bloque_id: str) -> None: ...  # recálculo completo (reconcile)
 
     # órdenes (no se crean; solo se verifican/enlazan)
     def existing_order_ids(self, ids: Iterable[str]) -> list[str]: ...
-    def bulk_link_bloque_orden(self, bloque_id: str, order_ids: Iterable[str]) -> int: ...
+    def bulk_link_bloque_orden(self, bloque_id: str, order_ids: Iterable[str]) -> int: ...  # nº insertadas
 
 # Consumo de eventos (p. ej., Redis)
 @runtime_checkable
@@ -28,3 +33,24 @@ class EventConsumer(Protocol):
     def read(self, count: int = 100, block_ms: int = 5000) -> Iterable[Mapping]: ...
     def ack(self, message_id: str) -> None: ...
     def dead_letter(self, payload: str, error: str) -> None: ...
+    # variantes por lote: nº de round trips constante, no lineal en el tamaño del lote
+    def ack_many(self, message_ids: Iterable[str]) -> None: ...
+    def dead_letter_many(self, entries: Iterable[tuple[str, str]]) -> None: ...
+    # recuperación de pendientes de consumers caídos (PEL)
+    def claim_stale(self, min_idle_ms: int, count: int = 100) -> Iterable[Mapping]: ...
+
+# Variante asíncrona (redis.asyncio) para el engine concurrente
+@runtime_checkable
+class AsyncEventConsumer(Protocol):
+    async def read(self, count: int = 100, block_ms: int = 5000) -> list[Mapping]: ...
+    async def ack_many(self, message_ids: Iterable[str]) -> None: ...
+    async def dead_letter_many(self, entries: Iterable[tuple[str, str]]) -> None: ...
+    async def claim_stale(self, min_idle_ms: int, count: int = 100) -> list[Mapping]: ...
+
+# DLQ como stream plano (replay_dlq); entradas {"id", "data", "error"}
+@runtime_checkable
+class DeadLetterQueue(Protocol):
+    def last_id(self) -> str | None: ...
+    def scan(self, after: str, until: str, count: int = 1000) -> list[Mapping]: ...  # ids > after y <= until
+    def append_many(self, entries: Iterable[tuple[str, str]]) -> None: ...
+    def delete_many(self, message_ids: Iterable[str]) -> int: ...
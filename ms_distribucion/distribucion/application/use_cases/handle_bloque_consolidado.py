@@ -1,7 +1,7 @@
 # distribucion/application/use_cases/handle_bloque_consolidado.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Callable, ContextManager, Dict, List, Sequence
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
@@ -21,6 +21,40 @@ class HandleBloqueConsolidadoListo:
         if not evt_id: raise ContractError("CloudEvent sin id")
         if self.repo.event_already_processed(evt_id):
             return {"id": evt_id, "status": "duplicate"}
+        res = self._project(ce)
+        self.repo.mark_event_processed(evt_id)
+        return res
+
+    def handle_many(self, ces: Sequence[Dict[str, Any]], *,
+                    isolate: Callable[[], ContextManager]) -> List[dict | Exception]:
+        """
+        Variante por lote: dedup con una sola consulta y marcado con un único insert.
+        `isolate` envuelve cada proyección y debe deshacer lo escrito por un evento que
+        falla (p. ej. transaction.atomic => savepoint); sin él, sus escrituras parciales
+        se confirmarían con el resto del lote. Lo aporta quien abre la transacción.
+        Devuelve, por evento y en orden, el resultado o la excepción que lo rechazó.
+        """
+        done = self.repo.processed_event_ids([ce["id"] for ce in ces if ce.get("id")])
+        results: List[dict | Exception] = []
+        ok_ids: List[str] = []
+        for ce in ces:
+            evt_id = ce.get("id")
+            try:
+                if not evt_id: raise ContractError("CloudEvent sin id")
+                if evt_id in done:
+                    results.append({"id": evt_id, "status": "duplicate"})
+                    continue
+                with isolate():
+                    results.append(self._project(ce))
+                done.add(evt_id)  # repetido dentro del mismo lote => duplicate
+                ok_ids.append(evt_id)
+            except Exception as e:
+                results.append(e)
+        self.repo.mark_events_processed(ok_ids)
+        return results
+
+    def _project(self, ce: Dict[str, Any]) -> dict:
+        evt_id = ce["id"]
         if ce.get("type") != "logistrack.distribucion.BloqueConsolidadoListo.v2":
             raise ContractError("type inválido")
 
@@ -34,7 +68,8 @@ class HandleBloqueConsolidadoListo:
         # upserts mínimos + forzar INCOMPLETO
         self.repo.upsert_chofer(ch_id, ch_nom)
         self.repo.upsert_bloque(b_id, b_fecha, ch_id, ch_nom)
-        self.repo.set_bloque_incompleto(b_id)
+        if not self.repo.upsert_sets_incompleto:
+            self.repo.set_bloque_incompleto(b_id)
 
         # enlazar órdenes existentes
         ids = [str(o["id"]) for o in data["ordenes"] if o.get("id")]
@@ -44,8 +79,7 @@ class HandleBloqueConsolidadoListo:
             raise ProjectionError(f"órdenes inexistentes: {faltantes[:5]}{'…' if len(faltantes)>5 else ''}")
 
         linked = self.repo.bulk_link_bloque_orden(b_id, list(existentes))
-        self.repo.update_bloque_total_ordenes(b_id)
-        self.repo.mark_event_processed(evt_id)
+        self.repo.add_bloque_total_ordenes(b_id, linked)
         return {"id": evt_id, "bloque_id": b_id, "linked": linked, "missing": len(faltantes)}
 
 def _to_dt(s: str):
@@ -0,0 +1,193 @@
+# distribucion/contracts/compiler.py
+"""
+Compila JSON Schemas de contratos (subconjunto de draft 2020-12) a funciones Python
+especializadas `check(instance) -> bool`, al estilo de fastjsonschema.
+
+Solo decide aceptar/rechazar: el mensaje de error lo sigue dando Draft202012Validator.
+Cualquier keyword fuera del subconjunto lanza Unsupported y el llamador usa el
+validador genérico para ese schema.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Tuple
+import re
+
+from jsonschema import FormatChecker
+
+# keywords sin efecto en la validación
+_ANNOTATIONS = {"$schema", "$id", "$defs", "$comment", "title", "description", "examples", "default"}
+
+_TYPE_CHECKS = {
+    "object":  "isinstance({v}, dict)",
+    "array":   "isinstance({v}, list)",
+    "string":  "isinstance({v}, str)",
+    # draft 2020-12: 1.0 es integer; bool nunca es número
+    "integer": "((isinstance({v}, int) and not isinstance({v}, bool)) or (isinstance({v}, float) and {v}.is_integer()))",
+    "number":  "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "null":    "{v} is None",
+}
+
+_BY_TYPE = {
+    "string": {"minLength", "maxLength", "pattern"},
+    "number": {"minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"},
+    "object": {"required", "properties", "additionalProperties"},
+    "array":  {"minItems", "maxItems", "items"},
+}
+_GENERIC = {"type", "enum", "const", "format", "$ref"}
+_SUPPORTED = _GENERIC | set().union(*_BY_TYPE.values())
+
+class Unsupported(Exception): ...
+
+class _Codegen:
+    def __init__(self, load: Callable[[str], Dict[str, Any]]):
+        self.load = load
+        self.consts: Dict[str, Any] = {}
+        self.funcs: Dict[Tuple[str, str], str] = {}
+        self.pending: List[Tuple[str, str, Dict[str, Any], Dict[str, Any]]] = []
+        self.out: List[str] = []
+        self._n = 0
+
+    # ---- helpers ----
+    def _name(self, prefix: str) -> str:
+        self._n += 1
+        return f"{prefix}{self._n}"
+
+    def const(self, value: Any) -> str:
+        name = self._name("_c")
+        self.consts[name] = value
+        return name
+
+    def func_for(self, uri: str, pointer: str, doc: Dict[str, Any]) -> str:
+        key = (uri, pointer)
+        if key not in self.funcs:
+            self.funcs[key] = self._name("_v")
+            self.pending.append((self.funcs[key], pointer, doc, {"uri": uri}))
+        return self.funcs[key]
+
+    def ref(self, ref: str, base_uri: str, doc: Dict[str, Any]) -> str:
+        uri, _, frag = ref.partition("#")
+        if uri:
+            doc, base_uri = self.load(uri), uri
+        return self.func_for(base_uri, frag, doc)
+
+    # ---- emisión ----
+    def build(self, uri: str, doc: Dict[str, Any]) -> str:
+        root = self.func_for(uri, "", doc)
+        while self.pending:
+            name, pointer, d, ctx = self.pending.pop()
+            self.out.append(f"def {name}(x):")
+            self.emit(_resolve_pointer(d, pointer), "x", 1, ctx["uri"], d)
+            self.out.append("    return True")
+            self.out.append("")
+        self.out.append(f"check = {root}")
+        return "\n".join(self.out)
+
+    def line(self, indent: int, s: str) -> None:
+        self.out.append("    " * indent + s)
+
+    def emit(self, schema: Any, v: str, ind: int, base_uri: str, doc: Dict[str, Any]) -> None:
+        if schema is True or schema == {}:
+            return
+        if schema is False:
+            self.line(ind, "return False")
+            return
+        if not isinstance(schema, dict):
+            raise Unsupported(f"schema no soportado: {schema!r}")
+        unknown = set(schema) - _SUPPORTED - _ANNOTATIONS
+        if unknown:
+            raise Unsupported(f"keywords no soportadas: {sorted(unknown)}")
+        if "$id" in schema and doc is not schema:
+            raise Unsupported("$id anidado")
+
+        if "$ref" in schema:
+            fn = self.ref(schema["$ref"], base_uri, doc)
+            self.line(ind, f"if not {fn}({v}): return False")
+
+        types = schema.get("type")
+        if types is not None:
+            types = [types] if isinstance(types, str) else list(types)
+            if any(t not in _TYPE_CHECKS for t in types):
+                raise Unsupported(f"type {types}")
+            cond = " or ".join(_TYPE_CHECKS[t].format(v=v) for t in types)
+            self.line(ind, f"if not ({cond}): return False")
+
+        if "const" in schema:
+            c = schema["const"]
+            if not isinstance(c, str):
+                raise Unsupported("const no string")
+            self.line(ind, f"if not (isinstance({v}, str) and {v} == {self.const(c)}): return False")
+
+        if "enum" in schema:
+            values = schema["enum"]
+            if not all(isinstance(e, str) for e in values):
+                raise Unsupported("enum no string")
+            self.line(ind, f"if not (isinstance({v}, str) and {v} in {self.const(frozenset(values))}): return False")
+
+        if "format" in schema:
+            # mismo FormatChecker que el validador genérico => mismo veredicto
+            self.line(ind, f"if not _fmt({v}, {schema['format']!r}): return False")
+
+        only = types[0] if types and len(types) == 1 else None
+        for kind, kws in _BY_TYPE.items():
+            present = [k for k in schema if k in kws]
+            if not present:
+                continue
+            guard_type = "number" if kind == "number" and only == "integer" else only
+            if guard_type == kind:
+                self._emit_kind(kind, schema, v, ind, base_uri, doc)
+            else:
+                self.line(ind, f"if {_TYPE_CHECKS[kind].format(v=v)}:")
+                self._emit_kind(kind, schema, v, ind + 1, base_uri, doc)
+
+    def _emit_kind(self, kind: str, s: Dict[str, Any], v: str, ind: int, base_uri: str, doc) -> None:
+        if kind == "string":
+            if "minLength" in s: self.line(ind, f"if len({v}) < {int(s['minLength'])}: return False")
+            if "maxLength" in s: self.line(ind, f"if len({v}) > {int(s['maxLength'])}: return False")
+            if "pattern" in s:
+                rx = self.const(re.compile(s["pattern"]))
+                self.line(ind, f"if {rx}.search({v}) is None: return False")
+        elif kind == "number":
+            for kw, op in (("minimum", "<"), ("maximum", ">"), ("exclusiveMinimum", "<="), ("exclusiveMaximum", ">=")):
+                if kw in s:
+                    self.line(ind, f"if {v} {op} {self.const(s[kw])}: return False")
+        elif kind == "array":
+            if "minItems" in s: self.line(ind, f"if len({v}) < {int(s['minItems'])}: return False")
+            if "maxItems" in s: self.line(ind, f"if len({v}) > {int(s['maxItems'])}: return False")
+            if "items" in s:
+                item = self._name("_i")
+                self.line(ind, f"for {item} in {v}:")
+                before = len(self.out)
+                self.emit(s["items"], item, ind + 1, base_uri, doc)
+                if len(self.out) == before:
+                    self.out.pop()  # items: true/{} => sin bucle
+        elif kind == "object":
+            if s.get("required"):
+                self.line(ind, f"if not {self.const(frozenset(s['required']))}.issubset({v}): return False")
+            props = s.get("properties", {})
+            for key, sub in props.items():
+                pv = self._name("_p")
+                self.line(ind, f"if {key!r} in {v}:")
+                self.line(ind + 1, f"{pv} = {v}[{key!r}]")
+                self.emit(sub, pv, ind + 1, base_uri, doc)
+            extra = s.get("additionalProperties", True)
+            if extra is False:
+                self.line(ind, f"if not {self.const(frozenset(props))}.issuperset({v}): return False")
+            elif extra is not True:
+                raise Unsupported("additionalProperties con schema")
+
+def _resolve_pointer(doc: Dict[str, Any], pointer: str) -> Any:
+    node: Any = doc
+    for part in [p for p in pointer.split("/") if p]:
+        part = part.replace("~1", "/").replace("~0", "~")
+        node = node[int(part)] if isinstance(node, list) else node[part]
+    return node
+
+def compile_schema(uri: str, schema: Dict[str, Any], load: Callable[[str], Dict[str, Any]],
+                   format_checker: FormatChecker) -> Callable[[Any], bool]:
+    """Genera y compila el código del validador. Lanza Unsupported si el schema sale del subconjunto."""
+    gen = _Codegen(load)
+    source = gen.build(uri, schema)
+    namespace: Dict[str, Any] = dict(gen.consts)
+    namespace["_fmt"] = format_checker.conforms
+    exec(compile(source, f"<contract {uri}>", "exec"), namespace)
+    return namespace["check"]
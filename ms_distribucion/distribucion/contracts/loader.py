@@ -1,8 +1,10 @@
 # distribucion/contracts/loader.py
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, Any, Iterable
-import json, os
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import json, logging, os, threading, time
+
+log = logging.getLogger(__name__)
 
 CONTRACT_PREFIX = "https://contracts.logistrack/schemas/"
 
@@ -34,13 +36,81 @@ def _bases() -> Iterable[Path]:
     yield EXT_SCHEMAS
     yield APP_SCHEMAS
 
+# segundos entre comprobaciones de mtime (0 => en cada llamada)
+RELOAD_INTERVAL_S = float(os.environ.get("CONTRACTS_RELOAD_S", "5"))
+
+class SchemaRegistry:
+    """
+    Índice en memoria URI -> schema parseado, construido recorriendo las bases una vez.
+    La URI sale de la ruta relativa (igual que _uri_to_relpath, no del $id). Solo se
+    relee un fichero si cambia su mtime; `generation` sube con cada cambio.
+    Los documentos son compartidos: no mutarlos.
+    """
+    def __init__(self, bases: Callable[[], Iterable[Path]] = _bases, interval_s: float = RELOAD_INTERVAL_S):
+        self._bases = bases
+        self.interval_s = interval_s
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Tuple[Path, int]] = {}   # uri -> (path, mtime_ns)
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self.generation = 0
+
+    def get(self, uri: str) -> Dict[str, Any]:
+        doc = self._docs.get(uri)
+        if doc is not None:
+            return doc
+        _uri_to_relpath(uri)  # valida prefijo
+        self.maybe_refresh()
+        doc = self._docs.get(uri)
+        if doc is None:
+            tried = [str(b / _uri_to_relpath(uri)) for b in self._bases()]
+            raise FileNotFoundError(f"No se reconoce el schema: {uri} | tried={tried}")
+        return doc
+
+    def maybe_refresh(self) -> bool:
+        """Re-escanea como mucho cada interval_s; True si algún schema cambió."""
+        if time.monotonic() - self._checked_at < self.interval_s:
+            return False
+        return self.refresh()
+
+    def refresh(self) -> bool:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            found: Dict[str, Tuple[Path, int]] = {}
+            for base in reversed(list(self._bases())):   # la base preferida pisa a las demás
+                if base.is_dir():
+                    for path in base.rglob("*.json"):
+                        rel = path.relative_to(base).as_posix()
+                        found[CONTRACT_PREFIX + rel] = (path, path.stat().st_mtime_ns)
+            if found == self._files:
+                return False
+            docs = {}
+            for uri, entry in list(found.items()):
+                old = self._docs.get(uri)
+                if old is not None and self._files.get(uri) == entry:
+                    docs[uri] = old
+                    continue
+                try:
+                    with entry[0].open("r", encoding="utf-8") as f:
+                        docs[uri] = json.load(f)
+                except ValueError:
+                    # fichero a medio escribir: se mantiene la versión anterior y se reintenta luego
+                    log.warning("Schema ilegible, se reintentará", extra={"path": str(entry[0])})
+                    if old is not None:
+                        docs[uri] = old
+                        found[uri] = self._files[uri]
+                    else:
+                        del found[uri]
+            if found == self._files:
+                return False
+            self._docs, self._files = docs, found
+            self.generation += 1
+            return True
+
+    def uris(self) -> List[str]:
+        return sorted(self._docs)
+
+REGISTRY = SchemaRegistry()
+
 def load_schema_by_uri(uri: str) -> Dict[str, Any]:
-    rel = _uri_to_relpath(uri)
-    tried = []
-    for base in _bases():
-        path = base / rel
-        tried.append(str(path))
-        if path.is_file():
-            with path.open("r", encoding="utf-8") as f:
-                return json.load(f)
-    raise FileNotFoundError(f"No se reconoce el schema: {uri} | tried={tried}")
+    return REGISTRY.get(uri)
@@ -0,0 +1,113 @@
+# distribucion/contracts/policy.py
+"""
+Política de validación por dataschema, para productores internos de confianza en picos:
+
+  full        CE + data (comportamiento por defecto)
+  envelope    solo el sobre CloudEvent; `data` solo se exige objeto
+  sample:<p>  validación completa en el p% de los eventos, sobre en el resto
+
+El muestreo es determinista por id de CloudEvent: el mismo evento recibe siempre la
+misma decisión, así el pipeline sabe después si `data` se validó (motivo DLQ propio).
+"""
+from __future__ import annotations
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, Mapping
+import threading
+import zlib
+
+from distribucion.infrastructure.metrics import REGISTRY
+from .validator import ContractError, validate_cloudevent, validate_data, validate_envelope
+
+MODES = ("full", "envelope", "sample")
+
+POLICY_EVENTS = REGISTRY.counter(
+    "distribucion_contracts_policy_total",
+    "Eventos por modo de validación: events, data_validated, rejected, unvalidated_failures.",
+    ["mode", "stat"])
+
+@dataclass(frozen=True)
+class ValidationMode:
+    kind: str
+    percent: float = 100.0
+
+    @classmethod
+    def parse(cls, raw: str) -> "ValidationMode":
+        kind, _, pct = raw.strip().partition(":")
+        if kind not in MODES:
+            raise ValueError(f"modo de validación desconocido: {raw!r}")
+        if kind == "sample":
+            p = float(pct or 0)
+            if not 0 <= p <= 100:
+                raise ValueError(f"porcentaje fuera de rango: {raw!r}")
+            return cls(kind, p)
+        return cls(kind)
+
+class ValidationPolicy:
+    def __init__(self, per_schema: Mapping[str, str] | None = None, default: str = "full"):
+        self.default = ValidationMode.parse(default)
+        self.per_schema = {uri: ValidationMode.parse(m) for uri, m in (per_schema or {}).items()}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {
+            m: {"events": 0, "data_validated": 0, "rejected": 0, "unvalidated_failures": 0} for m in MODES
+        }
+
+    def mode_for(self, evt: Mapping[str, Any]) -> ValidationMode:
+        return self.per_schema.get(evt.get("dataschema"), self.default)
+
+    def validates_data(self, evt: Mapping[str, Any]) -> bool:
+        mode = self.mode_for(evt)
+        if mode.kind == "full":
+            return True
+        if mode.kind == "envelope":
+            return False
+        bucket = zlib.crc32(str(evt.get("id", "")).encode("utf-8")) % 10000
+        return bucket < mode.percent * 100
+
+    def validate(self, evt: Dict[str, Any],
+                 timer: Callable[[str], ContextManager] = lambda _stage: nullcontext()) -> None:
+        """
+        Aplica la política; lanza ContractError igual que la validación completa.
+        `timer(etapa)` envuelve cada paso ("validate_ce", "validate_data") para medirlo.
+        """
+        mode = self.mode_for(evt)
+        full = self.validates_data(evt)
+        try:
+            if full:
+                with timer("validate_ce"):
+                    validate_cloudevent(evt)
+                with timer("validate_data"):
+                    validate_data(evt.get("data") or {}, evt.get("dataschema"))
+            else:
+                with timer("validate_ce"):
+                    validate_envelope(evt)
+        except ContractError:
+            self._count(mode.kind, full, rejected=True)
+            raise
+        self._count(mode.kind, full)
+
+    def record_unvalidated_failure(self, evt: Mapping[str, Any]) -> None:
+        """Fallo de proyección en un evento cuyo `data` no se validó."""
+        kind = self.mode_for(evt).kind
+        with self._lock:
+            self._counters[kind]["unvalidated_failures"] += 1
+        POLICY_EVENTS.inc(mode=kind, stat="unvalidated_failures")
+
+    def _count(self, kind: str, full: bool, rejected: bool = False) -> None:
+        with self._lock:
+            c = self._counters[kind]
+            c["events"] += 1
+            c["data_validated"] += full
+            c["rejected"] += rejected
+        POLICY_EVENTS.inc(mode=kind, stat="events")
+        if full:
+            POLICY_EVENTS.inc(mode=kind, stat="data_validated")
+        if rejected:
+            POLICY_EVENTS.inc(mode=kind, stat="rejected")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                kind: {**c, "rejection_rate": round(c["rejected"] / c["events"], 4) if c["events"] else 0.0}
+                for kind, c in self._counters.items()
+            }
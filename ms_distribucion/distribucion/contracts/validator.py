@@ -1,13 +1,49 @@
 # distribucion/contracts/validator.py
 from __future__ import annotations
 from functools import lru_cache
-from typing import Dict, Any, Set
+from typing import Dict, Any, Iterable, Set
+import copy, logging, os
 from jsonschema import Draft202012Validator, FormatChecker, RefResolver
 
-from .loader import load_schema_by_uri, CONTRACT_PREFIX
+from distribucion.infrastructure import metrics
+from .compiler import Unsupported, compile_schema
+from .loader import REGISTRY, load_schema_by_uri, CONTRACT_PREFIX
+
+log = logging.getLogger(__name__)
+
+# CE v2.0 local
+CE_URI = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/2.0/cloudevent.json"
+CE_CACHE_SIZE = 32
+
+# fast path generado (compiler.py); CONTRACTS_FAST_VALIDATION=0 fuerza el validador genérico
+FAST_VALIDATION = os.environ.get("CONTRACTS_FAST_VALIDATION", "1") == "1"
+
+# hits/misses por dataschema en /metrics; la etiqueta se acota para URIs arbitrarias del productor
+CACHE_LOOKUPS = metrics.REGISTRY.counter(
+    "distribucion_contracts_validator_cache_total",
+    "Consultas a las caches de validadores por cache, dataschema y resultado (hit/miss).",
+    ["cache", "dataschema", "result"])
+SCHEMA_LABELS_MAX = 64
+_schema_labels: Set[str] = set()
 
 class ContractError(Exception): ...
 
+class CompiledValidator:
+    """
+    Validador generado para el camino caliente. Solo decide si acepta: ante un rechazo
+    re-valida con el genérico, que da el mensaje y tiene la última palabra.
+    """
+    def __init__(self, check, fallback: Draft202012Validator):
+        self.check = check
+        self.fallback = fallback
+        self.schema = fallback.schema
+
+    def validate(self, instance: Any) -> None:
+        if self.check(instance):
+            return
+        self.fallback.validate(instance)
+        log.warning("Fast path y validador genérico discrepan; se acepta", extra={"schema": self.schema.get("$id")})
+
 def _collect_remote_refs(schema: Any) -> Set[str]:
     found: Set[str] = set()
     def walk(node: Any):
@@ -23,7 +59,7 @@ def _collect_remote_refs(schema: Any) -> Set[str]:
     return found
 
 def _make_validator(schema_uri: str,
-                    extra_store: Dict[str, Dict[str, Any]] | None = None) -> Draft202012Validator:
+                    extra_store: Dict[str, Dict[str, Any]] | None = None) -> Draft202012Validator | CompiledValidator:
     schema = load_schema_by_uri(schema_uri)
 
     # Pre-carga $ref remotos que aparezcan dentro del schema
@@ -48,37 +84,111 @@ def _make_validator(schema_uri: str,
     }
 
     resolver = RefResolver.from_schema(schema, store=store, handlers=handlers)
-    return Draft202012Validator(schema, resolver=resolver, format_checker=FormatChecker())
+    return _with_fast_path(schema_uri, Draft202012Validator(schema, resolver=resolver, format_checker=FormatChecker()))
+
+def _with_fast_path(schema_uri: str, validator: Draft202012Validator):
+    if not FAST_VALIDATION:
+        return validator
+    try:
+        check = compile_schema(schema_uri, validator.schema, load_schema_by_uri, validator.format_checker)
+    except (Unsupported, FileNotFoundError, KeyError) as e:
+        log.info("Schema fuera del subconjunto compilable; validador genérico", extra={"schema": schema_uri, "motivo": str(e)})
+        return validator
+    return CompiledValidator(check, validator)
 
 @lru_cache(maxsize=16)
-def _validator_for(schema_uri: str) -> Draft202012Validator:
+def _validator_for(schema_uri: str) -> Draft202012Validator | CompiledValidator:
     return _make_validator(schema_uri)
 
-def validate_cloudevent(evt: dict) -> None:
-    # CE v2.0 local
-    ce_uri = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/2.0/cloudevent.json"
+@lru_cache(maxsize=CE_CACHE_SIZE)
+def _cloudevent_validator_for(dataschema_uri: str | None) -> Draft202012Validator | CompiledValidator:
+    """Validador CE compilado para un dataschema; un miss implica I/O + compilación."""
+    log.info("Compilando validador CloudEvent", extra={"dataschema": dataschema_uri})
 
     # Si el CE schema tiene $ref a dataschema, le pasamos el schema de data en el store
     extra_store: Dict[str, Dict[str, Any]] = {}
-    ds = evt.get("dataschema")
-    if isinstance(ds, str):
+    if dataschema_uri is not None:
         try:
-            extra_store[ds] = load_schema_by_uri(ds)
+            extra_store[dataschema_uri] = load_schema_by_uri(dataschema_uri)
         except FileNotFoundError as e:
             # Error claro y offline (no intentes ir a la red)
             raise ContractError(
                 "CloudEvent inválido: dataschema no disponible localmente. "
                 f"{e}"
             )
+    return _make_validator(CE_URI, extra_store=extra_store)
+
+@lru_cache(maxsize=1)
+def _envelope_validator() -> Draft202012Validator | CompiledValidator:
+    """CE sin el $ref a data (solo se exige objeto): política "envelope"."""
+    schema = copy.deepcopy(load_schema_by_uri(CE_URI))
+    schema["properties"]["data"] = {"type": "object"}
+    return _with_fast_path(CE_URI, Draft202012Validator(schema, format_checker=FormatChecker()))
+
+def _sync_registry() -> None:
+    # comparación barata de reloj; si algún schema cambió en disco, se recompilan los validadores
+    if REGISTRY.maybe_refresh():
+        _cloudevent_validator_for.cache_clear()
+        _validator_for.cache_clear()
+        _envelope_validator.cache_clear()
+
+def _schema_label(uri: str | None) -> str:
+    if uri is None:
+        return "none"
+    if uri not in _schema_labels and len(_schema_labels) >= SCHEMA_LABELS_MAX:
+        return "otro"
+    _schema_labels.add(uri)
+    return uri
 
+def _cached(cache: str, fn, uri: str | None):
+    """Consulta la cache `fn` y cuenta hit/miss (aproximado si otro hilo compila a la vez)."""
+    before = fn.cache_info().misses
+    try:
+        return fn(uri)
+    finally:
+        result = "miss" if fn.cache_info().misses != before else "hit"
+        CACHE_LOOKUPS.inc(cache=cache, dataschema=_schema_label(uri), result=result)
+
+def validate_cloudevent(evt: dict) -> None:
+    _sync_registry()
+    ds = evt.get("dataschema")
+    validator = _cached("cloudevent", _cloudevent_validator_for, ds if isinstance(ds, str) else None)
     try:
-        validator = _make_validator(ce_uri, extra_store=extra_store)
         validator.validate(evt)
     except Exception as e:
         raise ContractError(f"CloudEvent inválido: {e}")
 
+def validate_envelope(evt: dict) -> None:
+    _sync_registry()
+    try:
+        _envelope_validator().validate(evt)
+    except Exception as e:
+        raise ContractError(f"CloudEvent inválido: {e}")
+
+def warm_validators(dataschema_uris: Iterable[str]) -> None:
+    """Precompila envelope + data para los dataschemas esperados (arranque del consumer)."""
+    for uri in dataschema_uris:
+        try:
+            _cached("cloudevent", _cloudevent_validator_for, uri)
+            _cached("data", _validator_for, uri)
+        except (ContractError, FileNotFoundError):
+            log.warning("No se pudo precompilar el validador", extra={"dataschema": uri})
+    try:
+        _envelope_validator()
+    except FileNotFoundError:
+        log.warning("No se pudo precompilar el validador de sobre", extra={"schema": CE_URI})
+
+def validator_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hits/misses de las caches de validadores; misses crecientes => versión de schema inesperada."""
+    out = {}
+    for name, fn in (("cloudevent", _cloudevent_validator_for), ("data", _validator_for)):
+        info = fn.cache_info()
+        out[name] = {"hits": info.hits, "misses": info.misses,
+                     "size": info.currsize, "maxsize": info.maxsize}
+    return out
+
 def validate_data(data: dict, dataschema_uri: str) -> None:
     try:
-        _validator_for(dataschema_uri).validate(data)
+        _cached("data", _validator_for, dataschema_uri).validate(data)
     except Exception as e:
         raise ContractError(f"Data inválida: {e}")
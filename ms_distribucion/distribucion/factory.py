@@ -10,6 +10,7 @@ from django.utils import timezone
 
 from faker import Faker
 
+from .infrastructure.read_cache import ENTITIES, entity_versions
 from .models import (
     Chofer, Pyme, CentroDistribucion, Producto,
     Orden, OrdenProducto, Recepcion, Distribucion, Bolsa,
@@ -266,6 +267,11 @@ def run(verbose: bool = True):
         if nuevos:
             Distribucion.objects.bulk_create(nuevos, ignore_conflicts=True)
 
+    # el seed toca todo el read model: invalida la caché del API tras el commit
+    versions = entity_versions()
+    if versions is not None:
+        versions.bump_after_commit(ENTITIES)
+
     if verbose:
         print("[seed] Listo ✅")
         print_summary()
@@ -0,0 +1,150 @@
+# distribucion/infrastructure/messaging/async_engine.py
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Mapping, Sequence
+import asyncio, logging, time
+
+from django.db import close_old_connections
+
+from distribucion.application.pipeline import EventPipeline, split_poison
+from distribucion.application.ports import AsyncEventConsumer
+from distribucion.infrastructure.messaging.read_sizer import ReadSizer
+from distribucion.infrastructure.metrics import EVENTS, STAGE_SECONDS
+
+log = logging.getLogger(__name__)
+
+def _bloque_key(evt: Dict[str, Any]) -> str | None:
+    try:
+        return str(evt["data"]["bloque"]["id"])
+    except (KeyError, TypeError):
+        return None
+
+def _log_failure(task: asyncio.Task) -> None:
+    # el task ya salió de `pending`: sin esto su excepción se perdería en silencio
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Lote async fallido; sin ack, queda en el PEL", exc_info=task.exception())
+
+class AsyncConsumerEngine:
+    """
+    Engine asyncio del consumer: mantiene varios lotes en vuelo para que lectura,
+    validación y escritura se solapen. Los eventos de un mismo bloque se proyectan
+    en orden de stream; bloques distintos corren en paralelo en un pool de
+    `concurrency` hilos (el ORM es síncrono, cada hilo usa su propia conexión).
+    """
+
+    def __init__(self, consumer: AsyncEventConsumer, pipeline: EventPipeline, *,
+                 concurrency: int = 8, inflight_batches: int = 2,
+                 count: int = 100, block_ms: int = 5000, sizer: ReadSizer | None = None,
+                 claim_idle_ms: int | None = None, claim_every_s: float = 30, max_deliveries: int = 0):
+        self.consumer, self.pipeline = consumer, pipeline
+        self.concurrency, self.inflight_batches = concurrency, inflight_batches
+        self.count, self.block_ms = count, block_ms
+        self.sizer = sizer or ReadSizer.fixed(count, block_ms)
+        self.claim_idle_ms, self.claim_every_s = claim_idle_ms, claim_every_s
+        self.max_deliveries = max_deliveries  # reclamados con más entregas => DLQ sin proyectar
+        self._executor: ThreadPoolExecutor | None = None
+        self._tails: Dict[str, asyncio.Future] = {}  # último evento en cola por bloque
+
+    async def run(self, should_run: Callable[[], bool] = lambda: True, once: bool = False) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="proyeccion")
+        inflight = asyncio.Semaphore(self.inflight_batches)
+        pending: set[asyncio.Task] = set()
+        scheduled = asyncio.Event()  # "lote anterior ya encolado"; el primero no espera a nadie
+        scheduled.set()
+        last_claim = float("-inf")
+
+        async def submit(msgs: Sequence[Mapping]):
+            nonlocal scheduled
+            prev, scheduled = scheduled, asyncio.Event()
+            task = asyncio.create_task(self._handle_batch(msgs, prev, scheduled))
+            task.add_done_callback(lambda _t: inflight.release())
+            task.add_done_callback(_log_failure)
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        try:
+            while should_run():
+                if self.claim_idle_ms is not None and time.monotonic() - last_claim >= self.claim_every_s:
+                    last_claim = time.monotonic()
+                    await inflight.acquire()
+                    claimed = await self.consumer.claim_stale(self.claim_idle_ms, count=self.count)
+                    claimed, poison = split_poison(claimed, self.max_deliveries)
+                    if poison:
+                        await self.consumer.dead_letter_many([(m.get("data"), why) for m, why in poison])
+                        await self.consumer.ack_many([m["id"] for m, _ in poison])
+                    if claimed:
+                        log.info("Pendientes reclamados", extra={"n": len(claimed)})
+                        await submit(claimed)
+                    else:
+                        inflight.release()
+
+                await inflight.acquire()  # backpressure: como mucho N lotes en vuelo
+                with STAGE_SECONDS.time(stage="xread"):
+                    msgs = await self.consumer.read(count=self.sizer.count, block_ms=self.sizer.block_ms)
+                if msgs:
+                    await submit(msgs)
+                else:
+                    inflight.release()
+                    self.sizer.observe(0, 0.0)
+                if once:
+                    break
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            self._executor.shutdown(wait=True)
+
+    async def _handle_batch(self, msgs: Sequence[Mapping],
+                            prev_scheduled: asyncio.Event, scheduled: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        try:
+            # decode + validación en paralelo (no depende del orden)
+            prepared = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, self._prepare, m) for m in msgs
+            ))
+            # encolar en orden de stream respecto de los lotes anteriores
+            await prev_scheduled.wait()
+            futs = [self._schedule(m, evt, err) for m, (evt, err) in zip(msgs, prepared)]
+        finally:
+            scheduled.set()
+        errors = await asyncio.gather(*futs)
+        with STAGE_SECONDS.time(stage="ack"):
+            await self.consumer.dead_letter_many([(m.get("data"), e) for m, e in zip(msgs, errors) if e])
+            await self.consumer.ack_many([m["id"] for m in msgs])
+        self.sizer.observe(len(msgs), time.perf_counter() - t0)
+
+    def _prepare(self, msg: Mapping) -> tuple[Dict[str, Any] | None, str | None]:
+        # un fallo inesperado va a la DLQ como motivo del mensaje, no tumba el lote
+        try:
+            return self.pipeline.prepare(msg)
+        except Exception as e:
+            log.exception("Error inesperado preparando el mensaje", extra={"id": msg.get("id")})
+            EVENTS.inc(outcome="unexpected")
+            return None, f"unexpected:{e}"
+
+    def _schedule(self, msg: Mapping, evt: Dict[str, Any] | None, err: str | None) -> asyncio.Future:
+        if evt is None:
+            done = asyncio.get_running_loop().create_future()
+            done.set_result(err)
+            return done
+        key = _bloque_key(evt)
+        task = asyncio.ensure_future(self._project_after(self._tails.get(key), msg["id"], evt))
+        if key is not None:
+            self._tails[key] = task
+            task.add_done_callback(partial(self._release_tail, key))
+        return task
+
+    def _release_tail(self, key: str, task: asyncio.Future) -> None:
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+    async def _project_after(self, prev: asyncio.Future | None, mid: str, evt: Dict[str, Any]) -> str | None:
+        if prev is not None:
+            await asyncio.wait([prev])  # mismo bloque: esperar al evento anterior
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._project, mid, evt)
+
+    def _project(self, mid: str, evt: Dict[str, Any]) -> str | None:
+        close_old_connections()  # como por request: descarta conexiones caídas del hilo
+        return self.pipeline.project(mid, evt)
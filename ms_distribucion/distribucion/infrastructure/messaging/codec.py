@@ -0,0 +1,37 @@
+# distribucion/infrastructure/messaging/codec.py
+"""
+Decodificación JSON de payloads del stream.
+
+orjson solo con CONSUMER_BYTES_MODE (lecturas en bytes); en modo str se queda la stdlib
+de siempre: orjson es más estricto (NaN, enteros de más de 64 bits) y cambiar de parser
+no debe depender de qué paquetes haya instalados en la imagen.
+"""
+from __future__ import annotations
+from typing import Any
+import json
+
+from django.conf import settings
+
+try:  # opcional: pip install orjson
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+def json_backend() -> str:
+    """Parser que usa `loads` con la configuración actual."""
+    return "orjson" if orjson is not None and settings.CONSUMER_BYTES_MODE else "json"
+
+def loads(raw: bytes | str) -> Any:
+    """Acepta bytes (lecturas en modo bytes) o str; ambos backends parsean bytes sin decodificar antes."""
+    if orjson is not None and settings.CONSUMER_BYTES_MODE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def fast_loads(raw: bytes | str) -> Any:
+    """orjson si está instalado, sin mirar la configuración (benchmarks)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def stdlib_loads(raw: bytes | str) -> Any:
+    return json.loads(raw)
@@ -0,0 +1,67 @@
+# distribucion/infrastructure/messaging/read_sizer.py
+"""
+Tamaño de lote (COUNT) y BLOCK de XREADGROUP adaptativos, dentro de límites.
+
+- Lote lleno (backlog): se duplica COUNT para amortizar transacción y round trips,
+  salvo que proyectar el lote ya supere `target_batch_s`; BLOCK al mínimo.
+- Lote parcial: COUNT baja hacia lo observado (lotes pequeños, latencia baja).
+- Lectura vacía: BLOCK crece hacia el máximo (menos wakeups en reposo; XREADGROUP
+  vuelve en cuanto llega un mensaje, así que no añade latencia).
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+
+from distribucion.infrastructure.metrics import REGISTRY
+
+XREAD_COUNT = REGISTRY.gauge("distribucion_consumer_xread_count", "COUNT elegido para el próximo XREADGROUP.")
+XREAD_BLOCK_MS = REGISTRY.gauge("distribucion_consumer_xread_block_ms", "BLOCK (ms) elegido para el próximo XREADGROUP.")
+BATCH_FILL = REGISTRY.gauge("distribucion_consumer_batch_fill_ratio", "Mensajes leídos / COUNT en la última lectura.")
+
+@dataclass
+class ReadSizer:
+    min_count: int
+    max_count: int
+    min_block_ms: int
+    max_block_ms: int
+    target_batch_s: float = 0.5
+    adaptive: bool = True
+    count: int = field(init=False)
+    block_ms: int = field(init=False)
+
+    def __post_init__(self):
+        # arranca como si hubiera backlog; se ajusta en la primera lectura
+        self.count = self.max_count if not self.adaptive else max(self.min_count, min(self.max_count, 100))
+        self.block_ms = self.max_block_ms
+        self._report(0.0)
+
+    @classmethod
+    def fixed(cls, count: int, block_ms: int) -> "ReadSizer":
+        return cls(count, count, block_ms, block_ms, adaptive=False)
+
+    def observe(self, n_read: int, projection_s: float) -> None:
+        """Ajusta COUNT/BLOCK tras procesar un lote de `n_read` mensajes en `projection_s`."""
+        fill = n_read / self.count if self.count else 0.0
+        if self.adaptive:
+            if n_read == 0:
+                self.block_ms = min(self.max_block_ms, max(self.block_ms * 2, self.min_block_ms))
+            else:
+                self.block_ms = self.min_block_ms
+            if fill >= 1.0:
+                if projection_s > self.target_batch_s:
+                    # el lote ya tarda más que el objetivo: escalar al tamaño que cabe
+                    target = int(n_read * self.target_batch_s / projection_s)
+                else:
+                    target = self.count * 2
+            elif fill < 0.5 and n_read:
+                target = max(n_read * 2, self.count // 2)
+            elif not n_read:
+                target = self.count // 2
+            else:
+                target = self.count
+            self.count = max(self.min_count, min(self.max_count, target))
+        self._report(fill)
+
+    def _report(self, fill: float) -> None:
+        XREAD_COUNT.set(self.count)
+        XREAD_BLOCK_MS.set(self.block_ms)
+        BATCH_FILL.set(round(fill, 4))
@@ -1,13 +1,37 @@
 # distribucion/infrastructure/messaging/redis_consumer.py
 from typing import Iterable, Mapping
 import redis
-from distribucion.application.ports import EventConsumer
+import redis.asyncio as aredis
+from distribucion.application.ports import EventConsumer, AsyncEventConsumer, DeadLetterQueue
+
+def _to_msg(mid, fields) -> dict:
+    """
+    Normaliza una entrada del stream. En modo bytes (raw=True) el id se decodifica
+    (es ASCII) y 'data' se deja en bytes para que el parser JSON no decodifique dos veces.
+    Entradas ya borradas del stream llegan sin campos: sin 'data', así se ackean.
+    """
+    if isinstance(mid, bytes):
+        mid = mid.decode("ascii")
+    fields = fields or {}
+    return {"id": mid, "data": fields.get("data", fields.get(b"data"))}
+
+def legacy_dlq_stream(stream: str) -> str:
+    """DLQ implícita de versiones anteriores (`<stream>.dlq`); hoy se usa settings.DLQ_STREAM."""
+    return f"{stream}.dlq"
+
+def _set_deliveries(msgs: list[dict], pending: list) -> None:
+    # XPENDING ya cuenta la entrega del XAUTOCLAIM; entrada sin PEL (ackeada entre medias) => 0
+    for m, rows in zip(msgs, pending):
+        m["deliveries"] = int(rows[0]["times_delivered"]) if rows else 0
 
 class RedisEventConsumer(EventConsumer):  # ← implementa el puerto
-    def __init__(self, dsn: str, stream: str, group: str, consumer: str, dlq_stream: str | None = None):
-        self.r = redis.Redis.from_url(dsn, decode_responses=True, client_name="ms_distribucion_consumer")
+    def __init__(self, dsn: str, stream: str, group: str, consumer: str, dlq_stream: str,
+                 raw: bool = False):
+        # raw=True: payloads en bytes (sin decode UTF-8 en redis-py)
+        self.r = redis.Redis.from_url(dsn, decode_responses=not raw, client_name="ms_distribucion_consumer")
         self.stream, self.group, self.consumer = stream, group, consumer
-        self.dlq_stream = dlq_stream or f"{stream}.dlq"
+        self.dlq_stream = dlq_stream  # explícito (settings.DLQ_STREAM): lo mismo que lee /health/stream
+        self._claim_cursor = "0-0"
         try:
             self.r.xgroup_create(stream, group, id="0", mkstream=True)
         except redis.ResponseError as e:
@@ -20,10 +44,142 @@ class RedisEventConsumer(EventConsumer):  # ← implementa el puerto
             return []
         _, batch = msgs[0]
         for mid, fields in batch:
-            yield {"id": mid, "data": fields.get("data")}
+            yield _to_msg(mid, fields)
+
+    def claim_stale(self, min_idle_ms: int, count: int = 100) -> Iterable[Mapping]:
+        """
+        XAUTOCLAIM: toma entradas del PEL inactivas más de min_idle_ms (p. ej. de un worker caído).
+        Cada mensaje lleva 'deliveries' (XPENDING) para cortar los que tumban al worker una y otra vez.
+        """
+        res = self.r.xautoclaim(self.stream, self.group, self.consumer,
+                                min_idle_time=min_idle_ms, start_id=self._claim_cursor, count=count)
+        next_id, batch = res[0], res[1]
+        self._claim_cursor = next_id  # "0-0" => se recorrió el PEL completo
+        msgs = [_to_msg(mid, fields) for mid, fields in batch]
+        if msgs:
+            pipe = self.r.pipeline(transaction=False)  # un XPENDING por id en 1 RTT
+            for m in msgs:
+                pipe.xpending_range(self.stream, self.group, min=m["id"], max=m["id"], count=1)
+            _set_deliveries(msgs, pipe.execute())
+        return msgs
 
     def ack(self, message_id: str) -> None:
         self.r.xack(self.stream, self.group, message_id)
 
     def dead_letter(self, payload: str, error: str) -> None:
         self.r.xadd(self.dlq_stream, {"data": payload, "error": str(error)[:500]})
+
+    def ack_many(self, message_ids: Iterable[str]) -> None:
+        ids = list(message_ids)
+        if ids:
+            self.r.xack(self.stream, self.group, *ids)  # XACK multi-ID: 1 RTT
+
+    def dead_letter_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        pipe = self.r.pipeline(transaction=False)  # N XADD en 1 RTT
+        for payload, error in entries:
+            pipe.xadd(self.dlq_stream, {"data": payload, "error": str(error)[:500]})
+        pipe.execute()
+
+
+class AsyncRedisEventConsumer(AsyncEventConsumer):  # ← puerto asíncrono
+    def __init__(self, dsn: str, stream: str, group: str, consumer: str, dlq_stream: str,
+                 raw: bool = False):
+        self.r = aredis.Redis.from_url(dsn, decode_responses=not raw, client_name="ms_distribucion_consumer")
+        self.stream, self.group, self.consumer = stream, group, consumer
+        self.dlq_stream = dlq_stream  # explícito (settings.DLQ_STREAM): lo mismo que lee /health/stream
+        self._claim_cursor = "0-0"
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.r.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(self, count: int = 100, block_ms: int = 5000) -> list[Mapping]:
+        msgs = await self.r.xreadgroup(self.group, self.consumer, {self.stream: ">"}, count=count, block=block_ms)
+        if not msgs:
+            return []
+        _, batch = msgs[0]
+        return [_to_msg(mid, fields) for mid, fields in batch]
+
+    async def claim_stale(self, min_idle_ms: int, count: int = 100) -> list[Mapping]:
+        res = await self.r.xautoclaim(self.stream, self.group, self.consumer,
+                                      min_idle_time=min_idle_ms, start_id=self._claim_cursor, count=count)
+        self._claim_cursor = res[0]
+        msgs = [_to_msg(mid, fields) for mid, fields in res[1]]
+        if msgs:
+            async with self.r.pipeline(transaction=False) as pipe:
+                for m in msgs:
+                    pipe.xpending_range(self.stream, self.group, min=m["id"], max=m["id"], count=1)
+                _set_deliveries(msgs, await pipe.execute())
+        return msgs
+
+    async def ack_many(self, message_ids: Iterable[str]) -> None:
+        ids = list(message_ids)
+        if ids:
+            await self.r.xack(self.stream, self.group, *ids)
+
+    async def dead_letter_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        async with self.r.pipeline(transaction=False) as pipe:
+            for payload, error in entries:
+                pipe.xadd(self.dlq_stream, {"data": payload, "error": str(error)[:500]})
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self.r.aclose()
+
+
+class RedisStreamRange:
+    """Lectura por rangos (XRANGE) sin consumer group: no toca el PEL ni el grupo."""
+    def __init__(self, dsn: str, stream: str):
+        self.r = redis.Redis.from_url(dsn, decode_responses=True, client_name="ms_distribucion_replay")
+        self.stream = stream
+
+    def last_id(self) -> str | None:
+        last = self.r.xrevrange(self.stream, count=1)
+        return last[0][0] if last else None
+
+    def scan(self, after: str, until: str, count: int = 1000) -> list[Mapping]:
+        batch = self.r.xrange(self.stream, min=f"({after}", max=until, count=count)
+        return [{"id": mid, "data": f.get("data"), "error": f.get("error", "")} for mid, f in batch]
+
+    def active_consumers(self, group: str, idle_ms: int) -> list[str]:
+        """Consumers del grupo con actividad en los últimos `idle_ms` (un XREADGROUP bloqueado cuenta)."""
+        try:
+            consumers = self.r.xinfo_consumers(self.stream, group)
+        except redis.ResponseError:  # sin stream o sin grupo
+            return []
+        return [c["name"] for c in consumers if c["idle"] < idle_ms]
+
+    def is_complete(self) -> bool | None:
+        """True si nunca se borró/recortó una entrada (el stream es el origen); None si Redis < 7 no lo dice."""
+        try:
+            info = self.r.xinfo_stream(self.stream)
+        except redis.ResponseError:
+            return True  # stream inexistente: no hay nada recortado
+        added = info.get("entries-added")
+        return None if added is None else added == info["length"]
+
+
+class RedisDeadLetterQueue(RedisStreamRange, DeadLetterQueue):
+    """DLQ recorrida por rangos por replay_dlq; re-encola y borra por lote."""
+
+    def append_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        pipe = self.r.pipeline(transaction=False)
+        for payload, error in entries:
+            pipe.xadd(self.stream, {"data": payload, "error": str(error)[:500]})
+        pipe.execute()
+
+    def delete_many(self, message_ids: Iterable[str]) -> int:
+        ids = list(message_ids)
+        return self.r.xdel(self.stream, *ids) if ids else 0  # XDEL multi-ID: 1 RTT
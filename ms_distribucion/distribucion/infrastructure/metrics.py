@@ -0,0 +1,227 @@
+# distribucion/infrastructure/metrics.py
+"""
+Métricas del consumer en formato de texto Prometheus, sin dependencias externas.
+
+Cada worker sirve su registro con `serve(port)` (hilo daemon); la API agrega los
+workers con `merge()` (suma contadores/histogramas, etiqueta los gauges por target).
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Sequence, Tuple
+import bisect, math, re, threading, time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[str, ...]
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    body = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + body + "}"
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_value(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *a, **kw):
+        super().__init__(*a, **kw)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        k = self._key(labels)
+        with self._lock:
+            self._values[k] = self._values.get(k, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # [n_bucket0, ..., n_inf, sum]
+
+    def observe(self, value: float, **labels) -> None:
+        k = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(k)
+            if s is None:
+                s = self._series[k] = [0] * (len(self.buckets) + 2)
+            s[i] += 1
+            s[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels) -> int:
+        s = self._series.get(self._key(labels))
+        return int(sum(s[:-1])) if s else 0
+
+    def render(self) -> List[str]:
+        out = self.header()
+        with self._lock:
+            items = sorted((k, list(s)) for k, s in self._series.items())
+        for k, s in items:
+            acc = 0
+            for le, n in zip(self.buckets + (math.inf,), s[:-1]):
+                acc += n
+                labels = _fmt_labels(self.labelnames + ("le",), k + (_fmt_value(le),))
+                out.append(f"{self.name}_bucket{labels} {_fmt_value(acc)}")
+            base = _fmt_labels(self.labelnames, k)
+            out.append(f"{self.name}_sum{base} {_fmt_value(s[-1])}")
+            out.append(f"{self.name}_count{base} {_fmt_value(acc)}")
+        return out
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics.values():
+            lines += m.render()
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# ---- métricas del consumer ----
+STAGES = ("xread", "decode", "validate_ce", "validate_data", "projection", "ack")
+OUTCOMES = ("ok", "duplicate", "json", "contract", "projection", "poison", "unexpected")
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "distribucion_consumer_stage_seconds", "Duración por etapa del consumer (segundos).", ["stage"])
+EVENTS = REGISTRY.counter(
+    "distribucion_consumer_events_total", "Mensajes procesados por resultado.", ["outcome"])
+
+def outcome_of(reason: str | None, duplicate: bool = False) -> str:
+    """Traduce el motivo de DLQ del pipeline ('projection:…', 'unvalidated:…') a etiqueta."""
+    if reason is None:
+        return "duplicate" if duplicate else "ok"
+    if reason.startswith("unvalidated:"):
+        reason = reason[len("unvalidated:"):]
+    kind = reason.split(":", 1)[0]
+    return kind if kind in OUTCOMES else "unexpected"
+
+# ---- exposición ----
+def serve(port: int, registry: Registry = REGISTRY, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Listener HTTP mínimo en un hilo daemon: GET /metrics."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # sin ruido en stderr por cada scrape
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"metrics:{port}", daemon=True).start()
+    return server
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)$')
+
+def merge(texts: Dict[str, str]) -> str:
+    """
+    Agrega la salida de varios workers {target: texto}: suma contadores e histogramas
+    (misma serie = mismo nombre + labels) y añade target="…" a los gauges.
+    """
+    headers: Dict[str, List[str]] = {}
+    kinds: Dict[str, str] = {}
+    summed: Dict[str, Dict[str, float]] = {}
+
+    def family(sample: str) -> str:
+        for suffix in ("_bucket", "_sum", "_count"):
+            if sample.endswith(suffix) and kinds.get(sample[: -len(suffix)]) == "histogram":
+                return sample[: -len(suffix)]
+        return sample
+
+    for target, text in texts.items():
+        for line in text.splitlines():
+            if line.startswith("# "):
+                parts = line.split(" ", 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    fam_headers = headers.setdefault(parts[2], [])
+                    if not any(h.startswith(f"# {parts[1]} ") for h in fam_headers):
+                        fam_headers.append(line)
+                    if parts[1] == "TYPE":
+                        kinds[parts[2]] = parts[3] if len(parts) > 3 else "untyped"
+                continue
+            m = _SAMPLE.match(line.strip())
+            if not m:
+                continue
+            name, labels, value = m.group(1), m.group(2) or "", float(m.group(3))
+            fam = family(name)
+            if kinds.get(fam) == "gauge":
+                tl = f'target="{_escape(target)}"'
+                labels = "{" + (labels[1:-1] + "," if labels else "") + tl + "}"
+            series = summed.setdefault(fam, {})
+            key = name + labels
+            series[key] = series.get(key, 0) + value
+
+    lines: List[str] = []
+    for fam in list(headers) + [f for f in summed if f not in headers]:
+        lines += headers.get(fam, [])
+        lines += [f"{k} {_fmt_value(v)}" for k, v in summed.get(fam, {}).items()]
+    return "\n".join(lines) + "\n"
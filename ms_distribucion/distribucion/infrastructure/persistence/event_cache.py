@@ -0,0 +1,54 @@
+# distribucion/infrastructure/persistence/event_cache.py
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Iterable, Set
+import threading
+
+from distribucion.infrastructure.metrics import REGISTRY
+
+LOOKUPS = REGISTRY.counter(
+    "distribucion_consumer_event_cache_total", "Consultas a la cache de eventos recientes por resultado (hit/miss).", ["result"])
+
+class RecentEventCache:
+    """
+    LRU acotado de CloudEvent ids ya proyectados en este proceso. Sirve para
+    descartar reentregas (p. ej. tras reiniciar un consumer) sin ir a MySQL;
+    en un miss manda EventOffset. Thread-safe (el engine async proyecta en hilos).
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __contains__(self, event_id: str) -> bool:
+        with self._lock:
+            hit = event_id in self._ids
+            if hit:
+                self._ids.move_to_end(event_id)
+                self.hits += 1
+            else:
+                self.misses += 1
+        LOOKUPS.inc(result="hit" if hit else "miss")
+        return hit
+
+    def split(self, event_ids: Iterable[str]) -> tuple[Set[str], list[str]]:
+        """Separa un lote en (conocidos, a consultar en DB)."""
+        known, unknown = set(), []
+        for e in event_ids:
+            (known.add(e) if e in self else unknown.append(e))
+        return known, unknown
+
+    def add_many(self, event_ids: Iterable[str]) -> None:
+        with self._lock:
+            for e in event_ids:
+                self._ids[e] = None
+                self._ids.move_to_end(e)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._ids),
+                "maxsize": self.maxsize, "hit_rate": round(self.hits / total, 4) if total else 0.0}
@@ -0,0 +1,221 @@
+# distribucion/infrastructure/persistence/rebuild.py
+"""
+Reconstrucción completa de Bloque/BloqueOrden desde el stream (rebuild_projection).
+
+Los eventos se proyectan con el mismo caso de uso sobre ShadowReadModelRepo, que
+acumula en memoria por página y vuelca con bulk inserts a tablas sombra (sin
+EventOffset por evento; último escritor gana por bloque). `swap_in` sustituye el
+contenido vivo en una sola transacción: los lectores ven el modelo anterior o el
+nuevo, nunca una mezcla.
+
+Los bloques que la sombra no conoce (sus eventos se recortaron del stream) se
+conservan con sus enlaces; solo `prune=True` los borra, y solo tiene sentido si el
+stream es el origen completo.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+from django.apps.registry import Apps
+from django.db import connection, models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from distribucion.infrastructure.persistence.repositories import _upsert
+from distribucion.infrastructure.read_cache import entity_versions
+from distribucion.models import Bloque, BloqueOrden, Chofer, EventOffset, Orden, EstadoCompletitudBloque
+
+# registro propio: las tablas sombra no son modelos de la app ni entran en migraciones
+_shadow_apps = Apps()
+
+class BloqueShadow(models.Model):
+    id = models.CharField(primary_key=True, max_length=64)
+    fecha = models.DateTimeField()
+    chofer_id = models.UUIDField()
+    chofer_nombre = models.CharField(max_length=200)
+    class Meta:
+        apps, app_label, db_table = _shadow_apps, "distribucion", "distribucion_bloque_shadow"
+
+class BloqueOrdenShadow(models.Model):
+    bloque_id = models.CharField(max_length=64)
+    orden_id = models.CharField(max_length=64)
+    class Meta:
+        apps, app_label, db_table = _shadow_apps, "distribucion", "distribucion_bloqueorden_shadow"
+        unique_together = [("bloque_id", "orden_id")]
+
+class EventOffsetShadow(models.Model):
+    event_id = models.CharField(primary_key=True, max_length=128)
+    class Meta:
+        apps, app_label, db_table = _shadow_apps, "distribucion", "distribucion_eventoffset_shadow"
+
+SHADOW_MODELS = (BloqueShadow, BloqueOrdenShadow, EventOffsetShadow)
+
+def create_shadow_tables() -> None:
+    drop_shadow_tables()
+    with connection.schema_editor() as editor:
+        for m in SHADOW_MODELS:
+            editor.create_model(m)
+
+def drop_shadow_tables() -> None:
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for m in SHADOW_MODELS:
+            if m._meta.db_table in existing:
+                editor.delete_model(m)
+
+
+class ShadowReadModelRepo:
+    """
+    ReadModelRepo para el rebuild: sin comprobaciones de EventOffset, existencia de
+    órdenes resuelta desde un set precargado por página y escrituras acumuladas
+    hasta `flush()`. `isolate()` hace de savepoint: descarta lo de un evento rechazado.
+    """
+    upsert_sets_incompleto = True  # swap_in deja todos los bloques INCOMPLETO, como la proyección en vivo
+
+    def __init__(self):
+        self.choferes: Dict[str, str] = {}  # todo el rebuild (último nombre gana)
+        self._known_orders: Set[str] = set()
+        self._bloques: Dict[str, Tuple] = {}
+        self._links: Set[Tuple[str, str]] = set()
+        self._events: List[str] = []
+        self._stage: dict | None = None
+
+    # ---- idempotencia: el rebuild no consulta EventOffset ----
+    def event_already_processed(self, event_id: str) -> bool:
+        return False
+
+    def processed_event_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        return set()
+
+    def mark_event_processed(self, event_id: str) -> None:
+        self._events.append(event_id)
+
+    def mark_events_processed(self, event_ids: Iterable[str]) -> None:
+        self._events.extend(event_ids)
+
+    # ---- proyección ----
+    def _target(self) -> dict:
+        if self._stage is not None:
+            return self._stage
+        return {"choferes": self.choferes, "bloques": self._bloques, "links": self._links}
+
+    def upsert_chofer(self, chofer_id: str, nombre: str) -> None:
+        self._target()["choferes"][chofer_id] = nombre
+
+    def upsert_bloque(self, bloque_id: str, fecha, chofer_id: str, chofer_nombre: str) -> None:
+        self._target()["bloques"][bloque_id] = (fecha, chofer_id, chofer_nombre)
+
+    def set_bloque_incompleto(self, bloque_id: str) -> None:
+        pass  # ver upsert_sets_incompleto
+
+    def existing_order_ids(self, ids: Iterable[str]) -> List[str]:
+        return [i for i in ids if i in self._known_orders]
+
+    def bulk_link_bloque_orden(self, bloque_id: str, order_ids: Iterable[str]) -> int:
+        links = self._target()["links"]
+        before = len(links)
+        links.update((bloque_id, o) for o in order_ids)
+        return len(links) - before
+
+    def add_bloque_total_ordenes(self, bloque_id: str, delta: int) -> None:
+        pass  # total_ordenes se recalcula en swap_in
+
+    def update_bloque_total_ordenes(self, bloque_id: str) -> None:
+        pass
+
+    # ---- rebuild ----
+    def prefetch_orders(self, ids: Iterable[str]) -> None:
+        todo = list(set(ids) - self._known_orders)
+        for i in range(0, len(todo), 1000):
+            self._known_orders.update(Orden.objects.filter(id__in=todo[i:i + 1000]).values_list("id", flat=True))
+
+    @contextmanager
+    def isolate(self) -> Iterator[None]:
+        self._stage = {"choferes": {}, "bloques": {}, "links": set()}
+        try:
+            yield
+            self.choferes.update(self._stage["choferes"])
+            self._bloques.update(self._stage["bloques"])
+            self._links |= self._stage["links"]
+        finally:
+            self._stage = None
+
+    def flush(self) -> None:
+        """Vuelca la página a las tablas sombra: un upsert de bloques y dos inserts en bloque."""
+        with transaction.atomic():
+            _upsert(BloqueShadow, [
+                BloqueShadow(id=b, fecha=f, chofer_id=ch, chofer_nombre=nom)
+                for b, (f, ch, nom) in self._bloques.items()
+            ], ["fecha", "chofer_id", "chofer_nombre"])
+            BloqueOrdenShadow.objects.bulk_create(
+                [BloqueOrdenShadow(bloque_id=b, orden_id=o) for b, o in self._links],
+                ignore_conflicts=True, batch_size=2000)
+            EventOffsetShadow.objects.bulk_create(
+                [EventOffsetShadow(event_id=e) for e in dict.fromkeys(self._events)],
+                ignore_conflicts=True, batch_size=2000)
+        self._bloques, self._links, self._events = {}, set(), []
+
+
+def swap_in(choferes: Dict[str, str], catch_up: Callable[[], None] | None = None,
+            prune: bool = False, chunk: int = 2000) -> Dict[str, int]:
+    """
+    Sustituye Bloque/BloqueOrden por el contenido de las tablas sombra en una transacción.
+    Copia set-based en lugar de RENAME TABLE: conserva FKs y sus nombres en MySQL y sqlite.
+    `catch_up` vuelca a la sombra lo llegado al stream durante el rebuild, ya dentro de
+    la transacción; `choferes` se lee después (lo completa el propio catch_up).
+    """
+    qn = connection.ops.quote_name
+    bo, bos = BloqueOrden._meta, BloqueOrdenShadow._meta
+    with transaction.atomic():
+        if catch_up is not None:
+            catch_up()
+        _upsert(Chofer, [Chofer(id=cid, nombre=nom) for cid, nom in choferes.items()], ["nombre", "updated_at"])
+
+        if prune:
+            BloqueOrden.objects.all().delete()
+        else:  # solo los enlaces de bloques re-proyectados
+            BloqueOrden.objects.filter(bloque_id__in=BloqueShadow.objects.values("id")).delete()
+        batch: List[Bloque] = []
+        upserted = 0
+        for s in BloqueShadow.objects.order_by("id").iterator(chunk_size=chunk):
+            batch.append(Bloque(id=s.id, fecha=s.fecha, chofer_id=s.chofer_id, chofer_nombre=s.chofer_nombre,
+                                estado_completitud=EstadoCompletitudBloque.INCOMPLETO))
+            if len(batch) >= chunk:
+                _upsert(Bloque, batch, ["fecha", "chofer", "chofer_nombre", "estado_completitud", "updated_at"])
+                upserted, batch = upserted + len(batch), []
+        _upsert(Bloque, batch, ["fecha", "chofer", "chofer_nombre", "estado_completitud", "updated_at"])
+        upserted += len(batch)
+        removed = 0
+        if prune:
+            _, deleted = Bloque.objects.exclude(id__in=BloqueShadow.objects.values("id")).delete()
+            removed = deleted.get(Bloque._meta.label, 0)
+
+        with connection.cursor() as c:
+            c.execute(
+                f"INSERT INTO {qn(bo.db_table)} ({qn(bo.get_field('bloque').column)}, {qn(bo.get_field('orden').column)}) "
+                f"SELECT {qn('bloque_id')}, {qn('orden_id')} FROM {qn(bos.db_table)}"
+            )
+            links = max(c.rowcount, 0)
+            c.execute(_insert_select_ignore_sql(
+                EventOffset._meta.db_table, ["event_id", "processed_at"],
+                f"SELECT {qn('event_id')}, %s FROM {qn(EventOffsetShadow._meta.db_table)}",
+            ), [timezone.now()])
+
+        real = (BloqueOrden.objects.filter(bloque_id=OuterRef("pk")).order_by()
+                .values("bloque_id").annotate(c=Count("*")).values("c"))
+        total = Coalesce(Subquery(real), 0)
+        # solo las filas cuyo total cambia: updated_at alimenta las sondas ETag/Last-Modified
+        Bloque.objects.exclude(total_ordenes=total).update(total_ordenes=total, updated_at=timezone.now())
+        versions = entity_versions()
+        if versions is not None:
+            versions.bump_after_commit(["bloque", "chofer"])
+    return {"bloques": upserted, "bloques_borrados": removed, "enlaces": links}
+
+def _insert_select_ignore_sql(table: str, cols: List[str], select_sql: str) -> str:
+    qn = connection.ops.quote_name
+    head = f"{qn(table)} ({', '.join(qn(c) for c in cols)}) {select_sql}"
+    if connection.vendor == "mysql":
+        return f"INSERT IGNORE INTO {head}"
+    if connection.vendor == "sqlite":
+        return f"INSERT OR IGNORE INTO {head}"
+    return f"INSERT INTO {head} ON CONFLICT DO NOTHING"
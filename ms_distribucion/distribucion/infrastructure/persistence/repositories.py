@@ -1,37 +1,176 @@
 # distribucion/infrastructure/persistence/repositories.py
-from typing import Iterable, List
+from datetime import datetime
+from typing import Iterable, List, Set
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from distribucion.infrastructure.persistence.event_cache import RecentEventCache
+from distribucion.infrastructure.read_cache import EntityVersions, entity_versions
 from distribucion.models import (
     Chofer, Bloque, BloqueOrden, Orden, EventOffset,
     EstadoCompletitudBloque,
 )
 
 class DjangoReadModelRepo:
+    upsert_sets_incompleto = False  # upsert_bloque no toca estado_completitud
+
+    def __init__(self, recent_events: RecentEventCache | None = None, versions: EntityVersions | None = None):
+        # caché en proceso delante de EventOffset; la DB sigue siendo la autoridad en un miss
+        self.recent_events = recent_events
+        # versiones por entidad (caché del API): se suben tras el commit del evento/lote
+        self.versions = versions
+        self._local = threading.local()
+
     def event_already_processed(self, event_id: str) -> bool:
-        return EventOffset.objects.filter(event_id=event_id).exists()
+        if self.recent_events is not None and event_id in self.recent_events:
+            return True
+        found = EventOffset.objects.filter(event_id=event_id).exists()
+        if found:
+            self._remember([event_id])
+        return found
 
     def mark_event_processed(self, event_id: str) -> None:
         EventOffset.objects.get_or_create(event_id=event_id)
+        self._remember([event_id])
+        self._bump_touched()
+
+    def processed_event_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        ids = list(event_ids)
+        known: Set[str] = set()
+        if self.recent_events is not None:
+            known, ids = self.recent_events.split(ids)
+        if not ids:
+            return known
+        found = set(EventOffset.objects.filter(event_id__in=ids).values_list("event_id", flat=True))
+        self._remember(found)
+        return known | found
+
+    def mark_events_processed(self, event_ids: Iterable[str]) -> None:
+        ids = list(event_ids)
+        # ignore_conflicts => INSERT IGNORE en MySQL
+        EventOffset.objects.bulk_create([EventOffset(event_id=e) for e in ids], ignore_conflicts=True)
+        self._remember(ids)
+        self._bump_touched()
+
+    def _remember(self, event_ids: Iterable[str]) -> None:
+        # solo tras el commit: un savepoint/lote revertido no debe dejar ids "procesados" en caché
+        if self.recent_events is not None and event_ids:
+            ids = list(event_ids)
+            transaction.on_commit(lambda: self.recent_events.add_many(ids))
+
+    def _touch(self, *entities: str) -> None:
+        if self.versions is not None:
+            self._local.touched = getattr(self._local, "touched", set()) | set(entities)
+
+    def _bump_touched(self) -> None:
+        # un INCR por entidad tocada y evento/lote (no por fila); un savepoint revertido solo sobreinvalida
+        touched = getattr(self._local, "touched", None)
+        if touched:
+            self._local.touched = set()
+            self.versions.bump_after_commit(touched)
 
     def upsert_chofer(self, chofer_id: str, nombre: str) -> None:
         Chofer.objects.update_or_create(id=chofer_id, defaults={"nombre": nombre})
+        self._touch("chofer")
 
     def upsert_bloque(self, bloque_id: str, fecha, chofer_id: str, chofer_nombre: str) -> None:
         Bloque.objects.update_or_create(
             id=bloque_id,
             defaults={"fecha": fecha, "chofer_id": chofer_id, "chofer_nombre": chofer_nombre},
         )
+        self._touch("bloque")
 
     def set_bloque_incompleto(self, bloque_id: str) -> None:
-        Bloque.objects.filter(id=bloque_id).update(estado_completitud=EstadoCompletitudBloque.INCOMPLETO)
+        Bloque.objects.filter(id=bloque_id).update(
+            estado_completitud=EstadoCompletitudBloque.INCOMPLETO, updated_at=timezone.now())
+        self._touch("bloque")
 
     def existing_order_ids(self, ids: Iterable[str]) -> List[str]:
         return list(Orden.objects.filter(id__in=list(ids)).values_list("id", flat=True))
 
     def bulk_link_bloque_orden(self, bloque_id: str, order_ids: Iterable[str]) -> int:
-        objs = [BloqueOrden(bloque_id=bloque_id, orden_id=o) for o in order_ids]
-        created = BloqueOrden.objects.bulk_create(objs, ignore_conflicts=True)
-        return len(created)
+        """Enlaza con INSERT IGNORE y devuelve las filas realmente insertadas (las existentes no cuentan)."""
+        rows = [(bloque_id, o) for o in dict.fromkeys(order_ids)]
+        inserted = 0
+        with connection.cursor() as c:
+            for i in range(0, len(rows), 500):
+                chunk = rows[i:i + 500]
+                # una sola sentencia multi-fila: su rowcount es exacto (executemany no lo es en todos los drivers)
+                c.execute(_insert_ignore_sql(BloqueOrden, ["bloque", "orden"], len(chunk)),
+                          [v for row in chunk for v in row])
+                inserted += max(c.rowcount, 0)
+        if inserted:
+            self._touch("bloque")
+        return inserted
+
+    def add_bloque_total_ordenes(self, bloque_id: str, delta: int) -> None:
+        # incremental: evita el COUNT(*) sobre BloqueOrden por evento
+        if delta:
+            Bloque.objects.filter(id=bloque_id).update(
+                total_ordenes=F("total_ordenes") + delta, updated_at=timezone.now())
+            self._touch("bloque")
 
     def update_bloque_total_ordenes(self, bloque_id: str) -> None:
         total = BloqueOrden.objects.filter(bloque_id=bloque_id).count()
-        Bloque.objects.filter(id=bloque_id).update(total_ordenes=total)
+        Bloque.objects.filter(id=bloque_id).update(total_ordenes=total, updated_at=timezone.now())
+        self._touch("bloque")
+        self._bump_touched()  # fuera del flujo de eventos: no hay mark_event_processed detrás
+
+
+class NativeUpsertReadModelRepo(DjangoReadModelRepo):
+    """
+    Variante con upserts nativos: cada upsert es una sola sentencia
+    (INSERT ... ON DUPLICATE KEY UPDATE en MySQL, ON CONFLICT en sqlite/postgres)
+    en lugar del SELECT + INSERT/UPDATE de update_or_create. upsert_bloque ya deja
+    el bloque INCOMPLETO (upsert_sets_incompleto): el caso de uso se ahorra el UPDATE.
+    """
+    upsert_sets_incompleto = True
+    CHOFER_FIELDS = ["nombre", "updated_at"]
+    BLOQUE_FIELDS = ["fecha", "chofer", "chofer_nombre", "estado_completitud", "updated_at"]
+
+    def upsert_chofer(self, chofer_id: str, nombre: str) -> None:
+        self.upsert_choferes([(chofer_id, nombre)])
+
+    def upsert_choferes(self, rows: Iterable[tuple[str, str]]) -> None:
+        objs = {str(cid): Chofer(id=cid, nombre=nombre) for cid, nombre in rows}
+        _upsert(Chofer, list(objs.values()), self.CHOFER_FIELDS)
+        self._touch("chofer")
+
+    def upsert_bloque(self, bloque_id: str, fecha, chofer_id: str, chofer_nombre: str) -> None:
+        self.upsert_bloques([(bloque_id, fecha, chofer_id, chofer_nombre)])
+
+    def upsert_bloques(self, rows: Iterable[tuple[str, datetime, str, str]]) -> None:
+        # último valor gana si el mismo bloque aparece varias veces en el lote
+        objs = {
+            b_id: Bloque(id=b_id, fecha=fecha, chofer_id=ch_id, chofer_nombre=ch_nom,
+                         estado_completitud=EstadoCompletitudBloque.INCOMPLETO)
+            for b_id, fecha, ch_id, ch_nom in rows
+        }
+        _upsert(Bloque, list(objs.values()), self.BLOQUE_FIELDS)
+        self._touch("bloque")
+
+def _upsert(model, objs: list, update_fields: List[str]) -> None:
+    if not objs:
+        return
+    # MySQL no admite unique_fields (ON DUPLICATE KEY usa cualquier clave única)
+    unique = ["id"] if connection.features.supports_update_conflicts_with_target else None
+    model.objects.bulk_create(objs, update_conflicts=True, unique_fields=unique, update_fields=update_fields)
+
+def _insert_ignore_sql(model, fields: List[str], n_rows: int) -> str:
+    qn = connection.ops.quote_name
+    cols = ", ".join(qn(model._meta.get_field(f).column) for f in fields)
+    params = ", ".join(["(" + ", ".join(["%s"] * len(fields)) + ")"] * n_rows)
+    table = qn(model._meta.db_table)
+    if connection.vendor == "mysql":
+        return f"INSERT IGNORE INTO {table} ({cols}) VALUES {params}"
+    if connection.vendor == "sqlite":
+        return f"INSERT OR IGNORE INTO {table} ({cols}) VALUES {params}"
+    return f"INSERT INTO {table} ({cols}) VALUES {params} ON CONFLICT DO NOTHING"
+
+REPOS = {"django": DjangoReadModelRepo, "upsert": NativeUpsertReadModelRepo}
+
+def build_read_model_repo(recent_events: RecentEventCache | None = None) -> DjangoReadModelRepo:
+    """Implementación de ReadModelRepo elegida por settings.READ_MODEL_REPO (para A/B)."""
+    return REPOS[settings.READ_MODEL_REPO](recent_events=recent_events, versions=entity_versions())
@@ -0,0 +1,66 @@
+# distribucion/infrastructure/read_cache.py
+"""
+Contadores de versión por entidad del read model, en Redis (INCR/MGET).
+
+Quien escribe (repo del consumer, rebuild, reconcile, factory) sube la versión de
+las entidades tocadas tras el commit; la caché de respuestas del API incluye las
+versiones en la clave, así una escritura invalida sin borrar nada (las entradas
+viejas caducan por TTL). Redis caído: el API no cachea y las subidas se pierden
+(las entradas ya cacheadas viven como mucho READ_CACHE_TTL_S).
+"""
+from __future__ import annotations
+import logging
+from typing import Dict, Iterable, Sequence
+
+import redis
+from django.conf import settings
+from django.db import transaction
+
+log = logging.getLogger(__name__)
+
+ENTITIES = ("bloque", "chofer", "orden", "recepcion", "distribucion")
+PREFIX = "distribucion:ver:"
+
+class EntityVersions:
+    def __init__(self, client, prefix: str = PREFIX):
+        self.r = client
+        self.prefix = prefix
+
+    def get_many(self, entities: Sequence[str]) -> Dict[str, int] | None:
+        """Versión actual de cada entidad (0 si nunca se subió); None si Redis no responde."""
+        try:
+            values = self.r.mget([self.prefix + e for e in entities])
+        except redis.RedisError:
+            log.warning("Versiones de entidades no disponibles", exc_info=True)
+            return None
+        return {e: int(v or 0) for e, v in zip(entities, values)}
+
+    def bump(self, entities: Iterable[str]) -> None:
+        entities = sorted(set(entities))
+        if not entities:
+            return
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            for e in entities:
+                pipe.incr(self.prefix + e)
+            pipe.execute()
+        except redis.RedisError:
+            log.warning("No se pudieron subir versiones", exc_info=True, extra={"entities": entities})
+
+    def bump_after_commit(self, entities: Iterable[str]) -> None:
+        # si la transacción (o el savepoint) se revierte no hay nada que invalidar
+        entities = tuple(entities)
+        transaction.on_commit(lambda: self.bump(entities))
+
+_VERSIONS: EntityVersions | None = None
+
+def entity_versions() -> EntityVersions | None:
+    """Instancia del proceso, o None si READ_CACHE_ENABLED está apagado."""
+    global _VERSIONS
+    if not settings.READ_CACHE_ENABLED:
+        return None
+    if _VERSIONS is None:
+        client = redis.Redis.from_url(settings.REDIS_DSN, socket_timeout=settings.READ_CACHE_REDIS_TIMEOUT_S,
+                                      socket_connect_timeout=settings.READ_CACHE_REDIS_TIMEOUT_S)
+        _VERSIONS = EntityVersions(client)
+    return _VERSIONS
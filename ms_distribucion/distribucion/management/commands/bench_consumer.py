@@ -0,0 +1,259 @@
+# distribucion/management/commands/bench_consumer.py
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connection, transaction
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import json, logging, random, time
+
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.application.pipeline import EventPipeline
+from distribucion.contracts.policy import ValidationPolicy
+from distribucion.contracts.validator import validate_cloudevent, validate_data
+from distribucion.infrastructure.messaging.codec import json_backend
+from distribucion.infrastructure.persistence.repositories import DjangoReadModelRepo, build_read_model_repo
+from distribucion.management.commands import consume_distribucion
+from distribucion.management.commands.seed_events import OK_FULL_PATH, make_event
+from distribucion.models import Pyme, CentroDistribucion, TipoCentro, Orden
+
+BASELINE_PATH = Path(settings.BASE_DIR) / "bench" / "baseline.json"
+TARGETS = ("usecase", "validate_ce", "validate_data", "loop")
+
+def make_stream(n: int, n_ordenes: int, dup_ratio: float, seed: int) -> list[dict]:
+    """n eventos de make_event; una fracción dup_ratio son re-entregas (mismo id) de uno anterior."""
+    rng = random.Random(seed)  # mismos eventos en cada corrida sin tocar el random global
+    base = json.loads(OK_FULL_PATH.read_text(encoding="utf-8"))
+    unicos: list[dict] = []
+    evts: list[dict] = []
+    for _ in range(n):
+        if unicos and rng.random() < dup_ratio:
+            evts.append(rng.choice(unicos))
+        else:
+            unicos.append(make_event(base, len(unicos), n_ordenes=n_ordenes, rng=rng))
+            evts.append(unicos[-1])
+    return evts
+
+def _seed_orders(evts: list[dict]) -> None:
+    """Crea pymes, CDs y órdenes referenciadas (la proyección estricta exige que existan)."""
+    pymes, cds, ordenes = {}, {}, {}
+    for ev in evts:
+        for o in ev["data"]["ordenes"]:
+            pymes[o["pyme"]["id"]] = o["pyme"]["nombre"]
+            cds[o["origen_cd"]["id"]] = o["origen_cd"]["nombre"]
+            cds[o["destino_cd"]["id"]] = o["destino_cd"]["nombre"]
+            ordenes[o["id"]] = o
+    Pyme.objects.bulk_create([Pyme(id=k, nombre=v) for k, v in pymes.items()], ignore_conflicts=True)
+    CentroDistribucion.objects.bulk_create(
+        [CentroDistribucion(id=k, nombre=v, tipo=TipoCentro.CD) for k, v in cds.items()], ignore_conflicts=True)
+    Orden.objects.bulk_create([
+        Orden(id=oid, pyme_id=o["pyme"]["id"], origen_cd_id=o["origen_cd"]["id"],
+              destino_cd_id=o["destino_cd"]["id"], fecha_despacho=o["fecha_despacho"])
+        for oid, o in ordenes.items()
+    ], ignore_conflicts=True, batch_size=1000)
+
+def _pct(values: list[float], q: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))] if s else 0.0
+
+@contextmanager
+def _rolled_back():
+    """El bench escribe en la BD configurada: cada repetición se revierte (no mide el commit)."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+class BenchConsumer:
+    """EventConsumer en memoria; mide la latencia por mensaje desde la entrega (read) hasta el ack."""
+    def __init__(self, msgs: list[dict]):
+        self.pending = list(msgs)
+        self.latencies: list[float] = []
+        self._delivered: dict[str, float] = {}
+
+    def claim_stale(self, min_idle_ms, count=100):
+        return []
+
+    def read(self, count=100, block_ms=5000):
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        now = time.perf_counter()
+        for m in batch:
+            self._delivered[m["id"]] = now
+        return batch
+
+    def ack(self, message_id):
+        self.ack_many([message_id])
+
+    def ack_many(self, message_ids):
+        now = time.perf_counter()
+        self.latencies.extend(now - self._delivered.pop(mid) for mid in message_ids)
+
+    def dead_letter(self, payload, error):
+        self.dead_letter_many([(payload, error)])
+
+    def dead_letter_many(self, entries):
+        entries = list(entries)
+        if entries:  # los eventos generados son válidos: una DLQ invalida la medida
+            raise CommandError(f"Evento a DLQ durante el bench: {entries[0][1]}")
+
+
+class Command(BaseCommand):
+    help = ("Benchmark del consumer: use case (DjangoReadModelRepo), validación de contrato y loop "
+            "completo de consume_distribucion con un EventConsumer en memoria. Compara con un baseline.")
+
+    def add_arguments(self, p):
+        p.add_argument("--n", type=int, default=2000, help="Mensajes por escenario")
+        p.add_argument("--ordenes", default="1,10,50", help="Órdenes por evento (lista)")
+        p.add_argument("--dup", default="0,0.2", help="Fracción de re-entregas (lista)")
+        p.add_argument("--targets", default=",".join(TARGETS), help=f"Subconjunto de {','.join(TARGETS)}")
+        p.add_argument("--repeat", type=int, default=3)
+        p.add_argument("--seed", type=int, default=42)
+        p.add_argument("--batch", action="store_true", help="Loop con un lote por transacción (como --batch)")
+        p.add_argument("--baseline", default=str(BASELINE_PATH))
+        p.add_argument("--save-baseline", action="store_true", help="Guarda los resultados como baseline")
+        p.add_argument("--tolerance", type=float, default=0.15,
+                       help="Caída máxima de eventos/s frente al baseline antes de fallar")
+        p.add_argument("--log-level", default="WARNING",
+                       help="Nivel de log durante la medida (INFO incluye el log por evento del pipeline)")
+
+    def handle(self, *args, **opts):
+        targets = [t for t in opts["targets"].split(",") if t]
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise CommandError(f"targets desconocidos: {sorted(unknown)}")
+        ordenes = [int(x) for x in opts["ordenes"].split(",")]
+        dups = [float(x) for x in opts["dup"].split(",")]
+
+        root = logging.getLogger()
+        level = root.level
+        root.setLevel(opts["log_level"])
+        try:
+            results = self._run_grid(targets, ordenes, dups, opts)
+        finally:
+            root.setLevel(level)
+
+        baseline = self._load_baseline(Path(opts["baseline"]))
+        regressions = self._report(results, baseline, opts["tolerance"])
+        if opts["save_baseline"]:
+            self._save_baseline(Path(opts["baseline"]), results, opts)
+            return
+        if regressions:
+            raise CommandError(f"Regresión frente al baseline: {', '.join(regressions)}")
+
+    # ---- medición ----
+    def _run_grid(self, targets, ordenes, dups, opts) -> dict:
+        results = {}
+        for n_ord in ordenes:
+            for i, dup in enumerate(dups):
+                evts = make_stream(opts["n"], n_ord, dup, opts["seed"])
+                for target in targets:
+                    if target.startswith("validate"):
+                        if i:
+                            continue  # la validación no depende de las re-entregas
+                        key = f"{target}/ordenes={n_ord}"
+                    else:
+                        key = f"{target}/ordenes={n_ord}/dup={dup:g}"
+                    results[key] = self._measure(target, evts, opts)
+        return results
+
+    def _measure(self, target: str, evts: list[dict], opts) -> dict:
+        run = getattr(self, f"_run_{target}")
+        best = None
+        for _ in range(opts["repeat"]):
+            wall, lat = run(evts, opts)
+            if best is None or wall < best[0]:
+                best = (wall, lat)
+        wall, lat = best
+        return {
+            "eps": round(len(evts) / wall, 1),
+            "p50_us": round(_pct(lat, 0.50) * 1e6, 1),
+            "p99_us": round(_pct(lat, 0.99) * 1e6, 1),
+        }
+
+    def _run_usecase(self, evts, opts):
+        lat = []
+        with _rolled_back():
+            _seed_orders(evts)
+            uc = HandleBloqueConsolidadoListo(DjangoReadModelRepo())
+            t_start = time.perf_counter()
+            for ev in evts:
+                t0 = time.perf_counter()
+                uc(ev)
+                lat.append(time.perf_counter() - t0)
+            wall = time.perf_counter() - t_start
+        return wall, lat
+
+    def _run_validate_ce(self, evts, opts):
+        return self._timed(evts, validate_cloudevent)
+
+    def _run_validate_data(self, evts, opts):
+        return self._timed(evts, lambda ev: validate_data(ev["data"], ev["dataschema"]))
+
+    def _timed(self, evts, fn):
+        fn(evts[0])  # compila/calienta el validador fuera de la medida
+        lat = []
+        t_start = time.perf_counter()
+        for ev in evts:
+            t0 = time.perf_counter()
+            fn(ev)
+            lat.append(time.perf_counter() - t0)
+        return time.perf_counter() - t_start, lat
+
+    def _run_loop(self, evts, opts):
+        # payloads como llegan de Redis en modo bytes; el loop es el de consume_distribucion
+        msgs = [{"id": f"{k + 1}-0", "data": json.dumps(ev, ensure_ascii=False).encode("utf-8")}
+                for k, ev in enumerate(evts)]
+        consumer = BenchConsumer(msgs)
+        cmd = consume_distribucion.Command()
+        work_opts = {"once": True, "from_start": False, "batch": opts["batch"]}
+        with _rolled_back():
+            _seed_orders(evts)
+            policy = ValidationPolicy(settings.CONTRACTS_VALIDATION_POLICY,
+                                      default=settings.CONTRACTS_VALIDATION_DEFAULT)
+            pipeline = EventPipeline(
+                HandleBloqueConsolidadoListo(repo=build_read_model_repo(), strict_orders=True), policy=policy)
+            t_start = time.perf_counter()
+            while consumer.pending:
+                # --once: hasta dos lecturas por llamada
+                cmd._work_sync("bench", pipeline, work_opts, consumer=consumer)
+            wall = time.perf_counter() - t_start
+        return wall, consumer.latencies
+
+    # ---- baseline ----
+    def _load_baseline(self, path: Path) -> dict:
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f"Sin baseline en {path}; solo se muestran resultados"))
+            return {}
+        data = json.loads(path.read_text(encoding="utf-8"))
+        meta = data.get("meta", {})
+        if meta.get("db_vendor") != connection.vendor or meta.get("json_backend") != json_backend():
+            self.stdout.write(self.style.WARNING(
+                f"Baseline medido con db={meta.get('db_vendor')} json={meta.get('json_backend')}; "
+                f"ahora db={connection.vendor} json={json_backend()}: la comparación es orientativa"))
+        return data.get("results", {})
+
+    def _save_baseline(self, path: Path, results: dict, opts) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "n": opts["n"], "repeat": opts["repeat"], "seed": opts["seed"], "batch": opts["batch"],
+            "db_vendor": connection.vendor, "json_backend": json_backend(),
+        }
+        path.write_text(json.dumps({"meta": meta, "results": results}, indent=2, sort_keys=True) + "\n",
+                        encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"Baseline guardado en {path}"))
+
+    def _report(self, results: dict, baseline: dict, tolerance: float) -> list[str]:
+        regressions = []
+        self.stdout.write(f"{'escenario':<34}{'ev/s':>10}{'p50 µs':>10}{'p99 µs':>10}{'vs baseline':>13}")
+        for key, r in results.items():
+            line = f"{key:<34}{r['eps']:>10.1f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}"
+            base = baseline.get(key)
+            if base:
+                delta = r["eps"] / base["eps"] - 1
+                line += f"{delta:>+12.1%}"
+                if delta < -tolerance:
+                    regressions.append(key)
+                    line = self.style.ERROR(line)
+            self.stdout.write(line)
+        return regressions
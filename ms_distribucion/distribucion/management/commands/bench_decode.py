@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+import json, time
+
+from distribucion.infrastructure.messaging.codec import fast_loads, orjson
+from distribucion.management.commands.seed_events import OK_FULL_PATH, make_event
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+class Command(BaseCommand):
+    help = "Micro-benchmark de decodificación por evento: str + json (antes) vs bytes + parser rápido (después)."
+
+    def add_arguments(self, p):
+        p.add_argument("--n", type=int, default=20000)
+        p.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        base = json.loads(OK_FULL_PATH.read_text(encoding="utf-8"))
+        n = opts["n"]
+        # payloads tal como llegan de Redis en modo bytes
+        payloads = [json.dumps(make_event(base, i), ensure_ascii=False).encode("utf-8") for i in range(n)]
+
+        def before():
+            # decode_responses=True (UTF-8 -> str en redis-py) + json.loads
+            for p in payloads:
+                json.loads(p.decode("utf-8"))
+
+        def after():
+            for p in payloads:
+                fast_loads(p)
+
+        t_before = _best_of(opts["repeat"], before)
+        t_after = _best_of(opts["repeat"], after)
+        us = lambda t: t / n * 1e6
+        self.stdout.write(f"eventos: {n}  tamaño medio: {sum(map(len, payloads)) // n} B")
+        self.stdout.write(f"{'antes   (str + json)':<26}{us(t_before):8.2f} µs/evento")
+        backend = "orjson" if orjson is not None else "json"
+        self.stdout.write(f"{f'después (bytes + {backend})':<26}{us(t_after):8.2f} µs/evento")
+        self.stdout.write(self.style.SUCCESS(f"speedup x{t_before / t_after:.2f}"))
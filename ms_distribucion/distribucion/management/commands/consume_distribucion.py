@@ -1,92 +1,242 @@
-# distribucion/management/commands/consume_bloques.py
-from django.core.management.base import BaseCommand
+# distribucion/management/commands/consume_distribucion.py
+from dataclasses import dataclass
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from django.db import transaction
-import json, logging, signal
+from django.db import connections
+import asyncio, logging, multiprocessing, signal, time
 
-from distribucion.application.use_cases.handle_bloque_consolidado import (
-    HandleBloqueConsolidadoListo, ProjectionError
-)
-from distribucion.infrastructure.persistence.repositories import DjangoReadModelRepo
-from distribucion.contracts.validator import ContractError, validate_cloudevent, validate_data
-from distribucion.infrastructure.messaging.redis_consumer import RedisEventConsumer
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.application.pipeline import EventPipeline, split_poison
+from distribucion.application.ports import EventConsumer
+from distribucion.infrastructure.persistence.repositories import build_read_model_repo
+from distribucion.infrastructure.persistence.event_cache import RecentEventCache
+from distribucion.contracts.policy import ValidationPolicy
+from distribucion.contracts.validator import warm_validators, validator_cache_stats
+from distribucion.infrastructure.messaging.redis_consumer import RedisEventConsumer, AsyncRedisEventConsumer
+from distribucion.infrastructure.messaging.async_engine import AsyncConsumerEngine
+from distribucion.infrastructure.messaging.read_sizer import ReadSizer
+from distribucion.infrastructure.metrics import STAGE_SECONDS, serve as serve_metrics
 
 log = logging.getLogger(__name__)
 RUNNING = True
 
+@dataclass
+class RestartBackoff:
+    """
+    Espera antes de reiniciar un worker caído: base_s, 2·base_s, 4·base_s... hasta max_s.
+    Un worker que aguantó max_s vivo vuelve a empezar la serie; tras `max_failures`
+    caídas seguidas (0 = sin tope) se deja de reiniciar.
+    """
+    base_s: float
+    max_s: float
+    max_failures: int = 0
+    failures: int = 0
+
+    def next_delay(self, uptime_s: float) -> float | None:
+        if uptime_s >= self.max_s:
+            self.failures = 0
+        self.failures += 1
+        if self.max_failures and self.failures > self.max_failures:
+            return None
+        return min(self.max_s, self.base_s * 2 ** (self.failures - 1))
+
 class Command(BaseCommand):
     help = "Consume eventos y proyecta Bloque/BloqueOrden (idempotente)."
 
     def add_arguments(self, parser):
         parser.add_argument("--once", action="store_true")
         parser.add_argument("--from-start", action="store_true")
+        parser.add_argument("--batch", action="store_true",
+                            help="Proyecta cada lote XREADGROUP en una sola transacción")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Nº de procesos consumidores en el mismo grupo (supervisados)")
+        parser.add_argument("--engine", choices=["sync", "async"], default=settings.CONSUMER_ENGINE,
+                            help="async: redis.asyncio con varios lotes en vuelo y orden por bloque")
+        parser.add_argument("--concurrency", type=int, default=settings.ASYNC_CONCURRENCY,
+                            help="Máx. de proyecciones concurrentes (engine async)")
 
     def handle(self, *args, **opts):
-        global RUNNING
+        self._install_signals()
+        if opts["workers"] > 1:
+            return self._supervise(opts["workers"], opts)
+        self._work(settings.REDIS_CONSUMER, opts)
+
+    def _install_signals(self):
         signal.signal(signal.SIGTERM, lambda *_: self._stop())
         signal.signal(signal.SIGINT,  lambda *_: self._stop())
 
-        # ⚙️ Instancia del adapter (implementar EventConsumer)
-        consumer = RedisEventConsumer(
-            dsn=settings.REDIS_DSN,
-            stream=settings.REDIS_STREAM,
-            group=settings.REDIS_GROUP,
-            consumer=settings.REDIS_CONSUMER,
-        )
+    def _supervise(self, n: int, opts, ctx=None):
+        """Lanza N workers (fork) con nombres de consumer distintos y reinicia los que mueran, con backoff."""
+        ctx = ctx or multiprocessing.get_context("fork")
+        started: dict[int, float] = {}
 
-        uc = HandleBloqueConsolidadoListo(repo=DjangoReadModelRepo(), strict_orders=True)
+        def spawn(i):
+            name = f"{settings.REDIS_CONSUMER}-{i}"
+            p = ctx.Process(target=self._work_child, args=(name, opts, i), name=name)
+            p.start()
+            started[i] = time.monotonic()
+            log.info("Worker iniciado", extra={"worker": name, "pid": p.pid})
+            return p
 
-        def process(msg):
-            mid = msg["id"]
-            raw = msg.get("data")
-            if not raw:
-                log.warning("Mensaje sin 'data'", extra={"id": mid})
-                return consumer.ack(mid)
+        connections.close_all()  # no compartir conexiones DB entre procesos
+        backoff = {i: RestartBackoff(settings.SUPERVISOR_BACKOFF_BASE_S, settings.SUPERVISOR_BACKOFF_MAX_S,
+                                     settings.SUPERVISOR_MAX_RESTARTS) for i in range(n)}
+        procs = {i: spawn(i) for i in range(n)}
+        respawn_at: dict[int, float] = {}
+        gave_up = None
+        while RUNNING and (procs or respawn_at) and gave_up is None:
+            time.sleep(settings.SUPERVISOR_POLL_S)
+            now = time.monotonic()
+            for i, at in list(respawn_at.items()):
+                if now >= at:
+                    del respawn_at[i]
+                    procs[i] = spawn(i)
+            for i, p in list(procs.items()):
+                if p.is_alive():
+                    continue
+                del procs[i]
+                if p.exitcode == 0 or not RUNNING:
+                    continue  # salida limpia (p. ej. --once) o parada en curso
+                delay = backoff[i].next_delay(now - started[i])
+                if delay is None:
+                    log.error("Worker cae en bucle; se detiene el supervisor",
+                              extra={"worker": p.name, "exitcode": p.exitcode, "failures": backoff[i].failures})
+                    gave_up = p.name
+                    break
+                log.warning("Worker caído; reinicio con backoff",
+                            extra={"worker": p.name, "exitcode": p.exitcode, "delay_s": delay})
+                respawn_at[i] = now + delay
 
-            try:
-                evt = json.loads(raw)
-            except Exception as e:
-                log.exception("JSON inválido", extra={"id": mid})
-                return consumer.dead_letter(raw, f"json:{e}") or consumer.ack(mid)
+        for p in procs.values():
+            p.terminate()  # SIGTERM => parada ordenada en el hijo
+        for p in procs.values():
+            p.join(timeout=settings.XREAD_BLOCK_MS / 1000 + 5)
+        log.info("Supervisor detenido.")
+        if gave_up is not None:
+            # salida != 0: que el orquestador lo vea en lugar de reiniciar en silencio
+            raise CommandError(f"{gave_up}: {settings.SUPERVISOR_MAX_RESTARTS} caídas seguidas")
 
-            # ✅ Validación contrato (CE + data)
-            try:
-                validate_cloudevent(evt)
-                validate_data(evt.get("data") or {}, evt.get("dataschema"))
-            except ContractError as e:
-                log.exception("Contrato inválido", extra={"id": mid, "cloudevent_id": evt.get("id")})
-                return consumer.dead_letter(raw, f"contract:{e}") or consumer.ack(mid)
+    def _work_child(self, consumer_name: str, opts, worker_index: int):
+        self._install_signals()
+        self._work(consumer_name, opts, worker_index)
 
-            # 🧩 Proyección
-            try:
-                with transaction.atomic():
-                    res = uc(evt)
-                log.info("OK", extra={"id": mid, "cloudevent_id": evt.get("id"), "res": res})
-                return consumer.ack(mid)
-            except ProjectionError as e:
-                log.exception("Proyección inválida", extra={"id": mid, "cloudevent_id": evt.get("id")})
-                return consumer.dead_letter(raw, f"projection:{e}") or consumer.ack(mid)
-            except Exception as e:
-                log.exception("Error inesperado", extra={"id": mid})
-                return consumer.dead_letter(raw, f"unexpected:{e}") or consumer.ack(mid)
-
-        # Primer barrido opcional (backlog)
+    def _work(self, consumer_name: str, opts, worker_index: int = 0):
+        if settings.METRICS_PORT:
+            # un puerto por worker: METRICS_PORT + índice (ver METRICS_TARGETS en la API)
+            serve_metrics(settings.METRICS_PORT + worker_index)
+        recent = RecentEventCache(settings.EVENT_CACHE_SIZE) if settings.EVENT_CACHE_SIZE > 0 else None
+        uc = HandleBloqueConsolidadoListo(repo=build_read_model_repo(recent_events=recent), strict_orders=True)
+        policy = ValidationPolicy(settings.CONTRACTS_VALIDATION_POLICY, default=settings.CONTRACTS_VALIDATION_DEFAULT)
+        pipeline = EventPipeline(uc, policy=policy)
+        warm_validators(settings.CONTRACTS_WARM_DATASCHEMAS)
+        if opts["engine"] == "async":
+            self._work_async(consumer_name, pipeline, opts)
+        else:
+            self._work_sync(consumer_name, pipeline, opts)
+        log.info("Worker detenido.", extra={
+            "validators": validator_cache_stats(),
+            "validation_policy": policy.stats(),
+            "recent_events": recent.stats() if recent else None,
+        })
+
+    def _work_sync(self, consumer_name: str, pipeline: EventPipeline, opts, consumer: EventConsumer | None = None):
+        # ⚙️ Instancia del adapter (implementar EventConsumer); bench_consumer inyecta uno en memoria
+        if consumer is None:
+            consumer = RedisEventConsumer(
+                dsn=settings.REDIS_DSN,
+                stream=settings.REDIS_STREAM,
+                group=settings.REDIS_GROUP,
+                consumer=consumer_name,
+                dlq_stream=settings.DLQ_STREAM,
+                raw=settings.CONSUMER_BYTES_MODE,
+            )
+
+        batch_mode = opts["batch"] or settings.CONSUMER_BATCH_TX
+
+        def dispatch(msgs):
+            if not msgs:
+                return
+            errors = pipeline.process_batch(msgs) if batch_mode else [pipeline.process(m) for m in msgs]
+            if errors is None:
+                return  # sin ack: los mensajes quedan en el PEL y se reentregan
+            # DLQ y ack por lote (round trips constantes); DLQ primero para no perder nada
+            with STAGE_SECONDS.time(stage="ack"):
+                consumer.dead_letter_many([(m.get("data"), err) for m, err in zip(msgs, errors) if err])
+                consumer.ack_many([m["id"] for m in msgs])
+
+        def reclaim():
+            # Pendientes de workers caídos (idle > XAUTOCLAIM_IDLE) pasan a este consumer
+            claimed = list(consumer.claim_stale(settings.XAUTOCLAIM_IDLE, count=settings.XREAD_COUNT))
+            claimed, poison = split_poison(claimed, settings.XAUTOCLAIM_MAX_DELIVERIES)
+            if poison:
+                consumer.dead_letter_many([(m.get("data"), why) for m, why in poison])
+                consumer.ack_many([m["id"] for m, _ in poison])
+            if claimed:
+                log.info("Pendientes reclamados", extra={"consumer": consumer_name, "n": len(claimed)})
+                dispatch(claimed)
+
+        # Pendientes huérfanos primero, luego primer barrido opcional (backlog)
+        reclaim()
+        last_claim = time.monotonic()
         start_block = 1000 if opts["from_start"] else 1
-        for m in consumer.read(count=settings.XREAD_COUNT, block_ms=start_block):
-            process(m)
+        dispatch(list(consumer.read(count=settings.XREAD_COUNT, block_ms=start_block)))
 
         # Loop principal
+        sizer = _read_sizer()
         while RUNNING:
-            msgs = list(consumer.read(count=settings.XREAD_COUNT, block_ms=settings.XREAD_BLOCK_MS))
+            if time.monotonic() - last_claim >= settings.XAUTOCLAIM_EVERY_S:
+                reclaim()
+                last_claim = time.monotonic()
+            with STAGE_SECONDS.time(stage="xread"):
+                msgs = list(consumer.read(count=sizer.count, block_ms=sizer.block_ms))
             if not msgs and opts["once"]:
                 break
-            for m in msgs:
-                process(m)
+            t0 = time.perf_counter()
+            dispatch(msgs)
+            sizer.observe(len(msgs), time.perf_counter() - t0)
             if opts["once"]:
                 break
 
-        log.info("Worker detenido.")
+
+    def _work_async(self, consumer_name: str, pipeline: EventPipeline, opts):
+        consumer = AsyncRedisEventConsumer(
+            dsn=settings.REDIS_DSN,
+            stream=settings.REDIS_STREAM,
+            group=settings.REDIS_GROUP,
+            consumer=consumer_name,
+            dlq_stream=settings.DLQ_STREAM,
+            raw=settings.CONSUMER_BYTES_MODE,
+        )
+        engine = AsyncConsumerEngine(
+            consumer, pipeline,
+            concurrency=opts["concurrency"],
+            inflight_batches=settings.ASYNC_INFLIGHT_BATCHES,
+            count=settings.XREAD_COUNT,
+            block_ms=settings.XREAD_BLOCK_MS,
+            sizer=_read_sizer(),
+            claim_idle_ms=settings.XAUTOCLAIM_IDLE,
+            claim_every_s=settings.XAUTOCLAIM_EVERY_S,
+            max_deliveries=settings.XAUTOCLAIM_MAX_DELIVERIES,
+        )
+
+        async def main():
+            await consumer.ensure_group()
+            try:
+                await engine.run(should_run=lambda: RUNNING, once=opts["once"])
+            finally:
+                await consumer.close()
+
+        asyncio.run(main())
 
     def _stop(self):  # graceful shutdown
         global RUNNING
         RUNNING = False
+
+def _read_sizer() -> ReadSizer:
+    if not settings.XREAD_ADAPTIVE:
+        return ReadSizer.fixed(settings.XREAD_COUNT, settings.XREAD_BLOCK_MS)
+    return ReadSizer(
+        min_count=settings.XREAD_COUNT_MIN, max_count=settings.XREAD_COUNT_MAX,
+        min_block_ms=settings.XREAD_BLOCK_MIN_MS, max_block_ms=settings.XREAD_BLOCK_MS,
+        target_batch_s=settings.XREAD_TARGET_BATCH_MS / 1000,
+    )
@@ -0,0 +1,92 @@
+# distribucion/management/commands/rebuild_projection.py
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+import logging, time
+
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.application.pipeline import EventPipeline
+from distribucion.infrastructure.messaging.redis_consumer import RedisStreamRange
+from distribucion.infrastructure.persistence.rebuild import (
+    ShadowReadModelRepo, create_shadow_tables, drop_shadow_tables, swap_in,
+)
+
+log = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = ("Reconstruye Bloque/BloqueOrden re-proyectando el stream desde 0 en tablas sombra "
+            "(bulk, último escritor gana) y las sustituye atómicamente al final. "
+            "Requiere el consumer parado.")
+
+    def add_arguments(self, p):
+        p.add_argument("--batch", type=int, default=5000, help="Entradas por XRANGE / volcado a sombra")
+        p.add_argument("--no-swap", action="store_true", help="Construye la sombra y la deja sin sustituir")
+        p.add_argument("--prune", action="store_true",
+                       help="Borra los bloques que el stream ya no contiene (solo si nunca se recortó)")
+        p.add_argument("--active-idle-ms", type=int, default=60000,
+                       help="Un consumer del grupo con actividad más reciente que esto cuenta como activo")
+
+    def handle(self, *args, **opts):
+        stream = RedisStreamRange(settings.REDIS_DSN, settings.REDIS_STREAM)
+        self._check_stopped(stream, opts)
+        if opts["prune"] and not opts["no_swap"] and stream.is_complete() is not True:
+            # recortado (MAXLEN/XTRIM) o sin forma de saberlo: borraría bloques de eventos perdidos
+            raise CommandError("--prune requiere que el stream conserve todas sus entradas desde el origen")
+
+        repo = ShadowReadModelRepo()
+        uc = HandleBloqueConsolidadoListo(repo=repo, strict_orders=True)
+        pipeline = EventPipeline(uc)  # decode + validación completa, igual que el consumer
+        stats = {"leidos": 0, "proyectados": 0, "duplicados": 0, "rechazados": 0}
+        t0 = time.monotonic()
+
+        create_shadow_tables()
+        until = stream.last_id()
+        self._project(stream, repo, uc, pipeline, "0-0", until, opts["batch"], stats)
+
+        if opts["no_swap"]:
+            self.stdout.write(f"Sombra construida (sin swap): {stats}")
+            return
+        self._check_stopped(stream, opts)
+
+        def catch_up():
+            # (until, $]: lo que llegó mientras se construía la sombra, dentro de la transacción del swap
+            last = stream.last_id()
+            if last is not None and last != until:
+                self._project(stream, repo, uc, pipeline, until or "0-0", last, opts["batch"], stats)
+
+        stats.update(swap_in(repo.choferes, catch_up=catch_up, prune=opts["prune"]))
+        drop_shadow_tables()
+        stats["segundos"] = round(time.monotonic() - t0, 1)
+        log.info("Rebuild terminado", extra=stats)
+        self.stdout.write(self.style.SUCCESS(" ".join(f"{k}={v}" for k, v in stats.items())))
+
+    def _check_stopped(self, stream, opts):
+        active = stream.active_consumers(settings.REDIS_GROUP, opts["active_idle_ms"])
+        if active:
+            # sus proyecciones posteriores a la sombra se perderían en el swap
+            raise CommandError(f"Consumers activos en {settings.REDIS_GROUP}: {', '.join(active)}; páralos antes")
+
+    def _project(self, stream, repo, uc, pipeline, cursor, until, batch, stats):
+        while until is not None:
+            entries = stream.scan(cursor, until, count=batch)
+            if not entries:
+                break
+            cursor = entries[-1]["id"]
+            stats["leidos"] += len(entries)
+
+            evts = []
+            for msg in entries:
+                evt, err = pipeline.prepare(msg)
+                if evt is not None:
+                    evts.append(evt)
+                elif err:
+                    stats["rechazados"] += 1
+            repo.prefetch_orders(str(o.get("id")) for e in evts for o in e["data"]["ordenes"])
+            for res in uc.handle_many(evts, isolate=repo.isolate):
+                if isinstance(res, Exception):
+                    stats["rechazados"] += 1
+                elif res.get("status") == "duplicate":
+                    stats["duplicados"] += 1
+                else:
+                    stats["proyectados"] += 1
+            repo.flush()
+            log.info("Rebuild: página volcada", extra={"hasta": cursor, **stats})
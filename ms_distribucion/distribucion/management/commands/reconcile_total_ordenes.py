@@ -0,0 +1,49 @@
+# distribucion/management/commands/reconcile_total_ordenes.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from distribucion.models import Bloque, BloqueOrden
+from distribucion.infrastructure.read_cache import entity_versions
+
+CHUNK = 1000
+
+def _real_total():
+    counts = (BloqueOrden.objects
+              .filter(bloque=OuterRef("pk"))
+              .values("bloque")
+              .annotate(n=Count("id"))
+              .values("n"))
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+class Command(BaseCommand):
+    help = "Corrige la deriva de Bloque.total_ordenes (mantenido de forma incremental) contra BloqueOrden."
+
+    def add_arguments(self, p):
+        p.add_argument("--bloque", action="append", default=[], help="Limita a estos bloques (repetible)")
+        p.add_argument("--dry-run", action="store_true", help="Solo informa la deriva")
+
+    def handle(self, *args, **opts):
+        qs = Bloque.objects.annotate(real=_real_total())
+        if opts["bloque"]:
+            qs = qs.filter(id__in=opts["bloque"])
+        drift = [(b_id, old, real) for b_id, old, real in qs.values_list("id", "total_ordenes", "real") if old != real]
+
+        for b_id, old, real in drift[:20]:
+            self.stdout.write(f"{b_id}: {old} -> {real}")
+        if opts["dry_run"] or not drift:
+            self.stdout.write(self.style.SUCCESS(f"OK: {len(drift)} bloques con deriva"))
+            return
+
+        ids = [b_id for b_id, _, _ in drift]
+        with transaction.atomic():
+            for i in range(0, len(ids), CHUNK):
+                # un UPDATE ... SET total_ordenes = (subquery) por chunk
+                Bloque.objects.filter(id__in=ids[i:i + CHUNK]).update(
+                    total_ordenes=_real_total(), updated_at=timezone.now())
+            versions = entity_versions()
+            if versions is not None:
+                versions.bump_after_commit(["bloque"])
+        self.stdout.write(self.style.SUCCESS(f"OK: corregidos {len(ids)} bloques"))
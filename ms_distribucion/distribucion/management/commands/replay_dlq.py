@@ -0,0 +1,97 @@
+# distribucion/management/commands/replay_dlq.py
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+import logging, time
+
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.application.pipeline import EventPipeline
+from distribucion.infrastructure.persistence.repositories import build_read_model_repo
+from distribucion.infrastructure.messaging.redis_consumer import RedisDeadLetterQueue, legacy_dlq_stream
+
+log = logging.getLogger(__name__)
+
+UNVALIDATED = "unvalidated:"
+
+def matches(error: str, prefixes: tuple) -> bool:
+    """Prefijo sobre el motivo; "projection:" casa también con "unvalidated:projection:"."""
+    if not prefixes:
+        return True
+    return error.startswith(prefixes) or (error.startswith(UNVALIDATED)
+                                          and error[len(UNVALIDATED):].startswith(prefixes))
+
+class Command(BaseCommand):
+    help = ("Reprocesa la DLQ por lotes con el camino transaccional del consumer "
+            "(validación completa + proyección); borra lo reproyectado.")
+
+    def add_arguments(self, p):
+        p.add_argument("--prefix", action="append", default=[],
+                       help='Solo errores con este prefijo (repetible), p. ej. "projection:". '
+                            'Ignora el "unvalidated:" que la política de validación antepone; '
+                            'para solo esos, --prefix "unvalidated:"')
+        p.add_argument("--stream", default=None,
+                       help="Stream a reprocesar (por defecto DLQ_STREAM). --stream legacy = <REDIS_STREAM>.dlq, "
+                            "la DLQ anterior; lo que vuelva a fallar se re-encola en DLQ_STREAM")
+        p.add_argument("--batch", type=int, default=1000)
+        p.add_argument("--rate", type=float, default=0, help="Máx. mensajes/s (0 = sin límite)")
+        p.add_argument("--limit", type=int, default=0, help="Máx. mensajes a reprocesar (0 = todos)")
+        p.add_argument("--dry-run", action="store_true", help="Solo cuenta lo que se reprocesaría")
+        p.add_argument("--keep", action="store_true", help="No borra las entradas reprocesadas")
+
+    def handle(self, *args, **opts):
+        stream = opts["stream"] or settings.DLQ_STREAM
+        if stream == "legacy":
+            stream = legacy_dlq_stream(settings.REDIS_STREAM)
+        dlq = RedisDeadLetterQueue(settings.REDIS_DSN, stream)
+        # los que siguen fallando van siempre a la DLQ actual (migra la antigua al vaciarla)
+        target = dlq if stream == settings.DLQ_STREAM else RedisDeadLetterQueue(settings.REDIS_DSN, settings.DLQ_STREAM)
+        # validación completa siempre: la política del consumer no aplica al replay
+        pipeline = EventPipeline(HandleBloqueConsolidadoListo(repo=build_read_model_repo(), strict_orders=True))
+        prefixes = tuple(opts["prefix"])
+        batch = max(1, min(opts["batch"], int(opts["rate"]) or opts["batch"]))
+        limit = opts["limit"]
+
+        # las entradas que vuelvan a fallar se re-encolan al final: no se re-leen en esta pasada
+        until = dlq.last_id()
+        stats = {"leidos": 0, "filtrados": 0, "ok": 0, "fallidos": 0, "borrados": 0}
+        cursor = "0-0"
+        t_start, done = time.monotonic(), 0
+
+        while until is not None:
+            entries = dlq.scan(cursor, until, count=opts["batch"])
+            if not entries:
+                break
+            cursor = entries[-1]["id"]
+            stats["leidos"] += len(entries)
+            todo = [e for e in entries if matches(str(e.get("error", "")), prefixes)]
+            if limit:
+                todo = todo[:max(limit - stats["filtrados"], 0)]
+            stats["filtrados"] += len(todo)
+
+            for i in range(0, len(todo), batch):
+                chunk = todo[i:i + batch]
+                if not opts["dry_run"]:
+                    self._replay(dlq, target, pipeline, chunk, stats, keep=opts["keep"])
+                done += len(chunk)
+                if opts["rate"] and not opts["dry_run"]:
+                    # límite de tasa: no adelantarse a rate mensajes/s desde el inicio
+                    ahead = done / opts["rate"] - (time.monotonic() - t_start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            if limit and stats["filtrados"] >= limit:
+                break
+
+        log.info("Replay DLQ terminado", extra={**stats, "stream": stream})
+        self.stdout.write(self.style.SUCCESS(" ".join(f"{k}={v}" for k, v in stats.items())))
+
+    def _replay(self, dlq, target, pipeline, chunk, stats, keep: bool):
+        errors = pipeline.process_batch(chunk)
+        if errors is None:
+            raise CommandError(f"Lote revertido; la DLQ queda intacta desde {chunk[0]['id']}")
+        failed = [(e["data"], err) for e, err in zip(chunk, errors) if err]
+        stats["ok"] += len(chunk) - len(failed)
+        stats["fallidos"] += len(failed)
+        if keep:
+            return
+        # re-encola los que siguen fallando (con el motivo nuevo) antes de borrar el lote
+        target.append_many(failed)
+        stats["borrados"] += dlq.delete_many([e["id"] for e in chunk])
@@ -15,39 +15,56 @@ def gen_traceparent() -> str:
     parent_id = uuid4().hex[:16]               # 16 hex
     return f"00-{trace_id}-{parent_id}-01"
 
-def make_event(base: dict, i: int) -> dict:
-    ev = json.loads(json.dumps(base))  # deep copy
+CE_TYPE = "logistrack.distribucion.BloqueConsolidadoListo.v2"
+DATASCHEMA = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/1.2/schema.json"
+
+CHOFERES = [
+    {"id": "0c1e8a10-0000-4000-8000-000000000010", "nombre": "María López"},
+    {"id": "0c1e8a10-0000-4000-8000-000000000011", "nombre": "Juan Pérez"},
+    {"id": "0c1e8a10-0000-4000-8000-000000000012", "nombre": "Ana Gómez"},
+]
+
+def make_event(base: dict, i: int, n_ordenes: int | None = None, rng: random.Random | None = None) -> dict:
+    """
+    Evento v2 (data v1.2) a partir del sobre de `base` (ok-full.json es v1: solo se
+    reaprovechan specversion/source/datacontenttype). Órdenes o-{i}-{j}, 1..3 si no se fija n_ordenes.
+    `rng` (p. ej. random.Random(seed)) hace reproducible el contenido; por defecto, el random global.
+    """
+    rng = rng or random
+    ev = {k: base[k] for k in ("specversion", "source", "datacontenttype")}
     now = datetime.now(timezone.utc)
+    ev["type"] = CE_TYPE
+    ev["dataschema"] = DATASCHEMA
     ev["id"] = str(uuid4())
     ev["time"] = now.isoformat()
     ev["subject"] = f"bloque:b-{1000+i}"
     ev["traceparent"] = gen_traceparent()
-    # data
-    ev["data"]["bloque_id"] = f"b-{1000+i}"
-    ev["data"]["fecha_despacho"] = (now - timedelta(days=random.randint(0, 10))).isoformat()
-    # chofer
-    choferes = [
-        {"id": "c-10", "nombre": "María López"},
-        {"id": "c-11", "nombre": "Juan Pérez"},
-        {"id": "c-12", "nombre": "Ana Gómez"},
-    ]
-    ch = random.choice(choferes)
-    ev["data"]["chofer"] = ch
-    # órdenes (1..3)
-    n = random.randint(1, 3)
-    ev["data"]["ordenes"] = []
+    fecha = (now - timedelta(days=rng.randint(0, 10))).isoformat()
+    # órdenes
+    n = n_ordenes or rng.randint(1, 3)
+    ordenes = []
     for j in range(n):
-        oid = f"o-{i}-{j}"
-        ev["data"]["ordenes"].append({
-            "id": oid, "pyme_id": f"p-{random.randint(1,5)}",
-            "origen_cd_id": f"cd-{random.choice(list('abc'))}",
-            "destino_cd_id": f"cd-{random.choice(list('abc'))}",
+        pyme = rng.randint(1, 5)
+        origen, destino = rng.choice("abc"), rng.choice("abc")
+        sku = rng.randint(1, 9)
+        ordenes.append({
+            "id": f"o-{i}-{j}",
+            "pyme": {"id": f"p-{pyme}", "nombre": f"Pyme {pyme}"},
+            "origen_cd": {"id": f"cd-{origen}", "nombre": f"CD {origen.upper()}"},
+            "destino_cd": {"id": f"cd-{destino}", "nombre": f"CD {destino.upper()}"},
+            "fecha_despacho": fecha,
+            "estado_preparacion": "COM",
             "productos": [
-                {"sku": f"SKU-{random.randint(1,9)}", "qty": random.randint(1,3),
-                 "peso": round(random.uniform(0.5, 5.0), 2),
-                 "volumen": round(random.uniform(0.01, 0.2), 3)}
-            ]
+                {"producto": {"sku": f"SKU-{sku}", "nombre": f"Producto {sku}"},
+                 "qty": rng.randint(1, 3),
+                 "peso": round(rng.uniform(0.5, 5.0), 2),
+                 "volumen": round(rng.uniform(0.01, 0.2), 3)}
+            ],
         })
+    ev["data"] = {
+        "bloque": {"id": f"b-{1000+i}", "fecha": fecha, "chofer": rng.choice(CHOFERES)},
+        "ordenes": ordenes,
+    }
     return ev
 
 class Command(BaseCommand):
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distribucion', '0004_remove_pyme_pyme_asociada_remove_pyme_tipo_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bloque',
+            index=models.Index(fields=['updated_at'], name='distribucio_updated_0c4733_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='distribucion',
+            index=models.Index(fields=['updated_at'], name='distribucio_updated_2516b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['updated_at'], name='distribucio_updated_241d9a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recepcion',
+            index=models.Index(fields=['updated_at'], name='distribucio_updated_77abb5_idx'),
+        ),
+    ]
@@ -83,6 +83,7 @@ class Orden(TimeStamped):
         indexes = [
             models.Index(fields=["pyme", "fecha_despacho"]),
             models.Index(fields=["destino_cd", "fecha_despacho"]),
+            models.Index(fields=["updated_at"]),  # sondas ETag/Last-Modified (api/conditional.py)
         ]
 
 class OrdenProducto(models.Model):
@@ -127,6 +128,7 @@ class Bloque(TimeStamped):
         indexes = [
             models.Index(fields=["fecha"]),
             models.Index(fields=["chofer", "estado_completitud"]),
+            models.Index(fields=["updated_at"]),
         ]
 
 class BloqueOrden(models.Model):
@@ -146,7 +148,10 @@ class Recepcion(TimeStamped):
     usuario_receptor = models.CharField(max_length=120)
     incidencias = models.BooleanField(default=False)
     class Meta:
-        indexes = [models.Index(fields=["cd", "fecha_recepcion", "incidencias"])]
+        indexes = [
+            models.Index(fields=["cd", "fecha_recepcion", "incidencias"]),
+            models.Index(fields=["updated_at"]),
+        ]
 
 # -------- Distribución (última milla) --------
 class Distribucion(TimeStamped):
@@ -158,6 +163,7 @@ class Distribucion(TimeStamped):
         indexes = [
             models.Index(fields=["estado", "fecha_entrega"]),
             models.Index(fields=["chofer", "estado"]),
+            models.Index(fields=["updated_at"]),
         ]
 
 # -------- Idempotencia (event processing) --------
@@ -0,0 +1,95 @@
+# tests/api/test_conditional_get.py
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from distribucion.infrastructure.persistence.repositories import DjangoReadModelRepo
+from distribucion.models import Chofer, Orden
+from distribucion.tests.factories import ENDPOINTS, make_orden
+
+DETALLE = "/api/v1/consolidacion/bloques/b-0"
+
+
+def _get(api, url, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        r = api.get(url, headers=headers)
+    return r, len(ctx.captured_queries)
+
+
+@pytest.fixture
+def ordenes(base):
+    for i in range(2):
+        make_orden(i)
+
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_304_con_una_sola_query(ordenes, url):
+    api = APIClient()
+    r, _ = _get(api, url)
+    assert r.status_code == 200 and r["ETag"].startswith('"') and r.has_header("Last-Modified")
+
+    r2, n = _get(api, url, if_none_match=r["ETag"])
+    assert r2.status_code == 304 and n == 1  # solo la sonda
+    assert r2["ETag"] == r["ETag"] and not r2.content
+
+    r3, _ = _get(api, url, if_modified_since=r["Last-Modified"])
+    assert r3.status_code == 304
+
+
+def test_detalle_cambia_con_el_bloque_y_sus_ordenes(ordenes):
+    api = APIClient()
+    etag = _get(api, DETALLE)[0]["ETag"]
+
+    DjangoReadModelRepo().set_bloque_incompleto("b-0")  # queryset.update(): también toca updated_at
+    r, _ = _get(api, DETALLE, if_none_match=etag)
+    assert r.status_code == 200 and r["ETag"] != etag
+
+    etag = r["ETag"]
+    assert _get(api, DETALLE, if_none_match=etag)[0].status_code == 304
+    ch = Chofer.objects.get(nombre="Ch 1")  # chofer de una orden del bloque, no del bloque
+    ch.nombre = "Otro"
+    ch.save()
+    r, _ = _get(api, DETALLE, if_none_match=etag)
+    assert r.status_code == 200 and r.data["ordenes"][1]["chofer"]["nombre"] == "Otro"
+
+
+def test_lista_cambia_con_cualquier_fila_filtrada_y_por_pagina(ordenes):
+    api = APIClient()
+    url = "/api/v1/preparacion/ordenes"
+    etag = _get(api, url)[0]["ETag"]
+    assert _get(api, url + "?page=&estado=")[0]["ETag"] == etag  # params vacíos: misma clave
+    assert _get(api, url + "?estado=COM")[0]["ETag"] != etag
+
+    o = Orden.objects.get(id="o-0")
+    o.estado_preparacion = "COM"
+    o.save()
+    assert _get(api, url, if_none_match=etag)[0].status_code == 200
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/preparacion/ordenes?estado=COM",
+    "/api/v1/expedicion/ordenes?ordering=-bolsas_count",
+    "/api/v1/consolidacion/bloques",
+])
+def test_sonda_de_lista_sin_joins(ordenes, url):
+    with CaptureQueriesContext(connection) as ctx:
+        r = APIClient().get(url)
+    assert r.status_code == 200
+    assert " JOIN " not in ctx.captured_queries[0]["sql"].upper()  # la sonda va primero
+
+
+def test_lista_cambia_con_cualquier_fila_de_una_relacion(ordenes):
+    api = APIClient()
+    url = "/api/v1/consolidacion/bloques"
+    etag = _get(api, url)[0]["ETag"]
+    Chofer.objects.create(nombre="Nuevo")  # no lo muestra ningún bloque: invalida de más, nunca de menos
+    assert _get(api, url, if_none_match=etag)[0].status_code == 200
+
+
+def test_detalle_inexistente_y_keyset_sin_sonda(ordenes):
+    api = APIClient()
+    assert _get(api, "/api/v1/consolidacion/bloques/nope")[0].status_code == 404
+
+    r, _ = _get(api, "/api/v1/consolidacion/bloques?cursor=")
+    assert r.status_code == 200 and not r.has_header("ETag")
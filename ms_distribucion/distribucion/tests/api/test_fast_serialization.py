@@ -0,0 +1,93 @@
+# tests/api/test_fast_serialization.py
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from distribucion.api import renderers
+from distribucion.api.fast import plan_for
+from distribucion.api.renderers import FastJSONRenderer
+from distribucion.api.serializers import OrdenSerializer
+from distribucion.models import CentroDistribucion, Distribucion, Orden, Pyme, TipoCentro
+from distribucion.tests.factories import ENDPOINTS, make_orden
+
+VARIANTES = [
+    *ENDPOINTS,
+    "/api/v1/despacho/ordenes?page=2",
+    "/api/v1/preparacion/ordenes?cursor=&estado=PEN",
+    "/api/v1/expedicion/ordenes?ordering=-bolsas_count",
+    "/api/v1/recepcion/ordenes?cursor=",
+    "/api/v1/consolidacion/bloques/b-3",
+    "/api/v1/distribucion/ordenes?ordering=chofer_id&cursor=",
+]
+
+
+@pytest.fixture
+def datos(base):
+    for i in range(6):
+        make_orden(i)
+    # bordes: sin chofer ni líneas, unicode con separador de línea JS, decimales y microsegundos
+    Pyme.objects.create(id="p-ñ", nombre="Pyme ñ\u2028ü")
+    cd = CentroDistribucion.objects.create(id="cd-x", nombre="CD «x»", tipo=TipoCentro.CD)
+    o = Orden.objects.create(id="o-x", pyme_id="p-ñ", origen_cd_id="cap-1", destino_cd=cd,
+                             fecha_despacho=datetime(2025, 8, 12, 9, 30, 1, 123456, tzinfo=timezone.utc),
+                             peso_total=Decimal("1234.5"), volumen_total=Decimal("0.000001"))
+    Distribucion.objects.create(orden=o, estado="PEN")
+
+
+@pytest.mark.parametrize("url", VARIANTES)
+def test_contrato_mismos_bytes_que_drf(datos, settings, monkeypatch, url):
+    api = APIClient()
+    settings.API_FAST_SERIALIZATION = False
+    drf = api.get(url)
+    settings.API_FAST_SERIALIZATION = True
+    monkeypatch.setattr(serializers.Serializer, "to_representation", lambda *a: pytest.fail("DRF por fila"))
+    fast = api.get(url)
+    assert drf.status_code == fast.status_code == 200
+    assert fast.content == JSONRenderer().render(drf.data, "application/json")
+
+
+@pytest.mark.parametrize("con_orjson", [True, False])
+def test_renderer_igual_a_drf(monkeypatch, con_orjson):
+    if not con_orjson:
+        monkeypatch.setattr(renderers, "orjson", None)  # imagen sin orjson: cae al encoder de DRF
+    elif renderers.orjson is None:
+        pytest.skip("orjson no instalado")
+    data = {"s": "a\u2028b\u2029c ñ", "n": None, "b": True, "i": 2**40, 1: "clave int",
+            "f": datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc), "u": uuid.UUID(int=7),
+            "d": Decimal("1.50"), "lazy": gettext_lazy("texto"), "l": [(1, 2), {"x": []}]}
+    assert FastJSONRenderer().render(data, "application/json") == JSONRenderer().render(data, "application/json")
+    # indentado: tal cual DRF
+    assert (FastJSONRenderer().render(data, "application/json; indent=2")
+            == JSONRenderer().render(data, "application/json; indent=2"))
+
+
+@pytest.mark.parametrize("valor", [float("nan"), float("inf"), -float("inf"), 2**70])
+def test_renderer_cae_a_drf_donde_orjson_difiere(valor):
+    data = {"n": None, "l": [{"v": valor}]}
+    try:
+        esperado = JSONRenderer().render(data, "application/json")
+    except ValueError:  # STRICT_JSON: DRF rechaza NaN/Infinity
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render(data, "application/json")
+    else:
+        assert FastJSONRenderer().render(data, "application/json") == esperado
+
+
+def test_serializer_sin_plan_usa_drf(base):
+    class ConTodo(serializers.ModelSerializer):
+        todo = serializers.CharField(source="*")
+
+        class Meta:
+            model = Orden
+            fields = ("id", "todo")
+
+    assert plan_for(Orden, ConTodo) is None
+    assert plan_for(Orden, OrdenSerializer, frozenset({"bolsas_count"})) is not plan_for(Orden, OrdenSerializer)
+    r = APIClient().get("/api/v1/consolidacion/bloques/nope")
+    assert r.status_code == 404
@@ -0,0 +1,82 @@
+# tests/api/test_keyset_pagination.py
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from distribucion.models import (
+    Pyme, CentroDistribucion, TipoCentro, Chofer, Orden, Distribucion,
+)
+
+F = datetime(2025, 8, 11, 10, tzinfo=timezone.utc)
+
+
+def _ordenes(n=12):
+    p = Pyme.objects.create(id="p-1", nombre="Pyme 1")
+    cap = CentroDistribucion.objects.create(id="cap-1", nombre="CAP", tipo=TipoCentro.CAP)
+    cd = CentroDistribucion.objects.create(id="cd-1", nombre="CD", tipo=TipoCentro.CD)
+    # fechas repetidas de a tres: el desempate por id tiene que cruzar páginas
+    return [
+        Orden.objects.create(id=f"o-{i:02d}", pyme=p, origen_cd=cap, destino_cd=cd,
+                             fecha_despacho=F + timedelta(hours=i // 3))
+        for i in range(n)
+    ]
+
+
+def _walk(api, url, params=None):
+    ids, pages, r = [], 0, api.get(url, {**(params or {}), "cursor": ""})
+    while True:
+        assert r.status_code == 200 and "count" not in r.data
+        ids += [x.get("id") or x.get("orden_id") for x in r.data["results"]]
+        pages += 1
+        if not r.data["next"]:
+            return ids, pages
+        r = api.get(r.data["next"])
+
+
+def test_keyset_recorre_todo_sin_saltos_ni_repetidos(db):
+    ordenes = _ordenes()
+    api = APIClient()
+
+    ids, pages = _walk(api, "/api/v1/preparacion/ordenes")
+    esperado = [o.id for o in sorted(ordenes, key=lambda o: (o.fecha_despacho, o.id), reverse=True)]
+    assert ids == esperado and pages == 3
+
+    ids, _ = _walk(api, "/api/v1/despacho/ordenes")  # orden ascendente
+    assert ids == esperado[::-1]
+
+
+def test_keyset_sin_count_ni_offset(db):
+    _ordenes()
+    api = APIClient()
+    nxt = api.get("/api/v1/preparacion/ordenes", {"cursor": ""}).data["next"]
+    with CaptureQueriesContext(connection) as ctx:
+        r = api.get(nxt)
+    sql = " ".join(q["sql"].upper() for q in ctx.captured_queries)
+    assert len(r.data["results"]) == 5
+    assert "COUNT(" not in sql and "OFFSET" not in sql
+
+
+def test_sin_cursor_sigue_paginando_por_numero(db):
+    _ordenes()
+    r = APIClient().get("/api/v1/preparacion/ordenes", {"page": 2})
+    assert r.data["count"] == 12 and len(r.data["results"]) == 5
+
+
+def test_cursor_invalido_da_404(db):
+    r = APIClient().get("/api/v1/preparacion/ordenes", {"cursor": "no-es-un-cursor"})
+    assert r.status_code == 404
+
+
+def test_keyset_con_nulos_los_deja_al_final(db):
+    ordenes = _ordenes(8)
+    ch = Chofer.objects.create(nombre="Test")
+    for i, o in enumerate(ordenes):
+        entrega = None if i % 3 == 0 else F + timedelta(days=1, hours=i % 2)
+        Distribucion.objects.create(orden=o, estado="ENT" if entrega else "PEN", fecha_entrega=entrega, chofer=ch)
+
+    ids, _ = _walk(APIClient(), "/api/v1/distribucion/ordenes")
+    d = sorted(Distribucion.objects.all(), key=lambda d: (d.fecha_entrega is not None, d.fecha_entrega or F, d.id),
+               reverse=True)
+    assert ids == [x.orden_id for x in d]
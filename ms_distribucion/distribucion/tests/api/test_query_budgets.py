@@ -0,0 +1,50 @@
+# tests/api/test_query_budgets.py
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIClient
+
+from distribucion.api import views
+from distribucion.api.query_budget import QueryBudgetExceeded
+from distribucion.tests.factories import ENDPOINTS, make_orden
+
+
+def _queries(url, params):
+    with CaptureQueriesContext(connection) as ctx:
+        r = APIClient().get(url, params)
+    assert r.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize("params", [{}, {"cursor": ""}])
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_queries_constantes_y_dentro_del_presupuesto(base, url, params):
+    make_orden(0)
+    una = _queries(url, params)
+    for i in range(1, 6):  # página completa (PAGE_SIZE=5)
+        make_orden(i)
+    llena = _queries(url, params)
+
+    assert una == llena
+    assert llena <= resolve(url).func.view_class.query_budget
+
+
+def test_presupuesto_excedido_falla_en_tests(base, monkeypatch):
+    make_orden(0)
+    monkeypatch.setattr(views.BloqueList, "query_budget", 1)
+    with pytest.raises(QueryBudgetExceeded, match="BloqueList: 3 queries > 1"):
+        APIClient().get("/api/v1/consolidacion/bloques")
+
+
+def test_presupuesto_excedido_se_loguea_en_modo_log(base, monkeypatch, settings, caplog):
+    make_orden(0)
+    settings.QUERY_BUDGET_MODE = "log"
+    monkeypatch.setattr(views.BloqueList, "query_budget", 1)
+    with caplog.at_level(logging.WARNING, logger="distribucion.api.query_budget"):
+        r = APIClient().get("/api/v1/consolidacion/bloques")
+    assert r.status_code == 200
+    rec = next(r for r in caplog.records if r.message == "Presupuesto de queries excedido")
+    assert (rec.view, rec.queries, rec.budget) == ("BloqueList", 3, 1)
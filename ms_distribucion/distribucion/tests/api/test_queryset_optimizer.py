@@ -0,0 +1,57 @@
+# tests/api/test_queryset_optimizer.py
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from distribucion.api.optimizer import optimize_for, plan_for
+from distribucion.api.serializers import BloqueDetailSerializer, OrdenSerializer, RecepcionSerializer
+from distribucion.models import Bloque, Bolsa, Orden, Recepcion
+from distribucion.tests.factories import make_orden
+
+
+def test_plan_de_orden_serializer():
+    plan = plan_for(Orden.objects.all(), OrdenSerializer)
+    assert plan.select == ["pyme", "origen_cd", "destino_cd", "chofer"]
+    assert {"pyme__nombre", "chofer__nombre", "estado_preparacion", "peso_total"} <= set(plan.only)
+    assert plan.exact
+    (lineas,) = plan.prefetch
+    assert lineas.prefetch_through == "lineas"
+    # el hijo trae su producto por join y conserva la FK inversa para el prefetch
+    assert lineas.queryset.query.select_related == {"producto": {}}
+    assert "orden" in lineas.queryset.query.deferred_loading[0]
+
+
+def test_plan_con_fk_por_id_y_metodo_sin_only():
+    assert "orden" in plan_for(Recepcion.objects.all(), RecepcionSerializer).only
+    plan = plan_for(Bloque.objects.all(), BloqueDetailSerializer)
+    assert plan.select == ["chofer"] and not plan.exact  # get_ordenes: columnas desconocidas
+    assert optimize_for(Bloque.objects.all(), BloqueDetailSerializer).query.deferred_loading == (frozenset(), True)
+
+
+def test_misma_salida_con_anotacion_y_queries_constantes(base):
+    for i in range(3):
+        make_orden(i)
+    Bolsa.objects.create(codigo="BOL-extra", orden_id="o-1")
+    qs = Orden.objects.annotate(bolsas_count=Count("bolsas", distinct=True)).order_by("id")
+
+    esperado = OrdenSerializer(qs, many=True).data
+    with CaptureQueriesContext(connection) as ctx:
+        data = OrdenSerializer(optimize_for(qs, OrdenSerializer), many=True).data
+    assert data == esperado
+    assert [o["bolsas_count"] for o in data] == [1, 2, 1]
+    assert len(ctx.captured_queries) == 2  # órdenes + líneas con producto
+
+
+def test_queryset_ajustado_a_mano_no_se_acota():
+    qs = optimize_for(Orden.objects.select_related("pyme"), OrdenSerializer)
+    assert qs.query.deferred_loading == (frozenset(), True)
+    assert set(qs.query.select_related) == {"pyme", "origen_cd", "destino_cd", "chofer"}
+
+
+def test_expedicion_conserva_bolsas_count(base):
+    make_orden(0)
+    r = APIClient().get("/api/v1/expedicion/ordenes", {"ordering": "-bolsas_count"})
+    assert r.status_code == 200
+    assert r.data["results"][0]["bolsas_count"] == 1
+    assert r.data["results"][0]["lineas"][0]["producto"]["sku"] == "SKU-0-0"
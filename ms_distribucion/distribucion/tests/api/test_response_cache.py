@@ -0,0 +1,131 @@
+# tests/api/test_response_cache.py
+import json
+
+import pytest
+import redis
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.infrastructure import read_cache
+from distribucion.infrastructure.persistence.repositories import DjangoReadModelRepo
+from distribucion.infrastructure.read_cache import EntityVersions
+from distribucion.management.commands.seed_events import OK_FULL_PATH, make_event
+from distribucion.tests.factories import make_orden
+
+
+class FakeRedis:
+    """Lo justo de redis-py para EntityVersions (MGET + pipeline de INCR)."""
+    def __init__(self, down=False):
+        self.data, self.down, self.incrs = {}, down, 0
+
+    def mget(self, keys):
+        if self.down:
+            raise redis.ConnectionError("down")
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def incr(self, key):
+        self.incrs += 1
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def ordenes(base):
+    make_orden(0)
+    make_orden(1)
+
+
+def make_evt(bloque_id, orden_id):
+    evt = make_event(json.loads(OK_FULL_PATH.read_text(encoding="utf-8")), 0, n_ordenes=1)
+    evt["data"]["bloque"]["id"] = bloque_id
+    evt["data"]["ordenes"][0]["id"] = orden_id
+    return evt
+
+
+@pytest.fixture
+def versions(settings, monkeypatch):
+    settings.READ_CACHE_ENABLED = True
+    v = EntityVersions(FakeRedis())
+    monkeypatch.setattr(read_cache, "_VERSIONS", v)
+    caches["read_api"].clear()
+    return v
+
+
+def _proyectar(versions, evt, capture):
+    uc = HandleBloqueConsolidadoListo(DjangoReadModelRepo(versions=versions))
+    with capture(execute=True):
+        with transaction.atomic():
+            uc(evt)
+
+
+def _get(api, url, params=None, **extra):
+    with CaptureQueriesContext(connection) as ctx:
+        r = api.get(url, params or {}, **extra)
+    return r, len(ctx.captured_queries)
+
+
+def test_hit_sin_queries_y_params_normalizados(ordenes, versions):
+    api = APIClient()
+    r, _ = _get(api, "/api/v1/preparacion/ordenes", {"estado": "PEN", "ordering": "fecha_despacho"})
+    assert r.data["count"] == 2
+    assert r["X-Cache"] == "MISS"
+
+    r2, n = _get(api, "/api/v1/preparacion/ordenes?ordering=fecha_despacho&estado=PEN&page=")
+    assert r2["X-Cache"] == "HIT" and n == 0
+    assert r2.data == r.data
+
+
+def test_proyeccion_invalida_tras_commit(ordenes, versions, django_capture_on_commit_callbacks):
+    api = APIClient()
+    _proyectar(versions, make_evt("b-10", "o-0"), django_capture_on_commit_callbacks)
+    antes = _get(api, "/api/v1/consolidacion/bloques")[0].data["count"]
+    assert _get(api, "/api/v1/consolidacion/bloques")[0]["X-Cache"] == "HIT"
+    incrs = versions.r.incrs
+
+    _proyectar(versions, make_evt("b-11", "o-1"), django_capture_on_commit_callbacks)
+    assert versions.r.incrs == incrs + 2  # bloque y chofer, una vez por evento
+    r, _ = _get(api, "/api/v1/consolidacion/bloques")
+    assert r["X-Cache"] == "MISS" and r.data["count"] == antes + 1
+    # recepción no depende de bloque/chofer: su entrada sigue valiendo
+    assert versions.get_many(["recepcion"]) == {"recepcion": 0}
+
+
+def test_proyeccion_revertida_no_sube_versiones(ordenes, versions, django_capture_on_commit_callbacks):
+    uc = HandleBloqueConsolidadoListo(DjangoReadModelRepo(versions=versions))
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with transaction.atomic():
+            with pytest.raises(Exception), transaction.atomic():
+                uc(make_evt("b-10", "o-404"))  # orden inexistente
+    assert not callbacks and versions.r.incrs == 0
+
+
+def test_redis_caido_sirve_desde_la_db(ordenes, versions):
+    versions.r.down = True
+    r = APIClient().get("/api/v1/preparacion/ordenes")
+    assert r.status_code == 200 and "X-Cache" not in r
+
+
+def test_hit_condicional_304_sin_queries(ordenes, versions):
+    api = APIClient()
+    r, _ = _get(api, "/api/v1/consolidacion/bloques/b-0")
+    r2, n = _get(api, "/api/v1/consolidacion/bloques/b-0?x=", HTTP_IF_NONE_MATCH=r["ETag"])
+    assert (r2.status_code, r2["X-Cache"], n) == (304, "HIT", 0)
+
+
+def test_clave_separa_formatos_negociados(ordenes, versions):
+    api = APIClient()
+    json_r, _ = _get(api, "/api/v1/consolidacion/bloques", HTTP_ACCEPT="application/json")
+    html_r, _ = _get(api, "/api/v1/consolidacion/bloques", HTTP_ACCEPT="text/html")
+    assert (json_r["X-Cache"], html_r["X-Cache"]) == ("MISS", "MISS")
+    assert html_r["Content-Type"].startswith("text/html") and html_r["ETag"] != json_r["ETag"]
+
+    again, _ = _get(api, "/api/v1/consolidacion/bloques", HTTP_ACCEPT="text/html")
+    assert again["X-Cache"] == "HIT" and again["ETag"] == html_r["ETag"]
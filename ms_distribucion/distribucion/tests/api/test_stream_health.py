@@ -0,0 +1,87 @@
+# tests/api/test_stream_health.py
+import time
+
+import pytest
+import redis
+from rest_framework.test import APIClient
+
+from distribucion.api import health
+
+
+class FakePipeline:
+    def __init__(self, r):
+        self.r, self.cmds = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: self.cmds.append(name)
+
+    def execute(self, raise_on_error=True):
+        self.r.round_trips += 1
+        return [self.r.replies[c] for c in self.cmds]
+
+
+class FakeRedis:
+    round_trips = 0
+
+    def __init__(self):
+        now_ms = int(time.time() * 1000)
+        self.replies = {
+            "xlen": 120,
+            "xinfo_groups": [{"name": "otro", "lag": 0},
+                             {"name": "grp.distribucion", "lag": 37, "consumers": 2, "last-delivered-id": "9-0"}],
+            "xpending": {"pending": 4, "min": f"{now_ms - 60000}-0", "max": "9-0", "consumers": []},
+            "xpending_range": [{"message_id": f"{now_ms - 60000}-0", "consumer": "w-0",
+                                "time_since_delivered": 45000, "times_delivered": 2}],
+        }
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch, settings):
+    r = FakeRedis()
+    r.clients = []
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, *a, **kw: r.clients.append(kw) or r))
+    monkeypatch.setattr(health, "_STREAM_REDIS", None)
+    health._STREAM_CACHE.update(at=0.0, body=None)
+    settings.STREAM_HEALTH_TTL_S = 60
+    return r
+
+
+def test_stream_health_reporta_lag_pel_y_dlq(fake_redis):
+    body = APIClient().get("/api/v1/health/stream").json()
+
+    assert body["length"] == 120 and body["lag"] == 37 and body["consumers"] == 2
+    assert body["pending"] == 4 and body["oldest_pending_idle_ms"] == 45000
+    assert 59000 <= body["oldest_pending_age_ms"] < 70000
+    assert body["dlq_length"] == 120  # mismo xlen fake para stream y DLQ
+    assert body["dlq_stream"] == "ms.dlq.distribucion" and body["legacy_dlq_length"] == 120
+
+
+def test_stream_health_cachea_entre_probes(fake_redis):
+    c = APIClient()
+    for _ in range(5):
+        assert c.get("/api/v1/health/stream").status_code == 200
+    assert fake_redis.round_trips == 1
+
+
+def test_stream_health_reutiliza_un_cliente_con_timeouts(fake_redis, settings):
+    settings.STREAM_HEALTH_TTL_S = 0  # cada probe refresca
+    c = APIClient()
+    for _ in range(3):
+        assert c.get("/api/v1/health/stream").status_code == 200
+    assert fake_redis.round_trips == 3
+    [kw] = fake_redis.clients
+    assert kw["socket_timeout"] == kw["socket_connect_timeout"] == settings.STREAM_HEALTH_REDIS_TIMEOUT_S
+
+
+def test_stream_health_sin_redis_503(monkeypatch, settings):
+    def boom(cls, *a, **kw):
+        raise redis.ConnectionError("sin redis")
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(boom))
+    monkeypatch.setattr(health, "_STREAM_REDIS", None)
+    health._STREAM_CACHE.update(at=0.0, body=None)
+
+    resp = APIClient().get("/api/v1/health/stream")
+    assert resp.status_code == 503 and "sin redis" in resp.json()["redis_error"]
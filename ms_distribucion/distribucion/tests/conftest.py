@@ -0,0 +1,25 @@
+# tests/conftest.py
+from datetime import datetime, timezone
+
+import pytest
+
+from distribucion.models import Pyme, CentroDistribucion, TipoCentro, Chofer, Orden, Bloque
+from distribucion.tests.factories import F
+
+
+@pytest.fixture
+def ordenes(db):
+    p = Pyme.objects.create(id="p-1", nombre="Pyme 1")
+    cap = CentroDistribucion.objects.create(id="cap-1", nombre="CAP", tipo=TipoCentro.CAP)
+    cd = CentroDistribucion.objects.create(id="cd-1", nombre="CD", tipo=TipoCentro.CD)
+    fecha = datetime(2025, 8, 11, 10, tzinfo=timezone.utc)
+    for oid in ("o-1", "o-2"):
+        Orden.objects.create(id=oid, pyme=p, origen_cd=cap, destino_cd=cd, fecha_despacho=fecha)
+
+
+@pytest.fixture
+def base(db):
+    Pyme.objects.create(id="p-1", nombre="Pyme 1")
+    CentroDistribucion.objects.create(id="cap-1", nombre="CAP", tipo=TipoCentro.CAP)
+    ch = Chofer.objects.create(nombre="Ch 0")
+    Bloque.objects.create(id="b-0", fecha=F, chofer=ch, chofer_nombre=ch.nombre)  # junta todas las órdenes
@@ -0,0 +1,117 @@
+# tests/factories.py
+"""
+Datos y dobles compartidos por los tests (se importan como `distribucion.tests.factories`).
+"""
+from datetime import datetime, timedelta, timezone
+
+from distribucion.models import (
+    CentroDistribucion, TipoCentro, Chofer, Producto, Orden, OrdenProducto, Bolsa,
+    Bloque, BloqueOrden, Recepcion, Distribucion,
+)
+
+
+# ----- Doble de ReadModelRepo con solo lo que usa el UC -----
+class FakeRepo:
+    upsert_sets_incompleto = False
+
+    def __init__(self, existing_orders=None):
+        self.processed = set()
+        self.choferes = {}                 # chofer_id -> nombre
+        self.bloques = {}                  # bloque_id -> (fecha, chofer_id, chofer_nombre)
+        self.incompleto = set()            # bloques marcados incompletos
+        self.links = set()                 # (bloque_id, orden_id)
+        self.totales = {}                  # bloque_id -> total_ordenes
+        self._existing = set(existing_orders or [])
+
+    # idempotencia
+    def event_already_processed(self, event_id): return event_id in self.processed
+    def mark_event_processed(self, event_id): self.processed.add(event_id)
+    def processed_event_ids(self, event_ids): return {e for e in event_ids if e in self.processed}
+    def mark_events_processed(self, event_ids): self.processed.update(event_ids)
+
+    # upserts mínimos
+    def upsert_chofer(self, chofer_id, nombre): self.choferes[chofer_id] = nombre
+    def upsert_bloque(self, bloque_id, fecha, chofer_id, chofer_nombre):
+        self.bloques[bloque_id] = (fecha, chofer_id, chofer_nombre)
+    def set_bloque_incompleto(self, bloque_id): self.incompleto.add(bloque_id)
+
+    # linking / totales
+    def existing_order_ids(self, ids):
+        return [i for i in ids if i in self._existing]
+
+    def bulk_link_bloque_orden(self, bloque_id, order_ids):
+        before = len(self.links)
+        for oid in order_ids:
+            self.links.add((bloque_id, oid))
+        return len(self.links) - before
+
+    def add_bloque_total_ordenes(self, bloque_id, delta):
+        self.totales[bloque_id] = self.totales.get(bloque_id, 0) + delta
+
+
+# ----- Evento válido v2 (data v1.2) -----
+def make_evt(evt_id="e-1", bloque_id="b-1", orden_ids=("o-1",), chofer_id="11111111-1111-4111-8111-111111111111"):
+    ordenes = []
+    for oid in orden_ids:
+        ordenes.append({
+            "id": oid,
+            "pyme": {"id": "p-1", "nombre": "Pyme 1"},
+            "origen_cd": {"id": "cd-a", "nombre": "CD A"},
+            "destino_cd": {"id": "cd-b", "nombre": "CD B"},
+            "fecha_despacho": "2025-08-11T10:00:00Z",
+            "estado_preparacion": "COM",
+            "peso_total": 0,
+            "volumen_total": 0,
+            "productos": [
+                {"producto": {"sku": "SKU1", "nombre": "Prod 1"}, "qty": 1, "peso": 0, "volumen": 0}
+            ]
+        })
+
+    return {
+        "specversion": "1.0",
+        "type": "logistrack.distribucion.BloqueConsolidadoListo.v2",
+        "source": "symfony://distribucion",
+        "id": evt_id,
+        "time": "2025-08-11T10:00:00Z",
+        "datacontenttype": "application/json",
+        "dataschema": "https://contracts.logistrack/schemas/BloqueConsolidadoListo/1.2/schema.json",
+        "subject": f"bloque:{bloque_id}",
+        "data": {
+            "bloque": {
+                "id": bloque_id,
+                "fecha": "2025-08-11T10:00:00Z",
+                "chofer": {"id": chofer_id, "nombre": "Chofer Test"},
+            },
+            "ordenes": ordenes,
+        },
+    }
+
+
+# ----- read API: órdenes con relaciones propias -----
+F = datetime(2025, 8, 11, 10, tzinfo=timezone.utc)
+
+ENDPOINTS = [
+    "/api/v1/despacho/ordenes",
+    "/api/v1/preparacion/ordenes",
+    "/api/v1/expedicion/ordenes",
+    "/api/v1/recepcion/ordenes",
+    "/api/v1/consolidacion/bloques",
+    "/api/v1/consolidacion/bloques/b-0",
+    "/api/v1/distribucion/ordenes",
+]
+
+
+def make_orden(i):
+    """Orden i con relaciones propias: cada fila serializada toca FKs distintas."""
+    cd = CentroDistribucion.objects.create(id=f"cd-{i}", nombre=f"CD {i}", tipo=TipoCentro.CD)
+    ch = Chofer.objects.create(nombre=f"Ch {i}")
+    o = Orden.objects.create(id=f"o-{i}", pyme_id="p-1", origen_cd_id="cap-1", destino_cd=cd, chofer=ch,
+                             fecha_despacho=F + timedelta(hours=i))
+    for j in range(2):
+        OrdenProducto.objects.create(orden=o, producto=Producto.objects.create(sku=f"SKU-{i}-{j}", nombre="P"), qty=1)
+    Bolsa.objects.create(codigo=f"BOL-{i}", orden=o)
+    Recepcion.objects.create(orden=o, cd=cd, fecha_recepcion=F + timedelta(days=1, hours=i), usuario_receptor="u")
+    Distribucion.objects.create(orden=o, estado="ENT", fecha_entrega=F + timedelta(days=2, hours=i), chofer=ch)
+    b = Bloque.objects.create(id=f"b-{i + 1}", fecha=F + timedelta(hours=i), chofer=ch, chofer_nombre=ch.nombre)
+    BloqueOrden.objects.create(bloque=b, orden=o)
+    BloqueOrden.objects.create(bloque_id="b-0", orden=o)
@@ -0,0 +1,108 @@
+# tests/unit/test_async_engine.py
+import asyncio, json, logging, threading, time
+
+from distribucion.infrastructure.messaging.async_engine import AsyncConsumerEngine
+
+
+class FakeAsyncConsumer:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.acked, self.dlq = [], []
+
+    async def read(self, count=100, block_ms=5000):
+        return self.batches.pop(0) if self.batches else []
+
+    async def claim_stale(self, min_idle_ms, count=100):
+        return []
+
+    async def ack_many(self, message_ids):
+        self.acked.extend(message_ids)
+
+    async def dead_letter_many(self, entries):
+        self.dlq.extend(entries)
+
+
+class FakePipeline:
+    """Proyección simulada: registra orden por bloque y concurrencia máxima."""
+    def __init__(self, delays):
+        self.delays = delays
+        self.order, self.lock = [], threading.Lock()
+        self.running = self.max_running = 0
+
+    def prepare(self, msg):
+        evt = json.loads(msg["data"])
+        if evt.get("boom"):
+            raise AttributeError("boom")
+        return (None, "contract:x") if evt.get("bad") else (evt, None)
+
+    def project(self, mid, evt):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delays.get(evt["id"], 0.01))
+        with self.lock:
+            self.running -= 1
+            self.order.append((evt["data"]["bloque"]["id"], evt["id"]))
+        return None
+
+
+def _msg(mid, evt_id, bloque, **extra):
+    return {"id": mid, "data": json.dumps({"id": evt_id, "data": {"bloque": {"id": bloque}}, **extra})}
+
+
+def _run(engine, n_reads):
+    reads = iter(range(n_reads))
+    asyncio.run(engine.run(should_run=lambda: next(reads, None) is not None))
+
+
+def test_orden_por_bloque_y_bloques_en_paralelo():
+    batches = [
+        [_msg("1-0", "e1", "b-1"), _msg("2-0", "e2", "b-2"), _msg("3-0", "e3", "b-1")],
+        [_msg("4-0", "e4", "b-1"), _msg("5-0", "e5", "b-2", bad=True)],
+    ]
+    # e1 lento: e3/e4 (mismo bloque) deben esperarlo aunque vengan en otro lote
+    pipeline = FakePipeline({"e1": 0.15})
+    consumer = FakeAsyncConsumer(batches)
+    _run(AsyncConsumerEngine(consumer, pipeline, concurrency=4, inflight_batches=2), n_reads=2)
+
+    b1 = [e for b, e in pipeline.order if b == "b-1"]
+    assert b1 == ["e1", "e3", "e4"]
+    assert pipeline.max_running >= 2  # b-2 no esperó a b-1
+    assert sorted(consumer.acked) == ["1-0", "2-0", "3-0", "4-0", "5-0"]
+    assert [err for _, err in consumer.dlq] == ["contract:x"]
+
+
+def test_concurrencia_acotada():
+    batch = [_msg(f"{i}-0", f"e{i}", f"b-{i}") for i in range(12)]
+    pipeline = FakePipeline({})
+    consumer = FakeAsyncConsumer([batch])
+    _run(AsyncConsumerEngine(consumer, pipeline, concurrency=3), n_reads=1)
+    assert pipeline.max_running <= 3
+    assert len(consumer.acked) == 12
+
+
+def test_error_inesperado_en_prepare_va_solo_a_dlq():
+    batch = [_msg("1-0", "e1", "b-1"), _msg("2-0", "e2", "b-2", boom=True), _msg("3-0", "e3", "b-3")]
+    pipeline = FakePipeline({})
+    consumer = FakeAsyncConsumer([batch])
+    _run(AsyncConsumerEngine(consumer, pipeline), n_reads=1)
+
+    assert sorted(e for _, e in pipeline.order) == ["e1", "e3"]
+    assert consumer.acked == ["1-0", "2-0", "3-0"]
+    assert [err for _, err in consumer.dlq] == ["unexpected:boom"]
+
+
+def test_lote_fallido_se_registra(caplog):
+    class FailingAck(FakeAsyncConsumer):
+        async def ack_many(self, message_ids):
+            raise ConnectionError("redis caído")
+
+    consumer = FailingAck([[_msg("1-0", "e1", "b-1")]])
+    engine = AsyncConsumerEngine(consumer, FakePipeline({}))
+    with caplog.at_level(logging.ERROR):
+        try:
+            _run(engine, n_reads=1)
+        except ConnectionError:
+            pass  # el gather final la re-lanza; el callback ya la registró
+    assert [r.getMessage() for r in caplog.records if r.exc_info and isinstance(r.exc_info[1], ConnectionError)] \
+        == ["Lote async fallido; sin ack, queda en el PEL"]
@@ -0,0 +1,53 @@
+# tests/unit/test_bench_consumer.py
+import json
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from freezegun import freeze_time
+
+from distribucion.management.commands.bench_consumer import make_stream
+from distribucion.models import Bloque, EventOffset, Orden
+
+
+def test_make_stream_reentregas_y_ordenes_por_evento():
+    evts = make_stream(200, 4, 0.25, seed=1)
+    ids = [e["id"] for e in evts]
+    assert 30 < len(ids) - len(set(ids)) < 70
+    assert all(len(e["data"]["ordenes"]) == 4 for e in evts)
+    assert all(e["type"].endswith(".v2") for e in evts)
+
+
+def test_make_stream_reproducible_sin_tocar_el_random_global():
+    state = random.getstate()
+    with freeze_time("2025-08-11T10:00:00Z"):  # las fechas son relativas a now()
+        a, b = make_stream(20, 2, 0.25, seed=7), make_stream(20, 2, 0.25, seed=7)
+    assert random.getstate() == state
+    assert [e["data"] for e in a] == [e["data"] for e in b]
+
+
+def test_bench_mide_targets_guarda_baseline_y_no_deja_rastro(db, tmp_path):
+    path = tmp_path / "baseline.json"
+    call_command("bench_consumer", "--n", "30", "--ordenes", "1,3", "--dup", "0,0.5", "--repeat", "1",
+                 "--baseline", str(path), "--save-baseline", stdout=StringIO())
+
+    results = json.loads(path.read_text())["results"]
+    assert set(results) == {
+        "usecase/ordenes=1/dup=0", "usecase/ordenes=1/dup=0.5", "usecase/ordenes=3/dup=0", "usecase/ordenes=3/dup=0.5",
+        "loop/ordenes=1/dup=0", "loop/ordenes=1/dup=0.5", "loop/ordenes=3/dup=0", "loop/ordenes=3/dup=0.5",
+        "validate_ce/ordenes=1", "validate_ce/ordenes=3", "validate_data/ordenes=1", "validate_data/ordenes=3",
+    }
+    assert all(r["eps"] > 0 and r["p99_us"] >= r["p50_us"] for r in results.values())
+    # cada repetición corre en una transacción revertida
+    assert not (Bloque.objects.exists() or Orden.objects.exists() or EventOffset.objects.exists())
+
+
+def test_bench_falla_si_cae_frente_al_baseline(db, tmp_path):
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({"meta": {}, "results": {"validate_ce/ordenes=2": {"eps": 1e12}}}))
+
+    with pytest.raises(CommandError, match="validate_ce/ordenes=2"):
+        call_command("bench_consumer", "--n", "10", "--ordenes", "2", "--dup", "0", "--targets", "validate_ce",
+                     "--repeat", "1", "--baseline", str(path), stdout=StringIO())
@@ -0,0 +1,158 @@
+# tests/unit/test_consumer_batch.py
+import json
+from contextlib import contextmanager
+
+import pytest
+from django.core.management import call_command
+
+from django.db import transaction
+
+from distribucion.management.commands import consume_distribucion as cmd
+from distribucion.infrastructure.persistence.repositories import DjangoReadModelRepo
+from distribucion.models import Bloque, BloqueOrden, EventOffset
+from distribucion.tests.factories import make_evt
+
+
+class FakeConsumer:
+    """EventConsumer en memoria: entrega un único lote y registra ack/DLQ."""
+    def __init__(self, msgs, stale=()):
+        self.pending = list(msgs)
+        self.stale = list(stale)
+        self.acked, self.dlq = [], []
+
+    def claim_stale(self, min_idle_ms, count=100):
+        batch, self.stale = self.stale[:count], self.stale[count:]
+        return batch
+
+    def read(self, count=100, block_ms=5000):
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        return batch
+
+    def ack(self, message_id):
+        self.acked.append(message_id)
+
+    def dead_letter(self, payload, error):
+        self.dlq.append((payload, error))
+
+    def ack_many(self, message_ids):
+        self.acked.extend(message_ids)
+
+    def dead_letter_many(self, entries):
+        self.dlq.extend(entries)
+
+
+def _run(monkeypatch, msgs, *args, stale=()):
+    fake = FakeConsumer(msgs, stale)
+    monkeypatch.setattr(cmd, "RedisEventConsumer", lambda **_: fake)
+    call_command("consume_distribucion", "--once", *args)
+    return fake
+
+
+def _msg(mid, evt):
+    return {"id": mid, "data": json.dumps(evt)}
+
+
+def test_batch_un_evento_invalido_va_solo_a_dlq(monkeypatch, ordenes):
+    msgs = [
+        _msg("1-0", make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))),
+        _msg("2-0", make_evt("e-2", bloque_id="b-2", orden_ids=("o-404",))),  # orden inexistente
+        {"id": "3-0", "data": "{no-json"},
+        _msg("4-0", make_evt("e-4", bloque_id="b-1", orden_ids=("o-2",))),
+    ]
+    fake = _run(monkeypatch, msgs, "--batch")
+
+    assert fake.acked == ["1-0", "2-0", "3-0", "4-0"]
+    assert [err.split(":", 1)[0] for _, err in fake.dlq] == ["projection", "json"]
+    # el savepoint del evento fallido no arrastra al resto del lote
+    assert set(Bloque.objects.values_list("id", flat=True)) == {"b-1"}
+    assert Bloque.objects.get(id="b-1").total_ordenes == 2
+    assert BloqueOrden.objects.count() == 2
+    assert set(EventOffset.objects.values_list("event_id", flat=True)) == {"e-1", "e-4"}
+
+
+@pytest.mark.parametrize("raw", ["[]", '"x"', "1", "null"])
+def test_batch_json_que_no_es_objeto_va_solo_a_dlq(monkeypatch, ordenes, raw):
+    msgs = [
+        _msg("1-0", make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))),
+        {"id": "2-0", "data": raw},
+        _msg("3-0", make_evt("e-3", bloque_id="b-1", orden_ids=("o-2",))),
+    ]
+    fake = _run(monkeypatch, msgs, "--batch")
+
+    # el lote no se revierte: los sanos se proyectan y todos se ackean
+    assert fake.acked == ["1-0", "2-0", "3-0"]
+    assert [(payload, err.split(":", 1)[0]) for payload, err in fake.dlq] == [(raw, "contract")]
+    assert Bloque.objects.get(id="b-1").total_ordenes == 2
+    assert set(EventOffset.objects.values_list("event_id", flat=True)) == {"e-1", "e-3"}
+
+
+def test_batch_sin_ack_si_el_lote_se_revierte(monkeypatch, ordenes):
+    real_atomic = transaction.atomic
+    depth = {"n": 0}
+
+    @contextmanager
+    def failing_atomic():
+        # el savepoint interno funciona; el commit del lote completo falla
+        depth["n"] += 1
+        try:
+            with real_atomic():
+                yield
+                if depth["n"] == 1:
+                    raise RuntimeError("commit falló")
+        finally:
+            depth["n"] -= 1
+
+    monkeypatch.setattr(transaction, "atomic", failing_atomic)
+    fake = _run(monkeypatch, [_msg("1-0", make_evt("e-1", orden_ids=("o-1",)))], "--batch")
+
+    assert fake.acked == [] and fake.dlq == []
+    assert not EventOffset.objects.exists()
+
+
+def test_modo_por_mensaje_sigue_igual(monkeypatch, ordenes):
+    msgs = [
+        _msg("1-0", make_evt("e-1", orden_ids=("o-1",))),
+        {"id": "2-0", "data": None},
+    ]
+    fake = _run(monkeypatch, msgs)
+    assert fake.acked == ["1-0", "2-0"]
+    assert fake.dlq == []
+    assert EventOffset.objects.filter(event_id="e-1").exists()
+
+
+def test_reclama_pendientes_de_workers_caidos(monkeypatch, ordenes):
+    stale = [_msg("1-0", make_evt("e-old", orden_ids=("o-1",)))]
+    fake = _run(monkeypatch, [_msg("2-0", make_evt("e-new", bloque_id="b-2", orden_ids=("o-2",)))],
+                "--batch", stale=stale)
+    assert fake.acked == ["1-0", "2-0"]
+    assert set(EventOffset.objects.values_list("event_id", flat=True)) == {"e-old", "e-new"}
+
+
+def test_reclamado_con_demasiadas_entregas_va_a_dlq_sin_proyectar(monkeypatch, settings, ordenes):
+    settings.XAUTOCLAIM_MAX_DELIVERIES = 3
+    stale = [
+        {**_msg("1-0", make_evt("e-veneno", orden_ids=("o-1",))), "deliveries": 4},
+        {**_msg("2-0", make_evt("e-old", bloque_id="b-2", orden_ids=("o-2",))), "deliveries": 3},
+    ]
+    fake = _run(monkeypatch, [], stale=stale)
+    assert fake.acked == ["1-0", "2-0"]
+    assert [err for _, err in fake.dlq] == ["poison:entregado 4 veces"]
+    assert set(EventOffset.objects.values_list("event_id", flat=True)) == {"e-old"}
+
+
+def test_repo_idempotencia_por_lote_consultas_constantes(db, django_assert_num_queries):
+    repo = DjangoReadModelRepo()
+    ids = [f"e-{i}" for i in range(50)]
+    with django_assert_num_queries(1):
+        repo.mark_events_processed(ids[:10])
+    with django_assert_num_queries(1):
+        assert repo.processed_event_ids(ids) == set(ids[:10])
+    repo.mark_events_processed(ids[5:15])  # ignora los ya marcados
+    assert EventOffset.objects.count() == 15
+
+
+def test_payload_en_bytes_se_proyecta(monkeypatch, ordenes):
+    evt = make_evt("e-b", orden_ids=("o-1",))
+    fake = _run(monkeypatch, [{"id": "1-0", "data": json.dumps(evt).encode("utf-8")}], "--batch")
+    assert fake.acked == ["1-0"] and fake.dlq == []
+    assert EventOffset.objects.filter(event_id="e-b").exists()
@@ -0,0 +1,92 @@
+# tests/unit/test_contracts_fastpath.py
+"""Arnés diferencial: el validador generado debe dar el mismo veredicto que Draft202012Validator."""
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+from distribucion.contracts import validator as v
+from distribucion.contracts.compiler import Unsupported, compile_schema
+from distribucion.contracts.loader import load_schema_by_uri
+from distribucion.tests.factories import make_evt
+
+BASE = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/"
+SCHEMAS = ["2.0/cloudevent.json", "1.2/schema.json", "1.0/cloudevent.json", "1.0/schema.json"]
+
+# valores de reemplazo: tipos equivocados, bordes de mínimos, formatos
+SAMPLES = [None, True, False, 0, 1, -1, 1.0, 2.5, -0.5, "", "x", "PEN", "1.0",
+           "2025-08-11T10:00:00Z", "11111111-1111-4111-8111-111111111111", "no-uuid", [], [{}], {}]
+
+
+def _pair(rel):
+    uri = BASE + rel
+    generic = v._make_validator(uri)
+    generic = getattr(generic, "fallback", generic)  # siempre el Draft202012Validator
+    fast = compile_schema(uri, generic.schema, load_schema_by_uri, generic.format_checker)
+    return generic, fast
+
+
+def _valid_fixtures():
+    ok_full = json.loads((Path(settings.LOGISTRACK_CONTRACTS_DIR) / "examples" / "ok-full.json").read_text("utf-8"))
+    evts = [make_evt("e-1"), make_evt("e-2", orden_ids=("o-1", "o-2", "o-3")), ok_full]
+    return evts + [e["data"] for e in evts]
+
+
+def _mutations(doc):
+    """Borra, sustituye y añade en cada nodo del documento."""
+    def paths(node, path=()):
+        yield path
+        if isinstance(node, dict):
+            for k, val in node.items():
+                yield from paths(val, path + (k,))
+        elif isinstance(node, list):
+            for i, val in enumerate(node):
+                yield from paths(val, path + (i,))
+
+    def at(root, path):
+        for p in path:
+            root = root[p]
+        return root
+
+    for path in list(paths(doc)):
+        node = at(doc, path)
+        if path:
+            parent_path, key = path[:-1], path[-1]
+            m = copy.deepcopy(doc); del at(m, parent_path)[key]; yield m
+            for s in SAMPLES:
+                m = copy.deepcopy(doc); at(m, parent_path)[key] = copy.deepcopy(s); yield m
+        if isinstance(node, dict):
+            m = copy.deepcopy(doc); at(m, path)["extra"] = 1; yield m
+        if isinstance(node, list) and node:
+            m = copy.deepcopy(doc); at(m, path).append(copy.deepcopy(node[0])); yield m
+
+
+@pytest.mark.parametrize("rel", SCHEMAS)
+def test_mismo_veredicto_en_validos_e_invalidos(rel):
+    generic, fast = _pair(rel)
+    checked = rejected = 0
+    for fixture in _valid_fixtures():
+        for inst in [fixture, *_mutations(fixture)]:
+            expected = generic.is_valid(inst)
+            assert fast(inst) is expected, (rel, inst)
+            checked += 1
+            rejected += not expected
+    assert checked > 500 and rejected > 0
+
+
+def test_validate_cloudevent_usa_fast_path_y_conserva_mensaje():
+    v._cloudevent_validator_for.cache_clear()
+    assert isinstance(v._cloudevent_validator_for(BASE + "1.2/schema.json"), v.CompiledValidator)
+
+    bad = make_evt("e-bad")
+    bad["data"]["ordenes"][0]["estado_preparacion"] = "XXX"
+    with pytest.raises(v.ContractError, match="'XXX' is not one of"):
+        v.validate_cloudevent(bad)
+
+
+def test_keyword_no_soportada_cae_al_generico():
+    schema = {"type": "object", "oneOf": [{"required": ["a"]}, {"required": ["b"]}]}
+    with pytest.raises(Unsupported):
+        compile_schema("urn:x", schema, load_schema_by_uri, v.FormatChecker())
@@ -0,0 +1,66 @@
+# tests/unit/test_contracts_registry.py
+import json
+import os
+
+import pytest
+
+from distribucion.contracts.loader import CONTRACT_PREFIX, SchemaRegistry
+
+REL = "BloqueConsolidadoListo/1.2/schema.json"
+URI = CONTRACT_PREFIX + REL
+
+
+def _write(base, rel, doc, mtime_ns=None):
+    path = base / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+@pytest.fixture
+def bases(tmp_path):
+    env, app = tmp_path / "env", tmp_path / "app"
+    _write(app, REL, {"title": "app"})
+    _write(app, "Otro/1.0/schema.json", {"title": "otro"})
+    return env, app
+
+
+def test_indexa_una_vez_y_prioriza_base_preferida(bases):
+    env, app = bases
+    _write(env, REL, {"title": "env"})
+    reg = SchemaRegistry(bases=lambda: [env, app], interval_s=3600)
+
+    assert reg.get(URI)["title"] == "env"
+    assert reg.get(CONTRACT_PREFIX + "Otro/1.0/schema.json")["title"] == "otro"
+    assert reg.generation == 1
+    assert reg.get(URI) is reg.get(URI)  # mismo documento en memoria, sin re-parseo
+
+    with pytest.raises(FileNotFoundError):
+        reg.get(CONTRACT_PREFIX + "No/1.0/schema.json")
+
+
+def test_recarga_solo_si_cambia_mtime(bases):
+    env, app = bases
+    reg = SchemaRegistry(bases=lambda: [env, app], interval_s=0)
+    first = reg.get(URI)
+    assert reg.refresh() is False and reg.get(URI) is first
+
+    _write(app, REL, {"title": "app v2"}, mtime_ns=2_000_000_000_000_000_000)
+    assert reg.maybe_refresh() is True
+    assert reg.get(URI)["title"] == "app v2"
+    assert reg.get(CONTRACT_PREFIX + "Otro/1.0/schema.json")["title"] == "otro"
+    assert reg.generation == 2
+
+
+def test_json_a_medio_escribir_conserva_version_anterior(bases):
+    env, app = bases
+    reg = SchemaRegistry(bases=lambda: [env, app], interval_s=0)
+    reg.get(URI)
+    path = app / REL
+    path.write_text("{ roto", encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000_000_000_000,) * 2)
+
+    assert reg.refresh() is False
+    assert reg.get(URI)["title"] == "app"
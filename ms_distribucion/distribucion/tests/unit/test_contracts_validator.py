@@ -0,0 +1,64 @@
+# tests/unit/test_contracts_validator.py
+import pytest
+
+from distribucion.contracts import validator as v
+from distribucion.tests.factories import make_evt
+
+DS_12 = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/1.2/schema.json"
+
+
+@pytest.fixture(autouse=True)
+def _caches_limpias():
+    v._cloudevent_validator_for.cache_clear()
+    v._validator_for.cache_clear()
+    yield
+
+
+def test_validador_ce_se_compila_una_vez(monkeypatch):
+    v.warm_validators([DS_12])
+    assert v.validator_cache_stats()["cloudevent"]["misses"] == 1
+
+    calls = []
+    real = v.load_schema_by_uri
+    monkeypatch.setattr(v, "load_schema_by_uri", lambda uri: calls.append(uri) or real(uri))
+
+    for i in range(5):
+        v.validate_cloudevent(make_evt(f"e-{i}"))
+
+    stats = v.validator_cache_stats()["cloudevent"]
+    assert stats == {"hits": 5, "misses": 1, "size": 1, "maxsize": v.CE_CACHE_SIZE}
+    assert calls == []  # sin I/O en el camino caliente
+
+
+def test_hits_y_misses_por_dataschema_en_metricas():
+    def count(result):
+        return v.CACHE_LOOKUPS.value(cache="cloudevent", dataschema=DS_12, result=result)
+    hits, misses = count("hit"), count("miss")
+
+    for i in range(3):
+        v.validate_cloudevent(make_evt(f"e-{i}"))
+
+    assert (count("hit") - hits, count("miss") - misses) == (2, 1)
+    assert f'dataschema="{DS_12}",result="hit"' in v.metrics.REGISTRY.render()
+
+
+def test_etiqueta_de_dataschema_acotada(monkeypatch):
+    monkeypatch.setattr(v, "_schema_labels", {f"uri-{i}" for i in range(v.SCHEMA_LABELS_MAX)})
+    assert v._schema_label("uri-0") == "uri-0"
+    assert v._schema_label("https://contracts.logistrack/schemas/X/9.9/schema.json") == "otro"
+
+
+def test_dataschema_inesperado_cuenta_miss_y_falla():
+    evt = make_evt("e-x")
+    evt["dataschema"] = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/9.9/schema.json"
+    with pytest.raises(v.ContractError):
+        v.validate_cloudevent(evt)
+    assert v.validator_cache_stats()["cloudevent"]["misses"] == 1
+
+
+def test_validador_cacheado_sigue_rechazando():
+    v.validate_cloudevent(make_evt("e-ok"))
+    bad = make_evt("e-bad")
+    del bad["subject"]
+    with pytest.raises(v.ContractError):
+        v.validate_cloudevent(bad)
@@ -0,0 +1,48 @@
+# tests/unit/test_event_cache.py
+import pytest
+from django.db import transaction
+
+from distribucion.infrastructure.persistence.event_cache import LOOKUPS, RecentEventCache
+from distribucion.infrastructure.persistence.repositories import DjangoReadModelRepo
+
+
+def test_lru_acotado_y_stats():
+    c = RecentEventCache(maxsize=2)
+    c.add_many(["a", "b"])
+    assert "a" in c          # "a" pasa a ser el más reciente
+    c.add_many(["c"])        # expulsa "b"
+    assert "b" not in c
+    assert c.stats() == {"hits": 1, "misses": 1, "size": 2, "maxsize": 2, "hit_rate": 0.5}
+
+
+def test_hits_y_misses_en_metricas():
+    before = LOOKUPS.value(result="hit"), LOOKUPS.value(result="miss")
+    c = RecentEventCache()
+    c.add_many(["a"])
+    c.split(["a", "a", "b"])
+    assert (LOOKUPS.value(result="hit") - before[0], LOOKUPS.value(result="miss") - before[1]) == (2, 1)
+
+
+def test_duplicado_en_cache_no_consulta_mysql(db, django_assert_num_queries, django_capture_on_commit_callbacks):
+    repo = DjangoReadModelRepo(recent_events=RecentEventCache())
+    with django_capture_on_commit_callbacks(execute=True):
+        repo.mark_events_processed(["e-1", "e-2"])
+
+    with django_assert_num_queries(0):
+        assert repo.event_already_processed("e-1")
+        assert repo.processed_event_ids(["e-1", "e-2"]) == {"e-1", "e-2"}
+    # miss => la DB decide
+    with django_assert_num_queries(1):
+        assert not repo.event_already_processed("e-3")
+
+
+def test_savepoint_revertido_no_deja_ids_en_cache(db, django_capture_on_commit_callbacks):
+    recent = RecentEventCache()
+    repo = DjangoReadModelRepo(recent_events=recent)
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                repo.mark_event_processed("e-x")
+                raise RuntimeError("proyección falló")
+    assert "e-x" not in recent
+    assert not repo.event_already_processed("e-x")
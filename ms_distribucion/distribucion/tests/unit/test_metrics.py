@@ -0,0 +1,73 @@
+# tests/unit/test_metrics.py
+import json
+
+from django.test import Client
+
+from distribucion.application.pipeline import EventPipeline
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.infrastructure.metrics import EVENTS, STAGE_SECONDS, Registry, merge, serve
+from distribucion.tests.factories import FakeRepo, make_evt
+
+
+def test_histograma_y_contador_en_formato_prometheus():
+    reg = Registry()
+    h = reg.histogram("lat_seconds", "Latencia.", ["stage"], buckets=(0.01, 0.1))
+    c = reg.counter("eventos_total", "Eventos.", ["outcome"])
+    for v in (0.005, 0.05, 0.5):
+        h.observe(v, stage="decode")
+    c.inc(outcome="ok"); c.inc(2, outcome="ok")
+
+    text = reg.render()
+    assert '# TYPE lat_seconds histogram' in text
+    assert 'lat_seconds_bucket{stage="decode",le="0.01"} 1' in text
+    assert 'lat_seconds_bucket{stage="decode",le="0.1"} 2' in text
+    assert 'lat_seconds_bucket{stage="decode",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{stage="decode"} 3' in text
+    assert 'eventos_total{outcome="ok"} 3' in text
+
+
+def test_merge_suma_contadores_y_etiqueta_gauges():
+    reg = Registry()
+    reg.counter("eventos_total", "Eventos.", ["outcome"]).inc(outcome="ok")
+    reg.gauge("xread_count", "Count elegido.").set(50)
+    text = reg.render()
+
+    out = merge({"w0": text, "w1": text})
+    assert 'eventos_total{outcome="ok"} 2' in out
+    assert 'xread_count{target="w0"} 50' in out and 'xread_count{target="w1"} 50' in out
+    assert out.count("# TYPE eventos_total counter") == 1
+
+
+def test_pipeline_cuenta_resultados_y_etapas(db):
+    uc = HandleBloqueConsolidadoListo(repo=FakeRepo(existing_orders=["o-1"]), strict_orders=True)
+    pipeline = EventPipeline(uc)
+    before = {o: EVENTS.value(outcome=o) for o in ("ok", "duplicate", "json", "projection")}
+    decode_n = STAGE_SECONDS.count(stage="decode")
+
+    ok = {"id": "1-0", "data": json.dumps(make_evt("e-1"))}
+    pipeline.process(ok)
+    pipeline.process(ok)  # duplicado
+    pipeline.process({"id": "2-0", "data": "{roto"})
+    pipeline.process({"id": "3-0", "data": json.dumps(make_evt("e-2", orden_ids=("o-9",)))})
+
+    delta = {o: EVENTS.value(outcome=o) - n for o, n in before.items()}
+    assert delta == {"ok": 1, "duplicate": 1, "json": 1, "projection": 1}
+    assert STAGE_SECONDS.count(stage="decode") - decode_n == 4
+    assert STAGE_SECONDS.count(stage="validate_data") >= 3
+
+
+def test_api_agrega_workers(settings):
+    worker = Registry()
+    worker.counter("distribucion_consumer_events_total", "Mensajes.", ["outcome"]).inc(5, outcome="ok")
+    server = serve(0, registry=worker, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        settings.METRICS_TARGETS = [url, url + "?w=1", "http://127.0.0.1:9/metrics"]
+        resp = Client().get("/api/v1/metrics")
+    finally:
+        server.shutdown()
+
+    body = resp.content.decode()
+    assert resp.status_code == 200 and resp["Content-Type"].startswith("text/plain")
+    assert 'distribucion_consumer_events_total{outcome="ok"} 10' in body
+    assert 'distribucion_metrics_target_up{target="http://127.0.0.1:9/metrics"} 0' in body
@@ -0,0 +1,36 @@
+# tests/unit/test_read_sizer.py
+from distribucion.infrastructure.messaging.read_sizer import XREAD_BLOCK_MS, XREAD_COUNT, ReadSizer
+
+
+def _sizer():
+    return ReadSizer(min_count=10, max_count=800, min_block_ms=100, max_block_ms=5000, target_batch_s=0.5)
+
+
+def test_backlog_crece_hasta_el_maximo_con_block_minimo():
+    s = _sizer()
+    for _ in range(10):
+        s.observe(s.count, 0.05)  # lotes llenos y rápidos
+    assert (s.count, s.block_ms) == (800, 100)
+    assert (XREAD_COUNT.value(), XREAD_BLOCK_MS.value()) == (800, 100)
+
+
+def test_lote_lento_se_recorta_al_objetivo():
+    s = _sizer()
+    s.observe(s.count, 2.0)  # 100 msgs en 2s, objetivo 0.5s => 25
+    assert s.count == 25
+
+
+def test_reposo_lotes_pequenos_y_block_largo():
+    s = _sizer()
+    s.observe(3, 0.01)
+    assert s.count == 50 and s.block_ms == 100
+    for _ in range(10):
+        s.observe(0, 0.0)
+    assert (s.count, s.block_ms) == (10, 5000)
+
+
+def test_modo_fijo_no_cambia():
+    s = ReadSizer.fixed(100, 5000)
+    s.observe(100, 0.01)
+    s.observe(0, 0.0)
+    assert (s.count, s.block_ms) == (100, 5000)
@@ -0,0 +1,141 @@
+# tests/unit/test_rebuild_projection.py
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from distribucion.management.commands import rebuild_projection as cmd
+from distribucion.models import (
+    Pyme, CentroDistribucion, TipoCentro, Orden, Chofer, Bloque, BloqueOrden, EventOffset,
+)
+from distribucion.tests.factories import make_evt
+
+CH = "11111111-1111-4111-8111-111111111111"
+F = datetime(2025, 8, 11, 10, tzinfo=timezone.utc)
+
+
+class FakeStream:
+    def __init__(self, payloads, consumers=(), complete=True):
+        self.entries = [{"id": f"{i + 1}-0", "data": p} for i, p in enumerate(payloads)]
+        self.consumers, self.complete = list(consumers), complete
+
+    def last_id(self):
+        return self.entries[-1]["id"] if self.entries else None
+
+    def active_consumers(self, group, idle_ms):
+        return self.consumers
+
+    def is_complete(self):
+        return self.complete
+
+    def scan(self, after, until, count=1000):
+        n = lambda mid: int(mid.split("-")[0])
+        return [e for e in self.entries if n(after) < n(e["id"]) <= n(until)][:count]
+
+
+@pytest.fixture
+def datos(transactional_db):
+    p = Pyme.objects.create(id="p-1", nombre="Pyme 1")
+    cd = CentroDistribucion.objects.create(id="cd-1", nombre="CD", tipo=TipoCentro.CD)
+    for oid in ("o-1", "o-2", "o-3"):
+        Orden.objects.create(id=oid, pyme=p, origen_cd=cd, destino_cd=cd, fecha_despacho=F)
+    # estado vivo desviado: bloque que el stream no conoce y enlace/total erróneos
+    ch = Chofer.objects.create(id=CH, nombre="Viejo")
+    Bloque.objects.create(id="b-old", fecha=F, chofer=ch, chofer_nombre="Viejo", total_ordenes=9)
+    Bloque.objects.create(id="b-1", fecha=F, chofer=ch, chofer_nombre="Viejo", total_ordenes=9)
+    BloqueOrden.objects.create(bloque_id="b-1", orden_id="o-3")
+
+
+def test_rebuild_reproyecta_stream_y_sustituye(monkeypatch, datos):
+    e2 = make_evt("e-2", bloque_id="b-1", orden_ids=("o-2",))
+    e2["data"]["bloque"]["chofer"]["nombre"] = "Ana María"
+    payloads = [
+        json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))),
+        json.dumps(make_evt("e-3", bloque_id="b-2", orden_ids=("o-9",))),     # orden inexistente
+        "{roto",
+        json.dumps(make_evt("e-4", bloque_id="b-3", orden_ids=("o-1", "o-3"))),
+        json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))),     # repetido: se re-aplica
+        json.dumps(e2),                                                       # último escritor gana
+    ]
+    monkeypatch.setattr(cmd, "RedisStreamRange", lambda *a, **kw: FakeStream(payloads))
+
+    call_command("rebuild_projection", "--batch", "2", "--prune")
+
+    bloques = {b.id: (b.chofer_nombre, b.total_ordenes, b.estado_completitud) for b in Bloque.objects.all()}
+    assert bloques == {"b-1": ("Ana María", 2, "INC"), "b-3": ("Chofer Test", 2, "INC")}
+    assert set(BloqueOrden.objects.values_list("bloque_id", "orden_id")) == {
+        ("b-1", "o-1"), ("b-1", "o-2"), ("b-3", "o-1"), ("b-3", "o-3"),
+    }
+    assert Chofer.objects.get(id=CH).nombre == "Ana María"
+    assert set(EventOffset.objects.values_list("event_id", flat=True)) == {"e-1", "e-2", "e-4"}
+    assert not any(t.endswith("_shadow") for t in connection.introspection.table_names())
+
+
+def test_rebuild_sin_swap_no_toca_lo_vivo(monkeypatch, datos):
+    payloads = [json.dumps(make_evt("e-1", bloque_id="b-9", orden_ids=("o-1",)))]
+    monkeypatch.setattr(cmd, "RedisStreamRange", lambda *a, **kw: FakeStream(payloads))
+
+    call_command("rebuild_projection", "--no-swap")
+    assert set(Bloque.objects.values_list("id", flat=True)) == {"b-old", "b-1"}
+    assert "distribucion_bloque_shadow" in connection.introspection.table_names()
+
+
+def test_rebuild_sin_prune_conserva_bloques_fuera_del_stream(monkeypatch, datos):
+    BloqueOrden.objects.create(bloque_id="b-old", orden_id="o-2")  # sus eventos ya se recortaron
+    payloads = [json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",)))]
+    monkeypatch.setattr(cmd, "RedisStreamRange", lambda *a, **kw: FakeStream(payloads, complete=False))
+
+    call_command("rebuild_projection")
+    assert set(BloqueOrden.objects.values_list("bloque_id", "orden_id")) == {("b-old", "o-2"), ("b-1", "o-1")}
+    assert Bloque.objects.get(id="b-old").total_ordenes == 1
+
+    with pytest.raises(CommandError, match="--prune"):
+        call_command("rebuild_projection", "--prune")
+    assert Bloque.objects.filter(id="b-old").exists()
+
+
+def test_swap_sella_updated_at_solo_donde_cambia_el_total(monkeypatch, datos):
+    ch = Chofer.objects.get(id=CH)
+    Bloque.objects.create(id="b-ok", fecha=F, chofer=ch, chofer_nombre="Viejo", total_ordenes=1)
+    BloqueOrden.objects.create(bloque_id="b-ok", orden_id="o-2")
+    before = dict(Bloque.objects.values_list("id", "updated_at"))
+    payloads = [json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",)))]
+    monkeypatch.setattr(cmd, "RedisStreamRange", lambda *a, **kw: FakeStream(payloads, complete=False))
+
+    call_command("rebuild_projection")
+    after = dict(Bloque.objects.values_list("id", "updated_at"))
+    assert Bloque.objects.get(id="b-old").total_ordenes == 0
+    assert after["b-old"] > before["b-old"]   # 9 -> 0
+    assert after["b-ok"] == before["b-ok"]    # total ya correcto y fuera del stream
+
+
+def test_rebuild_se_niega_con_consumers_activos(monkeypatch, datos):
+    payloads = [json.dumps(make_evt("e-1", bloque_id="b-9", orden_ids=("o-1",)))]
+    monkeypatch.setattr(cmd, "RedisStreamRange", lambda *a, **kw: FakeStream(payloads, consumers=["w-0"]))
+
+    with pytest.raises(CommandError, match="w-0"):
+        call_command("rebuild_projection")
+    assert not Bloque.objects.filter(id="b-9").exists()
+    assert not any(t.endswith("_shadow") for t in connection.introspection.table_names())
+
+
+def test_swap_reproyecta_lo_llegado_durante_el_rebuild(monkeypatch, datos):
+    class GrowingStream(FakeStream):
+        calls = 0
+
+        def last_id(self):
+            # el primer last_id() fija `until`; después llega e-2 (ya proyectado en vivo, con su offset)
+            GrowingStream.calls += 1
+            if GrowingStream.calls == 2:
+                self.entries.append({"id": "2-0", "data": json.dumps(make_evt("e-2", bloque_id="b-2", orden_ids=("o-2",)))})
+            return super().last_id()
+
+    EventOffset.objects.create(event_id="e-2")
+    payloads = [json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",)))]
+    monkeypatch.setattr(cmd, "RedisStreamRange", lambda *a, **kw: GrowingStream(payloads))
+
+    call_command("rebuild_projection")
+    assert set(BloqueOrden.objects.values_list("bloque_id", "orden_id")) == {("b-1", "o-1"), ("b-2", "o-2")}
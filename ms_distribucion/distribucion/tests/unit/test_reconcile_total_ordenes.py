@@ -0,0 +1,52 @@
+# tests/unit/test_reconcile_total_ordenes.py
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from distribucion.models import Bloque, BloqueOrden, Chofer
+from distribucion.tests.factories import F
+
+
+@pytest.fixture
+def bloques(ordenes):
+    ch = Chofer.objects.create(nombre="Ch")
+    for b_id, orden_ids in (("b-1", ("o-1", "o-2")), ("b-2", ("o-1",)), ("b-3", ())):
+        Bloque.objects.create(id=b_id, fecha=F, chofer=ch, chofer_nombre=ch.nombre, total_ordenes=len(orden_ids))
+        for oid in orden_ids:
+            BloqueOrden.objects.create(bloque_id=b_id, orden_id=oid)
+    # deriva: contadores incrementales que no cuadran con BloqueOrden
+    Bloque.objects.filter(id="b-1").update(total_ordenes=7)
+    Bloque.objects.filter(id="b-3").update(total_ordenes=2)
+
+
+def _totales():
+    return dict(Bloque.objects.values_list("id", "total_ordenes"))
+
+
+def _reconcile(*args):
+    out = StringIO()
+    call_command("reconcile_total_ordenes", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_corrige_la_deriva(bloques):
+    stamp = Bloque.objects.get(id="b-2").updated_at
+    out = _reconcile()
+
+    assert _totales() == {"b-1": 2, "b-2": 1, "b-3": 0}
+    assert "corregidos 2 bloques" in out
+    assert Bloque.objects.get(id="b-2").updated_at == stamp  # sin deriva: no se toca
+
+
+def test_dry_run_no_escribe(bloques):
+    out = _reconcile("--dry-run")
+
+    assert _totales() == {"b-1": 7, "b-2": 1, "b-3": 2}
+    assert "b-1: 7 -> 2" in out and "b-3: 2 -> 0" in out
+    assert "2 bloques con deriva" in out
+
+
+def test_limitado_a_bloque(bloques):
+    _reconcile("--bloque", "b-3")
+    assert _totales() == {"b-1": 7, "b-2": 1, "b-3": 0}
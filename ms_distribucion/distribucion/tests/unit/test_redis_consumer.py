@@ -0,0 +1,119 @@
+# tests/unit/test_redis_consumer.py
+import redis
+
+from distribucion.infrastructure.messaging import codec
+from distribucion.infrastructure.messaging.redis_consumer import RedisEventConsumer, RedisStreamRange, _to_msg
+
+
+class RecordingRedis:
+    """Cliente mínimo que cuenta round trips (cada comando fuera de pipeline = 1 RTT)."""
+    def __init__(self):
+        self.rtts = 0
+        self.calls = []
+
+    def xgroup_create(self, *a, **kw):
+        raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+
+    def xack(self, stream, group, *ids):
+        self.rtts += 1
+        self.calls.append(("xack", ids))
+
+    def xadd(self, stream, fields):
+        self.rtts += 1
+        self.calls.append(("xadd", stream, fields))
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=None):
+        self.rtts += 1
+        self.calls.append(("xautoclaim", consumer, min_idle_time, start_id))
+        return ["5-0", [("3-0", {"data": "{}"}), ("4-0", None)], []]
+
+    def pipeline(self, transaction=True):
+        return RecordingPipeline(self)
+
+
+class RecordingPipeline:
+    def __init__(self, r):
+        self.r, self.queued = r, []
+
+    def xadd(self, stream, fields):
+        self.queued.append(("xadd", stream, fields))
+
+    def xpending_range(self, stream, group, min, max, count):
+        self.queued.append(("xpending", min))
+
+    def execute(self):
+        self.r.rtts += 1
+        self.r.calls.extend(self.queued)
+        # XPENDING: 3-0 lleva 7 entregas; 4-0 ya no está en el PEL
+        return [[{"times_delivered": 7}] if q[1] == "3-0" else [] for q in self.queued if q[0] == "xpending"]
+
+
+def _consumer(monkeypatch):
+    fake = RecordingRedis()
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, *a, **kw: fake))
+    return RedisEventConsumer(dsn="redis://x", stream="s", group="g", consumer="c", dlq_stream="s.dlq"), fake
+
+
+def test_ack_many_un_solo_xack(monkeypatch):
+    c, fake = _consumer(monkeypatch)
+    c.ack_many([f"{i}-0" for i in range(100)])
+    assert fake.rtts == 1
+    assert len(fake.calls[0][1]) == 100
+
+
+def test_dead_letter_many_pipeline(monkeypatch):
+    c, fake = _consumer(monkeypatch)
+    c.dead_letter_many([("{}", f"projection:e{i}") for i in range(50)])
+    assert fake.rtts == 1
+    assert all(call[1] == "s.dlq" for call in fake.calls)
+    assert len(fake.calls) == 50
+
+
+def test_lotes_vacios_no_tocan_redis(monkeypatch):
+    c, fake = _consumer(monkeypatch)
+    c.ack_many([])
+    c.dead_letter_many([])
+    assert fake.rtts == 0
+
+
+def test_claim_stale_avanza_cursor_y_ackea_borrados(monkeypatch):
+    c, fake = _consumer(monkeypatch)
+    msgs = c.claim_stale(60000, count=10)
+    assert msgs == [{"id": "3-0", "data": "{}", "deliveries": 7}, {"id": "4-0", "data": None, "deliveries": 0}]
+    assert fake.rtts == 2  # XAUTOCLAIM + XPENDING de todo el lote en un pipeline
+    c.claim_stale(60000, count=10)
+    claims = [call for call in fake.calls if call[0] == "xautoclaim"]
+    assert [call[3] for call in claims] == ["0-0", "5-0"]
+    assert claims[0][1:3] == ("c", 60000)
+
+
+def test_modo_bytes_normaliza_id_y_deja_data_en_bytes(settings):
+    settings.CONSUMER_BYTES_MODE = True
+    msg = _to_msg(b"1-0", {b"data": b'{"id": "e-1", "nombre": "Mar\xc3\xada"}'})
+    assert msg["id"] == "1-0"
+    assert isinstance(msg["data"], bytes)
+    assert codec.loads(msg["data"]) == {"id": "e-1", "nombre": "María"}
+    assert _to_msg("2-0", {"data": "{}"}) == {"id": "2-0", "data": "{}"}
+    assert _to_msg(b"3-0", None) == {"id": "3-0", "data": None}
+
+
+def test_orjson_solo_en_modo_bytes(settings):
+    settings.CONSUMER_BYTES_MODE = False
+    assert codec.json_backend() == "json"
+    assert codec.loads('{"v": NaN}')["v"] != 0  # la stdlib acepta NaN; orjson no
+    settings.CONSUMER_BYTES_MODE = True
+    assert codec.json_backend() == ("orjson" if codec.orjson is not None else "json")
+
+
+def test_stream_range_consumers_activos_y_stream_completo(monkeypatch):
+    class InfoRedis:
+        def xinfo_consumers(self, stream, group):
+            return [{"name": "w-0", "idle": 1200}, {"name": "w-caido", "idle": 3_600_000}]
+
+        def xinfo_stream(self, stream):
+            return {"length": 10, "entries-added": 25}  # recortado con MAXLEN
+
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, *a, **kw: InfoRedis()))
+    s = RedisStreamRange("redis://x", "s")
+    assert s.active_consumers("g", idle_ms=60000) == ["w-0"]
+    assert s.is_complete() is False
@@ -0,0 +1,110 @@
+# tests/unit/test_replay_dlq.py
+import json
+
+import pytest
+from django.core.management import call_command
+
+from distribucion.management.commands import replay_dlq as cmd
+from distribucion.models import Bloque, BloqueOrden
+from distribucion.tests.factories import make_evt
+
+
+class FakeDLQ:
+    """DeadLetterQueue en memoria con ids crecientes, como un stream."""
+    def __init__(self, entries):
+        self.entries, self.seq = [], 0
+        self.append_many(entries)
+        self.scans = 0
+
+    def _id(self, mid):
+        return tuple(int(x) for x in mid.split("-"))
+
+    def last_id(self):
+        return self.entries[-1]["id"] if self.entries else None
+
+    def scan(self, after, until, count=1000):
+        self.scans += 1
+        sel = [e for e in self.entries if self._id(after) < self._id(e["id"]) <= self._id(until)]
+        return sel[:count]
+
+    def append_many(self, entries):
+        for data, error in entries:
+            self.seq += 1
+            self.entries.append({"id": f"{self.seq}-0", "data": data, "error": error})
+
+    def delete_many(self, ids):
+        ids = set(ids)
+        before = len(self.entries)
+        self.entries = [e for e in self.entries if e["id"] not in ids]
+        return before - len(self.entries)
+
+
+def _dlq(monkeypatch, entries):
+    fake = FakeDLQ(entries)
+    monkeypatch.setattr(cmd, "RedisDeadLetterQueue", lambda *a, **kw: fake)
+    return fake
+
+
+def test_replay_reproyecta_filtra_y_reencola(monkeypatch, ordenes):
+    fake = _dlq(monkeypatch, [
+        (json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))), "projection:órdenes inexistentes"),
+        (json.dumps(make_evt("e-2", bloque_id="b-2")), "contract:CloudEvent inválido"),
+        (json.dumps(make_evt("e-3", bloque_id="b-3", orden_ids=("o-9",))), "projection:órdenes inexistentes"),
+        (json.dumps(make_evt("e-4", bloque_id="b-4", orden_ids=("o-2",))), "projection:órdenes inexistentes"),
+    ])
+
+    call_command("replay_dlq", "--prefix", "projection:", "--batch", "2")
+
+    assert set(Bloque.objects.values_list("id", flat=True)) == {"b-1", "b-4"}
+    assert BloqueOrden.objects.count() == 2
+    # queda el contract: intacto y e-3 re-encolado una sola vez con su nuevo motivo
+    errors = [(json.loads(e["data"])["id"], e["error"][:11]) for e in fake.entries]
+    assert errors == [("e-2", "contract:Cl"), ("e-3", "projection:")]
+    assert fake.entries[-1]["id"] == "5-0"
+
+
+def test_replay_dry_run_y_limit_no_tocan_nada(monkeypatch, ordenes):
+    fake = _dlq(monkeypatch, [(json.dumps(make_evt(f"e-{i}", bloque_id=f"b-{i}")), "projection:x") for i in range(5)])
+
+    call_command("replay_dlq", "--dry-run")
+    assert len(fake.entries) == 5 and not Bloque.objects.exists()
+
+    call_command("replay_dlq", "--limit", "2", "--keep")
+    assert Bloque.objects.count() == 2 and len(fake.entries) == 5
+
+
+def test_replay_respeta_rate(monkeypatch, ordenes):
+    fake = _dlq(monkeypatch, [(json.dumps(make_evt(f"e-{i}", bloque_id=f"b-{i}")), "projection:x") for i in range(4)])
+    sleeps = []
+    monkeypatch.setattr(cmd.time, "sleep", sleeps.append)
+
+    call_command("replay_dlq", "--rate", "2")
+    assert not fake.entries
+    # 4 mensajes a 2/s => el último lote no termina antes de t=2s (sleep simulado: el reloj no avanza)
+    assert len(sleeps) == 2 and sleeps[-1] == pytest.approx(2, abs=0.5)
+
+
+def test_prefix_casa_tambien_con_unvalidated(monkeypatch, ordenes):
+    fake = _dlq(monkeypatch, [
+        (json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))), "unvalidated:projection:órdenes inexistentes"),
+        (json.dumps(make_evt("e-2", bloque_id="b-2", orden_ids=("o-2",))), "unexpected:boom"),
+    ])
+    call_command("replay_dlq", "--prefix", "projection:")
+    assert set(Bloque.objects.values_list("id", flat=True)) == {"b-1"}
+    assert [e["error"] for e in fake.entries] == ["unexpected:boom"]
+
+
+def test_stream_legacy_vacia_la_dlq_antigua_hacia_la_actual(monkeypatch, settings, ordenes):
+    settings.REDIS_STREAM = "distribucion.bloques"
+    legacy = FakeDLQ([
+        (json.dumps(make_evt("e-1", bloque_id="b-1", orden_ids=("o-1",))), "projection:x"),
+        (json.dumps(make_evt("e-9", bloque_id="b-9", orden_ids=("o-9",))), "projection:x"),
+    ])
+    current = FakeDLQ([])
+    streams = {"distribucion.bloques.dlq": legacy, settings.DLQ_STREAM: current}
+    monkeypatch.setattr(cmd, "RedisDeadLetterQueue", lambda dsn, stream: streams[stream])
+
+    call_command("replay_dlq", "--stream", "legacy")
+    assert Bloque.objects.filter(id="b-1").exists()
+    assert not legacy.entries
+    assert [json.loads(e["data"])["id"] for e in current.entries] == ["e-9"]
@@ -0,0 +1,89 @@
+# tests/unit/test_repositories.py
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+
+from distribucion.infrastructure.persistence.repositories import (
+    DjangoReadModelRepo, NativeUpsertReadModelRepo, build_read_model_repo,
+)
+from distribucion.models import (
+    Chofer, Bloque, BloqueOrden, Orden, Pyme, CentroDistribucion, EstadoCompletitudBloque,
+)
+
+CH = "11111111-1111-4111-8111-111111111111"
+F1 = datetime(2025, 8, 11, 10, tzinfo=timezone.utc)
+F2 = datetime(2025, 8, 12, 10, tzinfo=timezone.utc)
+
+
+def test_upsert_nativo_una_sentencia_por_upsert(db, django_assert_num_queries):
+    repo = NativeUpsertReadModelRepo()
+    with django_assert_num_queries(1):
+        repo.upsert_chofer(CH, "Ana")
+    with django_assert_num_queries(1):
+        repo.upsert_bloque("b-1", F1, CH, "Ana")
+
+    Bloque.objects.filter(id="b-1").update(estado_completitud=EstadoCompletitudBloque.COMPLETO)
+    with django_assert_num_queries(2):
+        repo.upsert_chofer(CH, "Ana María")
+        repo.upsert_bloque("b-1", F2, CH, "Ana María")  # también vuelve a INCOMPLETO
+
+    b = Bloque.objects.get(id="b-1")
+    assert (b.fecha, b.chofer_nombre, b.estado_completitud) == (F2, "Ana María", EstadoCompletitudBloque.INCOMPLETO)
+    assert Chofer.objects.get(id=CH).nombre == "Ana María"
+
+
+def test_set_incompleto_siempre_actualiza(db):
+    repo = NativeUpsertReadModelRepo()
+    repo.upsert_chofer(CH, "Ana")
+    Bloque.objects.create(id="b-2", fecha=F1, chofer_id=CH, chofer_nombre="Ana",
+                          estado_completitud=EstadoCompletitudBloque.COMPLETO)
+    repo.set_bloque_incompleto("b-2")
+    assert Bloque.objects.get(id="b-2").estado_completitud == EstadoCompletitudBloque.INCOMPLETO
+
+
+def test_upsert_bloques_muchas_filas_ultimo_gana(db, django_assert_num_queries):
+    repo = NativeUpsertReadModelRepo()
+    repo.upsert_chofer(CH, "Ana")
+    with django_assert_num_queries(1):
+        repo.upsert_bloques([("b-1", F1, CH, "Ana"), ("b-2", F1, CH, "Ana"), ("b-1", F2, CH, "Ana")])
+    assert Bloque.objects.count() == 2
+    assert Bloque.objects.get(id="b-1").fecha == F2
+
+
+@pytest.mark.parametrize("name, cls", [("django", DjangoReadModelRepo), ("upsert", NativeUpsertReadModelRepo)])
+def test_repo_seleccionable_por_setting(settings, name, cls):
+    settings.READ_MODEL_REPO = name
+    assert type(build_read_model_repo()) is cls
+
+
+@pytest.fixture
+def bloque_con_ordenes(db):
+    p = Pyme.objects.create(id="p-1", nombre="Pyme 1")
+    cd = CentroDistribucion.objects.create(id="cd-1", nombre="CD")
+    for oid in ("o-1", "o-2", "o-3"):
+        Orden.objects.create(id=oid, pyme=p, origen_cd=cd, destino_cd=cd, fecha_despacho=F1)
+    ch = Chofer.objects.create(id=CH, nombre="Ana")
+    return Bloque.objects.create(id="b-1", fecha=F1, chofer=ch, chofer_nombre="Ana")
+
+
+def test_link_cuenta_solo_insertadas_y_total_incremental(bloque_con_ordenes, django_assert_num_queries):
+    repo = DjangoReadModelRepo()
+    assert repo.bulk_link_bloque_orden("b-1", ["o-1", "o-2"]) == 2
+    n = repo.bulk_link_bloque_orden("b-1", ["o-2", "o-3", "o-3"])
+    assert n == 1
+    with django_assert_num_queries(1):
+        repo.add_bloque_total_ordenes("b-1", 2)
+        repo.add_bloque_total_ordenes("b-1", 0)  # sin UPDATE
+    assert Bloque.objects.get(id="b-1").total_ordenes == 2
+
+
+def test_reconcile_corrige_deriva(bloque_con_ordenes):
+    for oid in ("o-1", "o-2"):
+        BloqueOrden.objects.create(bloque_id="b-1", orden_id=oid)
+    Bloque.objects.filter(id="b-1").update(total_ordenes=7)
+
+    call_command("reconcile_total_ordenes", "--dry-run")
+    assert Bloque.objects.get(id="b-1").total_ordenes == 7
+    call_command("reconcile_total_ordenes")
+    assert Bloque.objects.get(id="b-1").total_ordenes == 2
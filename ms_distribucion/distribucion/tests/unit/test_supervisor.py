@@ -0,0 +1,48 @@
+# tests/unit/test_supervisor.py
+import pytest
+from django.core.management.base import CommandError
+
+from distribucion.management.commands import consume_distribucion as cmd
+from distribucion.management.commands.consume_distribucion import RestartBackoff
+
+
+class CrashingProcess:
+    """Proceso que muere al arrancar con exitcode 1."""
+    started = []
+
+    def __init__(self, target, args, name):
+        self.name, self.pid, self.exitcode = name, 0, 1
+
+    def start(self):
+        CrashingProcess.started.append(self.name)
+
+    def is_alive(self):
+        return False
+
+    def terminate(self):
+        pass
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeCtx:
+    Process = CrashingProcess
+
+
+def test_backoff_exponencial_acotado_y_reset_si_aguanta():
+    b = RestartBackoff(base_s=1, max_s=8, max_failures=5)
+    assert [b.next_delay(0.1) for _ in range(5)] == [1, 2, 4, 8, 8]
+    assert b.next_delay(0.1) is None  # sexta caída seguida: se deja de reiniciar
+    assert b.next_delay(60) == 1      # aguantó max_s vivo: la serie vuelve a empezar
+
+
+def test_supervisor_reinicia_con_backoff_y_sale_con_error(monkeypatch, settings):
+    settings.SUPERVISOR_POLL_S = 0
+    settings.SUPERVISOR_BACKOFF_BASE_S = 0
+    settings.SUPERVISOR_MAX_RESTARTS = 2
+    monkeypatch.setattr(cmd, "RUNNING", True)
+    CrashingProcess.started = []
+    with pytest.raises(CommandError, match="2 caídas seguidas"):
+        cmd.Command()._supervise(1, {}, ctx=FakeCtx())
+    assert CrashingProcess.started == ["test-consumer-0"] * 3  # arranque + 2 reinicios
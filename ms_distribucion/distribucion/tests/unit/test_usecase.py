@@ -1,4 +1,6 @@
 # tests/test_use_case.py
+from contextlib import nullcontext
+
 import pytest
 from freezegun import freeze_time
 
@@ -7,77 +9,7 @@ from distribucion.application.use_cases.handle_bloque_consolidado import (
     ProjectionError,
     ContractError,
 )
-
-# ----- Doble de ReadModelRepo con solo lo que usa el UC -----
-class FakeRepo:
-    def __init__(self, existing_orders=None):
-        self.processed = set()
-        self.choferes = {}                 # chofer_id -> nombre
-        self.bloques = {}                  # bloque_id -> (fecha, chofer_id, chofer_nombre)
-        self.incompleto = set()            # bloques marcados incompletos
-        self.links = set()                 # (bloque_id, orden_id)
-        self._existing = set(existing_orders or [])
-
-    # idempotencia
-    def event_already_processed(self, event_id): return event_id in self.processed
-    def mark_event_processed(self, event_id): self.processed.add(event_id)
-
-    # upserts mínimos
-    def upsert_chofer(self, chofer_id, nombre): self.choferes[chofer_id] = nombre
-    def upsert_bloque(self, bloque_id, fecha, chofer_id, chofer_nombre):
-        self.bloques[bloque_id] = (fecha, chofer_id, chofer_nombre)
-    def set_bloque_incompleto(self, bloque_id): self.incompleto.add(bloque_id)
-
-    # linking / totales
-    def existing_order_ids(self, ids):
-        return [i for i in ids if i in self._existing]
-
-    def bulk_link_bloque_orden(self, bloque_id, order_ids):
-        before = len(self.links)
-        for oid in order_ids:
-            self.links.add((bloque_id, oid))
-        return len(self.links) - before
-
-    def update_bloque_total_ordenes(self, bloque_id):
-        pass
-
-
-# ----- Evento válido v2 (data v1.2) -----
-def make_evt(evt_id="e-1", bloque_id="b-1", orden_ids=("o-1",), chofer_id="11111111-1111-4111-8111-111111111111"):
-    ordenes = []
-    for oid in orden_ids:
-        ordenes.append({
-            "id": oid,
-            "pyme": {"id": "p-1", "nombre": "Pyme 1"},
-            "origen_cd": {"id": "cd-a", "nombre": "CD A"},
-            "destino_cd": {"id": "cd-b", "nombre": "CD B"},
-            "fecha_despacho": "2025-08-11T10:00:00Z",
-            "estado_preparacion": "COM",
-            "peso_total": 0,
-            "volumen_total": 0,
-            "productos": [
-                {"producto": {"sku": "SKU1", "nombre": "Prod 1"}, "qty": 1, "peso": 0, "volumen": 0}
-            ]
-        })
-
-    return {
-        "specversion": "1.0",
-        "type": "logistrack.distribucion.BloqueConsolidadoListo.v2",
-        "source": "symfony://distribucion",
-        "id": evt_id,
-        "time": "2025-08-11T10:00:00Z",
-        "datacontenttype": "application/json",
-        "dataschema": "https://contracts.logistrack/schemas/BloqueConsolidadoListo/1.2/schema.json",
-        "subject": f"bloque:{bloque_id}",
-        "data": {
-            "bloque": {
-                "id": bloque_id,
-                "fecha": "2025-08-11T10:00:00Z",
-                "chofer": {"id": chofer_id, "nombre": "Chofer Test"},
-            },
-            "ordenes": ordenes,
-        },
-    }
+from distribucion.tests.factories import FakeRepo, make_evt
 
 
 @freeze_time("2025-08-11T10:00:00Z")
@@ -100,6 +32,13 @@ def test_usecase_ok_enlaza_existentes_y_marca_incompleto():
     assert "e-ok" in repo.processed
 
 
+def test_usecase_no_marca_incompleto_si_el_upsert_ya_lo_hace():
+    repo = FakeRepo(existing_orders={"o-1"})
+    repo.upsert_sets_incompleto = True
+    HandleBloqueConsolidadoListo(repo)(make_evt("e-ok", orden_ids=("o-1",)))
+    assert "b-1" in repo.bloques and not repo.incompleto
+
+
 
 def test_usecase_idempotente_devuelve_duplicate():
     repo = FakeRepo(existing_orders={"o-1"})
@@ -128,3 +67,30 @@ def test_contrato_type_invalido_lanza_contracterror():
     bad["type"] = "logistrack.distribucion.BloqueConsolidadoListo.v1"  # no es v2
     with pytest.raises(ContractError):
         uc(bad)
+
+
+def test_handle_many_dedup_por_lote_y_errores_por_evento():
+    repo = FakeRepo(existing_orders={"o-1"})
+    repo.processed.add("e-old")
+    uc = HandleBloqueConsolidadoListo(repo)
+
+    res = uc.handle_many([
+        make_evt("e-old"),
+        make_evt("e-new"),
+        make_evt("e-new"),                      # repetido dentro del lote
+        make_evt("e-miss", orden_ids=("o-9",)),
+    ], isolate=nullcontext)  # FakeRepo: nada que deshacer
+
+    assert res[0] == {"id": "e-old", "status": "duplicate"}
+    assert res[1]["linked"] == 1
+    assert res[2] == {"id": "e-new", "status": "duplicate"}
+    assert isinstance(res[3], ProjectionError)
+    assert repo.processed == {"e-old", "e-new"}
+
+
+def test_total_ordenes_incremental_no_cuenta_reenlaces():
+    repo = FakeRepo(existing_orders={"o-1", "o-2"})
+    uc = HandleBloqueConsolidadoListo(repo)
+    uc(make_evt("e-1", orden_ids=("o-1",)))
+    uc(make_evt("e-2", orden_ids=("o-1", "o-2")))
+    assert repo.totales["b-1"] == 2
@@ -0,0 +1,79 @@
+# tests/unit/test_validation_policy.py
+import json
+
+import pytest
+
+from distribucion.application.pipeline import EventPipeline
+from distribucion.application.use_cases.handle_bloque_consolidado import HandleBloqueConsolidadoListo
+from distribucion.contracts.policy import POLICY_EVENTS, ValidationMode, ValidationPolicy
+from distribucion.contracts.validator import ContractError
+from distribucion.tests.factories import FakeRepo, make_evt
+
+DS_12 = "https://contracts.logistrack/schemas/BloqueConsolidadoListo/1.2/schema.json"
+
+
+def _data_rota(evt_id):
+    evt = make_evt(evt_id)
+    del evt["data"]["ordenes"][0]["pyme"]  # data inválida, sobre válido
+    return evt
+
+
+def test_envelope_omite_data_pero_valida_sobre():
+    policy = ValidationPolicy({DS_12: "envelope"})
+    policy.validate(_data_rota("e-1"))
+
+    sin_subject = _data_rota("e-2")
+    del sin_subject["subject"]
+    with pytest.raises(ContractError):
+        policy.validate(sin_subject)
+
+    with pytest.raises(ContractError):
+        ValidationPolicy().validate(_data_rota("e-3"))  # full por defecto
+
+    stats = policy.stats()["envelope"]
+    assert (stats["events"], stats["data_validated"], stats["rejected"], stats["rejection_rate"]) == (2, 0, 1, 0.5)
+
+
+def test_contadores_por_modo_en_metricas():
+    stats = ("events", "data_validated", "rejected", "unvalidated_failures")
+    def snapshot():
+        return {s: POLICY_EVENTS.value(mode="envelope", stat=s) for s in stats}
+    before = snapshot()
+
+    policy = ValidationPolicy({DS_12: "envelope"})
+    policy.validate(_data_rota("e-1"))
+    sin_subject = _data_rota("e-2")
+    del sin_subject["subject"]
+    with pytest.raises(ContractError):
+        policy.validate(sin_subject)
+    policy.record_unvalidated_failure(make_evt("e-1"))
+
+    after = snapshot()
+    assert {s: after[s] - before[s] for s in stats} == {
+        "events": 2, "data_validated": 0, "rejected": 1, "unvalidated_failures": 1}
+    assert any(line.startswith('distribucion_contracts_policy_total{mode="envelope",stat="rejected"} ')
+               for line in POLICY_EVENTS.render())
+
+
+def test_muestreo_determinista_por_id():
+    assert ValidationMode.parse("sample:12.5") == ValidationMode("sample", 12.5)
+    with pytest.raises(ValueError):
+        ValidationMode.parse("sample:120")
+
+    policy = ValidationPolicy(default="sample:25")
+    evts = [make_evt(f"e-{i}") for i in range(2000)]
+    picked = [e for e in evts if policy.validates_data(e)]
+    assert 400 < len(picked) < 600
+    assert all(policy.validates_data(e) for e in picked)  # misma decisión cada vez
+    assert not any(ValidationPolicy(default="sample:0").validates_data(e) for e in evts)
+
+
+def test_fallo_de_proyeccion_sin_validar_va_a_dlq_con_motivo_propio(db):
+    uc = HandleBloqueConsolidadoListo(repo=FakeRepo(existing_orders=[]), strict_orders=True)
+    msgs = [{"id": "1-0", "data": json.dumps(make_evt("e-1"))}]
+
+    policy = ValidationPolicy({DS_12: "envelope"})
+    assert EventPipeline(uc, policy=policy).process(msgs[0]).startswith("unvalidated:projection:")
+    assert policy.stats()["envelope"]["unvalidated_failures"] == 1
+
+    assert EventPipeline(uc).process(msgs[0]).startswith("projection:")
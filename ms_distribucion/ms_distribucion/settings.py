@@ -155,6 +155,73 @@ DLQ_STREAM      = os.getenv("DLQ_STREAM", "ms.dlq.distribucion")
 XREAD_COUNT     = int(os.getenv("XREAD_COUNT", "100"))
 XREAD_BLOCK_MS  = int(os.getenv("XREAD_BLOCK_MS", "5000"))
 XAUTOCLAIM_IDLE = int(os.getenv("XAUTOCLAIM_IDLE", "60000"))
+XAUTOCLAIM_EVERY_S = int(os.getenv("XAUTOCLAIM_EVERY_S", "30"))
+# reclamados (XAUTOCLAIM) con más entregas que esto van a la DLQ sin proyectar (0 = sin tope)
+XAUTOCLAIM_MAX_DELIVERIES = int(os.getenv("XAUTOCLAIM_MAX_DELIVERIES", "5"))
+SUPERVISOR_POLL_S = float(os.getenv("SUPERVISOR_POLL_S", "1"))
+# reinicio de workers caídos: backoff exponencial base..max; tras N caídas seguidas el supervisor sale (0 = nunca)
+SUPERVISOR_BACKOFF_BASE_S = float(os.getenv("SUPERVISOR_BACKOFF_BASE_S", "1"))
+SUPERVISOR_BACKOFF_MAX_S = float(os.getenv("SUPERVISOR_BACKOFF_MAX_S", "60"))
+SUPERVISOR_MAX_RESTARTS = int(os.getenv("SUPERVISOR_MAX_RESTARTS", "10"))
+# Implementación del read-model: "django" (update_or_create) o "upsert" (INSERT ... ON DUPLICATE KEY UPDATE)
+READ_MODEL_REPO = os.getenv("READ_MODEL_REPO", "django")
+# LRU en proceso de CloudEvent ids ya proyectados (0 = desactivado)
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", "100000"))
+# Lecturas en modo bytes (sin decode_responses) + parser JSON rápido si está instalado
+CONSUMER_BYTES_MODE = os.getenv("CONSUMER_BYTES_MODE", "0") == "1"
+# Engine del consumer: "sync" (por defecto) o "async" (redis.asyncio, lotes en vuelo)
+CONSUMER_ENGINE = os.getenv("CONSUMER_ENGINE", "sync")
+ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", "8"))
+ASYNC_INFLIGHT_BATCHES = int(os.getenv("ASYNC_INFLIGHT_BATCHES", "2"))
+# Proyección por lote: una transacción por XREADGROUP (savepoint por mensaje)
+CONSUMER_BATCH_TX = os.getenv("CONSUMER_BATCH_TX", "0") == "1"
+# dataschemas cuyos validadores se precompilan al arrancar el consumer
+CONTRACTS_WARM_DATASCHEMAS = [u for u in os.getenv(
+    "CONTRACTS_WARM_DATASCHEMAS",
+    "https://contracts.logistrack/schemas/BloqueConsolidadoListo/1.2/schema.json",
+).split(",") if u]
+# COUNT/BLOCK adaptativos por iteración (XREAD_ADAPTIVE=1), acotados por estos límites;
+# con 0 se usan XREAD_COUNT/XREAD_BLOCK_MS fijos
+XREAD_ADAPTIVE = os.getenv("XREAD_ADAPTIVE", "0") == "1"
+XREAD_COUNT_MIN = int(os.getenv("XREAD_COUNT_MIN", "10"))
+XREAD_COUNT_MAX = int(os.getenv("XREAD_COUNT_MAX", "1000"))
+XREAD_BLOCK_MIN_MS = int(os.getenv("XREAD_BLOCK_MIN_MS", "100"))
+XREAD_TARGET_BATCH_MS = int(os.getenv("XREAD_TARGET_BATCH_MS", "500"))
+# /api/v1/health/stream: segundos que se cachean XLEN/XINFO/XPENDING
+STREAM_HEALTH_TTL_S = float(os.getenv("STREAM_HEALTH_TTL_S", "5"))
+STREAM_HEALTH_REDIS_TIMEOUT_S = float(os.getenv("STREAM_HEALTH_REDIS_TIMEOUT_S", "1"))
+# Métricas Prometheus: cada worker escucha en METRICS_PORT + índice (0 = sin listener);
+# /api/metrics agrega los targets listados (URLs completas, separadas por coma)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_TARGETS = [u for u in os.getenv("METRICS_TARGETS", "").split(",") if u]
+METRICS_SCRAPE_TIMEOUT_S = float(os.getenv("METRICS_SCRAPE_TIMEOUT_S", "1"))
+# Caché de respuestas del read API (alias "read_api"), invalidada por versiones por
+# entidad en Redis que suben los escritores tras el commit (infrastructure/read_cache.py)
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "0") == "1"
+READ_CACHE_TTL_S = int(os.getenv("READ_CACHE_TTL_S", "60"))
+READ_CACHE_REDIS_TIMEOUT_S = float(os.getenv("READ_CACHE_REDIS_TIMEOUT_S", "0.2"))
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "read_api": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("READ_CACHE_DSN", REDIS_DSN),
+        "KEY_PREFIX": "distribucion:resp",
+        "TIMEOUT": READ_CACHE_TTL_S,
+        # Redis lento o caído: la vista cae a la DB en vez de colgarse (ver api/response_cache.py)
+        "OPTIONS": {
+            "socket_timeout": READ_CACHE_REDIS_TIMEOUT_S,
+            "socket_connect_timeout": READ_CACHE_REDIS_TIMEOUT_S,
+        },
+    },
+}
+# Presupuesto de queries por vista del read API: "off" | "log" (warning al excederlo) | "raise"
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
+# Política de validación: "full" | "envelope" | "sample:<pct>"; por dataschema con
+# CONTRACTS_VALIDATION_POLICY="<uri>=envelope,<uri>=sample:5"
+CONTRACTS_VALIDATION_DEFAULT = os.getenv("CONTRACTS_VALIDATION_DEFAULT", "full")
+CONTRACTS_VALIDATION_POLICY = dict(
+    kv.rsplit("=", 1) for kv in os.getenv("CONTRACTS_VALIDATION_POLICY", "").split(",") if kv
+)
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -162,9 +229,17 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "distribucion.api.pagination.PageNumberOrKeysetPagination",
     "PAGE_SIZE": 5,
+    "DEFAULT_RENDERER_CLASSES": [
+        # orjson si está instalado; misma salida que JSONRenderer (cae a DRF en los casos que difieren)
+        "distribucion.api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
+# Serialización del read API desde values() sin ModelSerializer por fila (api/fast.py).
+# Activa por defecto (misma salida, cubierta por tests/api/test_fast_serialization.py); "0" => DRF
+API_FAST_SERIALIZATION = os.getenv("API_FAST_SERIALIZATION", "1") == "1"
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "LogisTrack Read API",
@@ -8,4 +8,9 @@ DATABASES = {
 }
 
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
-CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "read_api": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "read_api"},
+}
+# un N+1 en cualquier test del API falla (api/query_budget.py)
+QUERY_BUDGET_MODE = "raise"